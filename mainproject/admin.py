@@ -8,6 +8,8 @@ from .models import (
 @admin.register(Ogrenci)
 class OgrenciAdmin(admin.ModelAdmin):
     list_display = ['ad_soyad', 'seviye', 'kayit_tarihi', 'tamamlanan_ezber_sayisi', 'tamamlanan_elifba_sayisi']
+    # Tamamlanan sayıları özet tablosundan gelir - satır başına sorgu yok
+    list_select_related = ['istatistik']
     list_filter = ['seviye', 'kayit_tarihi']
     search_fields = ['ad_soyad']
     date_hierarchy = 'kayit_tarihi'
@@ -67,4 +67,8 @@ class MainprojectConfig(AppConfig):
     
     def ready(self):
         # Uygulama hazır olduğunda sinyali bağla
-        post_migrate.connect(setup_initial_data, sender=self)
\ No newline at end of file
+        post_migrate.connect(setup_initial_data, sender=self)
+
+        # Öğrenci istatistik özet tablosunu güncel tutan sinyaller
+        from . import signals
+        signals.baglan()
\ No newline at end of file
@@ -0,0 +1,585 @@
+"""
+Yedekleme servisi
+ZIP arşivini geçici dizine kopyalamadan, kaynak dosyalardan doğrudan hem
+istemciye (StreamingHttpResponse) hem de media/backups altındaki arşive akıtır.
+Fotoğraflar arşive gömülmez; içerik adresli blob deposuna (blob_service) bir kez
+yazılır ve backup.json içinde SHA-256 özetleriyle referanslanır. Özetler
+fotoğraf yazılırken hesaplanır, akışın ilk baytı fotoğrafları beklemez.
+
+v2 biçiminde her model data/<anahtar>.ndjson üyesine satır satır yazılır;
+backup.json yalnızca başlık bilgisini (bölümler, fotoğraflar, tarih) taşır.
+Veri ve veritabanı üyeleri ayarlanabilir yöntemle sıkıştırılır; arşive gömülen
+JPEG/PNG/WebP fotoğraflar zaten sıkıştırılmış olduğundan olduğu gibi saklanır.
+Her arşivin son üyesi manifest.json'dur: satır sayıları, üyelerin SHA-256
+özetleri, sürüm ve göç (migration) durumu - verify_service bununla doğrular.
+"""
+import io
+import os
+import json
+import time
+import hashlib
+import zipfile
+import logging
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core import serializers
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.models import yazi, category
+from . import blob_service, catalog_service, snapshot_service
+from .models import (
+    Ogrenci, EzberKaydi, SinavSonucu, DersNotu, Alinti, Ders,
+    EzberSuresi, ElifBaEzberi, ElifBaEzberDurumu, Galeri
+)
+
+logger = logging.getLogger(__name__)
+
+# Dosyalar bu boyutta parçalar halinde okunur - bellek kullanımı sabit kalır
+PARCA_BOYUTU = 64 * 1024
+
+YEDEK_VERSIYONU = '2.0'
+
+MANIFEST_UYESI = catalog_service.MANIFEST_UYESI
+
+# NDJSON bölümleri bu kadar satırlık gruplar halinde serileştirilir
+SATIR_GRUBU = 500
+
+# Değişiklik zaman damgası taşıyan modeller - fark yedeğinde bu alana göre seçilir,
+# diğer modellerde satır içeriğinin özeti tabandakiyle karşılaştırılır
+ZAMAN_DAMGASI_ALANLARI = {
+    'ogrenciler': 'son_guncelleme',
+    'ders_notlari': 'guncelleme_tarihi',
+}
+# Taban yedek okunurken kaydedilen ama henüz commit edilmemiş satırlar kaçmasın
+FARK_ORTUSME_PAYI = timedelta(minutes=1)
+
+SIKISTIRMA_YONTEMLERI = {
+    'stored': zipfile.ZIP_STORED,
+    'deflate': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA,
+}
+# Zaten sıkıştırılmış görsel biçimlerinin dosya imzaları (JPEG, PNG, GIF)
+SIKISTIRILMIS_IMZALAR = (b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'GIF87a', b'GIF89a')
+
+
+def fotograflari_arsive_gom():
+    """
+    True ise fotoğraflar blob deposuna ek olarak arşive fotograflar/<sıra> üyesi
+    olarak da yazılır (başka sunucuya taşınabilir, bağımsız yedek için)
+    Kapalıyken arşiv fotoğrafları bu sunucunun blob deposundan alır; tek seferlik
+    taşınabilir yedek için yedek_akisi(..., fotograflari_gom=True) kullanılır.
+    """
+    return getattr(settings, 'YEDEK_FOTOGRAFLARI_ARSIVE_GOM', False)
+
+
+def sikistirma_ayari():
+    """
+    Veri (NDJSON, backup.json) ve veritabanı üyeleri için (yöntem, seviye)
+    settings.YEDEK_SIKISTIRMA: 'deflate' (varsayılan), 'bzip2', 'lzma' veya 'stored'
+    settings.YEDEK_SIKISTIRMA_SEVIYESI: None ise yöntemin varsayılanı; LZMA seviye almaz
+    """
+    yontem = getattr(settings, 'YEDEK_SIKISTIRMA', 'deflate')
+    if yontem not in SIKISTIRMA_YONTEMLERI:
+        raise ValueError(f'Geçersiz YEDEK_SIKISTIRMA: {yontem} '
+                         f'(seçenekler: {", ".join(SIKISTIRMA_YONTEMLERI)})')
+    return SIKISTIRMA_YONTEMLERI[yontem], getattr(settings, 'YEDEK_SIKISTIRMA_SEVIYESI', None)
+
+
+def sikistirilmis_medya_mi(path):
+    """Dosya JPEG/PNG/GIF/WebP ise True - uzantısız blob'lar için imzaya bakılır"""
+    with open(path, 'rb') as f:
+        bas = f.read(12)
+    return bas.startswith(SIKISTIRILMIS_IMZALAR) or (bas[:4] == b'RIFF' and bas[8:12] == b'WEBP')
+
+
+def dosya_sikistirmasi(source_path):
+    """
+    Arşive dosyadan yazılacak üye için (yöntem, seviye)
+    Zaten sıkıştırılmış görseller yeniden sıkıştırılmadan (ZIP_STORED) saklanır;
+    settings.YEDEK_MEDYA_SIKISTIRILSIN = True ise onlar da veri gibi sıkıştırılır.
+    """
+    if not getattr(settings, 'YEDEK_MEDYA_SIKISTIRILSIN', False) and sikistirilmis_medya_mi(source_path):
+        return zipfile.ZIP_STORED, None
+    return sikistirma_ayari()
+
+
+def yedek_dizini():
+    """media/backups dizinini döndürür, yoksa oluşturur"""
+    backup_dir = os.path.join(settings.MEDIA_ROOT, 'backups')
+    os.makedirs(backup_dir, exist_ok=True)
+    return backup_dir
+
+
+class AkisHedefi:
+    """
+    ZipFile için seek edilemeyen yazma hedefi
+    Yazılan her baytı diskteki arşive yazar ve istemciye gönderilmek üzere biriktirir
+    """
+
+    def __init__(self, disk_dosyasi):
+        self.disk_dosyasi = disk_dosyasi
+        self._parcalar = []
+        self._konum = 0
+
+    def write(self, veri):
+        self.disk_dosyasi.write(veri)
+        self._parcalar.append(bytes(veri))
+        self._konum += len(veri)
+        return len(veri)
+
+    def tell(self):
+        return self._konum
+
+    def flush(self):
+        self.disk_dosyasi.flush()
+
+    def bosalt(self):
+        """Son bosalt() çağrısından bu yana yazılan baytları döndürür"""
+        veri = b''.join(self._parcalar)
+        self._parcalar.clear()
+        return veri
+
+
+def fotograf_adaylari():
+    """Yedeğe girecek fotoğraflar: (photo_info kaydı, kaynak yol) çiftleri - dosyalar okunmaz"""
+    kaynaklar = [
+        ('yazi', 'imageUrl', yazi.objects.exclude(imageUrl='').exclude(imageUrl__isnull=True)),
+        ('ogrenci', 'profil_foto', Ogrenci.objects.exclude(profil_foto='').exclude(profil_foto__isnull=True)),
+        ('galeri', 'dosya', Galeri.objects.exclude(dosya='')),
+    ]
+
+    adaylar = []
+    for tip, alan, queryset in kaynaklar:
+        for obj in queryset.only('id', alan).iterator():
+            try:
+                dosya = getattr(obj, alan)
+                adaylar.append(({
+                    'type': tip,
+                    'id': obj.id,
+                    'filename': os.path.basename(dosya.name),
+                    'field': alan,
+                    'name': dosya.name,
+                }, dosya.path))
+            except Exception as e:
+                logger.warning(f"{tip} {obj.id} resim yolu alınamadı: {e}")
+    return adaylar
+
+
+def fotograf_listesi(adaylar=None):
+    """
+    Fotoğrafları blob deposuna ekler, özetleri yazılmış (photo_info kaydı, kaynak yol) çiftlerini döndürür
+    Depoda olan fotoğraf kopyalanmaz; yeni fotoğraf kopyalanırken özetlenir.
+    """
+    adaylar = fotograf_adaylari() if adaylar is None else adaylar
+    ozetler = blob_service.OzetOnbellegi()
+
+    def blob_hazirla(aday):
+        info, source_path = aday
+        if not os.path.exists(source_path):
+            return None
+        info['sha256'], yeni = blob_service.blob_ekle(source_path, ozetler)
+        return yeni
+
+    # Özetleme ve blob kopyalama disk beklemesi yüzünden paralel yapılır
+    fotograflar, yeni_blob = [], 0
+    for aday, yeni, hata in blob_service.paralel_isle(blob_hazirla, adaylar):
+        info, _ = aday
+        if hata:
+            logger.warning(f"{info['type']} {info['id']} resmi yedeklenemedi: {hata}")
+        elif yeni is not None:
+            fotograflar.append(aday)
+            yeni_blob += int(yeni)
+    ozetler.kaydet()
+    # Arşivdeki sıra çalıştırmadan çalıştırmaya değişmesin
+    sira = {id(aday): i for i, aday in enumerate(adaylar)}
+    fotograflar.sort(key=lambda aday: sira[id(aday)])
+    logger.info(f"{len(fotograflar)} fotoğraf, {yeni_blob} yeni blob")
+    return fotograflar
+
+
+def yedek_bolumleri():
+    """backup.json içindeki model bölümleri (v1.6 anahtarları ile)"""
+    return [
+        ('ogrenciler', Ogrenci.objects.all()),
+        ('yazilar', yazi.objects.all()),
+        ('ezber_kayitlari', EzberKaydi.objects.all()),
+        ('sinav_sonuclari', SinavSonucu.objects.all()),
+        ('ders_notlari', DersNotu.objects.all()),
+        ('alintilar', Alinti.objects.all()),
+        ('dersler', Ders.objects.all()),
+        ('ezber_sureleri', EzberSuresi.objects.all()),
+        ('elifba_ezberleri', ElifBaEzberi.objects.all()),
+        ('elifba_ezber_durumlari', ElifBaEzberDurumu.objects.all()),
+        ('categories', category.objects.all()),
+        ('galeri', Galeri.objects.all()),
+    ]
+
+
+def bolum_uyesi(key):
+    """Bölümün v2 arşivindeki NDJSON üye adı"""
+    return f'data/{key}.ndjson'
+
+
+def _bolum_uyesi_yaz(zipf, hedef, key, queryset):
+    """
+    Modeli satır satır NDJSON üyesine yazar, her satır grubundan sonra hazır baytları verir
+    Bittiğinde (satır sayısı, üye özeti) döndürür.
+    """
+    ozet, satir_sayisi, boyut = hashlib.sha256(), 0, 0
+    with zipf.open(bolum_uyesi(key), 'w') as uye:
+        nesneler = queryset.iterator(chunk_size=SATIR_GRUBU)
+        while True:
+            grup = list(islice(nesneler, SATIR_GRUBU))
+            if not grup:
+                break
+            satirlar = serializers.serialize('jsonl', grup).encode('utf-8')
+            uye.write(satirlar)
+            ozet.update(satirlar)
+            satir_sayisi += len(grup)
+            boyut += len(satirlar)
+            veri = hedef.bosalt()
+            if veri:
+                yield veri
+    return satir_sayisi, {'sha256': ozet.hexdigest(), 'boyut': boyut}
+
+
+def bolum_kayitlari(zipf, backup_data, key):
+    """
+    Bölümün kayıtlarını (serileştirilmiş sözlükler) sırayla verir
+    v2'de NDJSON üyesi satır satır okunur; v1.6'da backup.json içindeki metin çözülür.
+    """
+    if 'bolumler' in backup_data:
+        if key not in backup_data['bolumler']:
+            return
+        with zipf.open(backup_data['bolumler'][key]) as f:
+            for satir in io.TextIOWrapper(f, encoding='utf-8'):
+                if satir.strip():
+                    yield json.loads(satir)
+        return
+
+    kayitlar = backup_data.get(key, [])
+    if isinstance(kayitlar, str):
+        kayitlar = json.loads(kayitlar)
+    yield from kayitlar
+
+
+def _dosya_uyesi_yaz(zipf, hedef, source_path, arcname):
+    """
+    Kaynak dosyayı parça parça ZIP üyesine yazar, her parçadan sonra hazır baytları verir
+    Bittiğinde üyenin manifest kaydını ({'sha256', 'boyut'}) döndürür.
+    """
+    zinfo = zipfile.ZipInfo.from_file(source_path, arcname)
+    # ZipFile.open(zinfo) yöntemi ve seviyeyi ZipInfo'dan okur
+    zinfo.compress_type, zinfo._compresslevel = dosya_sikistirmasi(source_path)
+    ozet = hashlib.sha256()
+    with open(source_path, 'rb') as kaynak, zipf.open(zinfo, 'w') as uye:
+        while True:
+            parca = kaynak.read(PARCA_BOYUTU)
+            if not parca:
+                break
+            uye.write(parca)
+            ozet.update(parca)
+            veri = hedef.bosalt()
+            if veri:
+                yield veri
+    return {'sha256': ozet.hexdigest(), 'boyut': zinfo.file_size}
+
+
+def goc_durumu():
+    """Uygulanmış göçler (migrations): {uygulama: [göç adları]}"""
+    gocler = {}
+    for app_label, name in sorted(MigrationRecorder(connection).applied_migrations()):
+        gocler.setdefault(app_label, []).append(name)
+    return gocler
+
+
+def metin_uyesi_yaz(zipf, arcname, metin, uyeler):
+    """Küçük metin üyesini yazar ve özetini uyeler sözlüğüne ekler"""
+    veri = metin.encode('utf-8')
+    zipf.writestr(arcname, veri)
+    uyeler[arcname] = {'sha256': hashlib.sha256(veri).hexdigest(), 'boyut': len(veri)}
+
+
+def manifest_yaz(zipf, backup_type, backup_date, satir_sayilari, uyeler, photo_info=()):
+    """Arşivin son üyesi olarak manifest.json'u yazar"""
+    zipf.writestr(MANIFEST_UYESI, json.dumps({
+        'backup_type': backup_type,
+        'backup_version': YEDEK_VERSIYONU,
+        'backup_date': backup_date.isoformat(),
+        'satir_sayilari': satir_sayilari,
+        'uyeler': uyeler,
+        'fotograflar': {info['name']: info['sha256'] for info in photo_info},
+        'gocler': goc_durumu(),
+    }, ensure_ascii=False))
+
+
+def _fotograflari_gom(zipf, hedef, adaylar, uyeler):
+    """
+    Fotoğrafları fotograflar/<sıra> üyeleri olarak arşive yazar, her parçadan sonra baytları verir
+    Özet üye yazılırken hesaplanır ve photo_info kaydına ('sha256', 'uye') işlenir;
+    önbellekten özeti bilinen ve daha önce gömülmüş bir fotoğraf tekrar yazılmaz
+    (özeti henüz bilinmeyen aynı içerik ayrı üye olarak yazılabilir).
+    Bittiğinde gömülen fotoğrafların photo_info kayıtlarını döndürür.
+    """
+    ozetler = blob_service.OzetOnbellegi()
+    gomulen, photo_info, uye_sayisi = {}, [], 0
+    for info, source_path in adaylar:
+        if not os.path.isfile(source_path):
+            logger.warning(f"{info['type']} {info['id']} resmi bulunamadı: {source_path}")
+            continue
+        st = os.stat(source_path)
+        ozet = ozetler.bilinen(source_path, st)
+        if ozet not in gomulen:
+            arcname = f'fotograflar/{uye_sayisi}'
+            uye_sayisi += 1
+            uyeler[arcname] = yield from _dosya_uyesi_yaz(zipf, hedef, source_path, arcname)
+            ozet = uyeler[arcname]['sha256']
+            ozetler.ekle(source_path, st, ozet)
+            gomulen.setdefault(ozet, arcname)
+        info['sha256'], info['uye'] = ozet, gomulen[ozet]
+        # Depoda varsa kopyalanmaz - sonraki yedekler ve geri yükleme için
+        blob_service.blob_kaydet(source_path, ozet)
+        photo_info.append(info)
+    ozetler.kaydet()
+    logger.info(f"{len(photo_info)} fotoğraf, {uye_sayisi} arşiv üyesi")
+    return photo_info
+
+
+def yedek_akisi(zip_path, fotograflari_gom=None):
+    """
+    Yedek ZIP'ini üretir: her üye yazıldıkça baytlar hem zip_path'e yazılır
+    hem de istemciye gönderilmek üzere verilir (yield)
+    fotograflari_gom: None ise settings.YEDEK_FOTOGRAFLARI_ARSIVE_GOM kullanılır
+
+    Veri üyeleri önce yazılır; fotoğraflar ilk bayttan önce özetlenmez.
+    Özetlerini taşıyan backup.json ve manifest fotoğraflardan sonra yazılır.
+    """
+    gecici_path = zip_path + '.part'
+    try:
+        with open(gecici_path, 'wb') as disk_dosyasi:
+            hedef = AkisHedefi(disk_dosyasi)
+            yontem, seviye = sikistirma_ayari()
+            with zipfile.ZipFile(hedef, 'w', compression=yontem, compresslevel=seviye) as zipf:
+                # Yedek tarihi okumaya başlamadan alınır - fark yedekleri bu tarihten sonrasını içerir
+                backup_date = timezone.now()
+                adaylar = fotograf_adaylari()
+
+                # 1. Her model ayrı NDJSON üyesine - satır grupları halinde
+                bolumler, satir_sayilari, uyeler = {}, {}, {}
+                for key, queryset in yedek_bolumleri():
+                    bolumler[key] = bolum_uyesi(key)
+                    satir_sayilari[key], uyeler[bolumler[key]] = yield from _bolum_uyesi_yaz(
+                        zipf, hedef, key, queryset
+                    )
+
+                # 2. Fotoğraflar - özetler gömülürken (veya depoya kopyalanırken) hesaplanır
+                if fotograflari_gom is None:
+                    fotograflari_gom = fotograflari_arsive_gom()
+                if fotograflari_gom:
+                    photo_info = yield from _fotograflari_gom(zipf, hedef, adaylar, uyeler)
+                else:
+                    photo_info = [info for info, _ in fotograf_listesi(adaylar)]
+
+                # backup.json - yalnızca başlık bilgisi
+                metin_uyesi_yaz(zipf, 'backup.json', json.dumps({
+                    'format': 'ndjson',
+                    'bolumler': bolumler,
+                    'photo_info': photo_info,
+                    'backup_date': backup_date.isoformat(),
+                    'backup_version': YEDEK_VERSIYONU,
+                }, ensure_ascii=False), uyeler)
+                veri = hedef.bosalt()
+                if veri:
+                    yield veri
+
+                # 3. Veritabanı - canlı dosya yerine tutarlı anlık görüntüsü
+                if os.path.exists(snapshot_service.veritabani_yolu()):
+                    snapshot_path = zip_path + '.sqlite3'
+                    try:
+                        snapshot_service.anlik_goruntu_al(snapshot_path)
+                        db_uyesi = os.path.join('database', 'db.sqlite3')
+                        uyeler[db_uyesi] = yield from _dosya_uyesi_yaz(
+                            zipf, hedef, snapshot_path, db_uyesi
+                        )
+                    finally:
+                        if os.path.exists(snapshot_path):
+                            os.remove(snapshot_path)
+
+                # 4. Manifest - diğer tüm üyelerin özetleriyle en sonda
+                manifest_yaz(zipf, 'tam', backup_date, satir_sayilari, uyeler, photo_info)
+
+            # Merkezi dizin ZipFile kapanırken yazılır
+            veri = hedef.bosalt()
+            if veri:
+                yield veri
+
+        os.replace(gecici_path, zip_path)
+        logger.info(f"Yedek oluşturuldu: {zip_path}")
+    except BaseException:
+        # Yarım kalan arşivi bırakma (istemci bağlantıyı kesse bile)
+        if os.path.exists(gecici_path):
+            os.remove(gecici_path)
+        raise
+
+
+def yedek_akisi_olustur(fotograflari_gom=None):
+    """
+    Yeni yedek için dosya adını ve bayt akışını döndürür
+    Akış bitince yedek kataloğa eklenir ve saklama politikası uygulanır;
+    yedek_akisi yalnızca arşivi yazar (benchmark gibi katalog dışı kullanımlar için).
+    """
+    timestamp = timezone.now().strftime("%Y%m%d_%H%M%S")
+    zip_filename = f'backup_{timestamp}.zip'
+    zip_path = os.path.join(yedek_dizini(), zip_filename)
+
+    def akis():
+        yield from yedek_akisi(zip_path, fotograflari_gom)
+        catalog_service.ekle(zip_path)
+        catalog_service.otomatik_temizle()
+
+    return zip_filename, akis()
+
+
+def satir_ozeti(kayit):
+    """Serileştirilmiş kaydın alanlarından kısa içerik özeti"""
+    veri = json.dumps(kayit['fields'], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(veri.encode('utf-8')).hexdigest()[:16]
+
+
+def serilestirilmis_kayitlar(queryset):
+    """Queryset'i satır grupları halinde JSON serileştirip kayıt sözlüklerini sırayla verir"""
+    nesneler = queryset.iterator(chunk_size=SATIR_GRUBU)
+    while True:
+        grup = list(islice(nesneler, SATIR_GRUBU))
+        if not grup:
+            break
+        yield from json.loads(serializers.serialize('json', grup))
+
+
+def yedek_durumu(zip_path):
+    """
+    Yedeğin aldığı andaki durum: {'backup_date', 'modeller': {anahtar: {pk: özet}}}
+    Zaman damgalı modellerde özet yerine None tutulur. Fark yedekleri durumu
+    durum.json üyesinde taşır; tam yedeklerde backup.json'dan hesaplanır.
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zipf:
+        if 'durum.json' in zipf.namelist():
+            with zipf.open('durum.json') as f:
+                return json.load(f)
+        with zipf.open('backup.json') as f:
+            veri = json.load(f)
+
+        modeller = {}
+        for key, _ in yedek_bolumleri():
+            if key not in veri.get('bolumler', veri):
+                continue
+            zaman_damgali = key in ZAMAN_DAMGASI_ALANLARI
+            modeller[key] = {
+                str(kayit['pk']): None if zaman_damgali else satir_ozeti(kayit)
+                for kayit in bolum_kayitlari(zipf, veri, key)
+            }
+    return {'backup_date': veri['backup_date'], 'modeller': modeller}
+
+
+def son_yedek():
+    """En son oluşturulan yedeğin (tam veya fark) yolu, hiç yedek yoksa None"""
+    filename = catalog_service.son_yedek_adi()
+    return os.path.join(yedek_dizini(), filename) if filename else None
+
+
+def fark_yedegi_olustur(taban_path=None):
+    """
+    Tabandan (varsayılan: son yedek) bu yana değişen satırları ve silinen
+    kayıtların pk'larını içeren küçük bir fark yedeği yazar
+
+    Fark yedeği veritabanı dosyası içermez; fotoğraflar blob deposunda olduğu
+    için yalnızca özetleri yazılır. Geri yükleme taban yedek ve aradaki fark
+    yedeklerini sırayla uygular (restore_service.yedek_zinciri).
+    """
+    baslangic = time.monotonic()
+    taban_path = taban_path or son_yedek()
+    if not taban_path:
+        raise ValueError('Fark yedeği için önce tam yedek alınmalı')
+    taban = yedek_durumu(taban_path)
+    taban_tarihi = parse_datetime(taban['backup_date']) - FARK_ORTUSME_PAYI
+    backup_date = timezone.now()
+
+    degisiklikler, silinenler, durum = {}, {}, {}
+    for key, queryset in yedek_bolumleri():
+        onceki = taban['modeller'].get(key, {})
+        alan = ZAMAN_DAMGASI_ALANLARI.get(key)
+        if alan:
+            mevcut = {str(pk): None for pk in queryset.values_list('pk', flat=True)}
+            yeni_pkler = [pk for pk in mevcut if pk not in onceki]
+            degisen = queryset.filter(Q(**{f'{alan}__gt': taban_tarihi}) | Q(pk__in=yeni_pkler))
+            kayitlar = list(serilestirilmis_kayitlar(degisen))
+        else:
+            mevcut, kayitlar = {}, []
+            for kayit in serilestirilmis_kayitlar(queryset):
+                pk = str(kayit['pk'])
+                mevcut[pk] = satir_ozeti(kayit)
+                if onceki.get(pk, '') != mevcut[pk]:
+                    kayitlar.append(kayit)
+
+        silinen = [pk for pk in onceki if pk not in mevcut]
+        if kayitlar:
+            degisiklikler[key] = json.dumps(kayitlar, ensure_ascii=False)
+        if silinen:
+            silinenler[key] = silinen
+        durum[key] = mevcut
+
+    photo_info = [info for info, _ in fotograf_listesi()]
+    zip_filename = f'diff_{backup_date.strftime("%Y%m%d_%H%M%S")}.zip'
+    zip_path = os.path.join(yedek_dizini(), zip_filename)
+    gecici_path = zip_path + '.part'
+    try:
+        yontem, seviye = sikistirma_ayari()
+        with zipfile.ZipFile(gecici_path, 'w', compression=yontem, compresslevel=seviye) as zipf:
+            uyeler = {}
+            metin_uyesi_yaz(zipf, 'backup.json', json.dumps({
+                'backup_type': 'fark',
+                'base': os.path.basename(taban_path),
+                'degisiklikler': degisiklikler,
+                'silinenler': silinenler,
+                'photo_info': photo_info,
+                'backup_date': backup_date.isoformat(),
+                'backup_version': YEDEK_VERSIYONU,
+            }, ensure_ascii=False), uyeler)
+            metin_uyesi_yaz(zipf, 'durum.json', json.dumps({
+                'backup_date': backup_date.isoformat(),
+                'modeller': durum,
+            }), uyeler)
+            # Fark yedeğinde satır sayıları değişen kayıtların sayısıdır
+            satir_sayilari = {key: len(json.loads(k)) for key, k in degisiklikler.items()}
+            manifest_yaz(zipf, 'fark', backup_date, satir_sayilari, uyeler, photo_info)
+        os.replace(gecici_path, zip_path)
+    finally:
+        if os.path.exists(gecici_path):
+            os.remove(gecici_path)
+    catalog_service.ekle(zip_path)
+    catalog_service.otomatik_temizle()
+
+    sonuc = {
+        'path': zip_path,
+        'filename': zip_filename,
+        'base': os.path.basename(taban_path),
+        'degisen': sum(satir_sayilari.values()),
+        'silinen': sum(len(pks) for pks in silinenler.values()),
+        'boyut': os.path.getsize(zip_path),
+        'sure': time.monotonic() - baslangic,
+    }
+    logger.info(f"Fark yedeği oluşturuldu: {zip_filename} (taban {sonuc['base']}, "
+                f"{sonuc['degisen']} değişen, {sonuc['silinen']} silinen satır)")
+    return sonuc
+
+
+def bagimli_fark_yedekleri(filename):
+    """Verilen yedeği taban alan fark yedeklerinin adları"""
+    return catalog_service.bagimlilar(filename)
@@ -0,0 +1,212 @@
+"""
+İçerik adresli fotoğraf deposu
+Yedeklenen her fotoğraf media/backups/blobs/<sha256> altında tek kopya olarak
+saklanır. Yedekler fotoğrafları özetleriyle (hash) referanslar; böylece yeni bir
+yedek yalnızca daha önce görülmemiş fotoğrafları yazar.
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Dosyalar bu boyutta parçalar halinde okunur
+PARCA_BOYUTU = 64 * 1024
+
+OZET_ONBELLEGI = 'ozetler.json'
+
+# Bu süreden yeni blob'lar temizlikte silinmez - devam eden bir yedek onları kullanıyor olabilir
+TEMIZLIK_KORUMA_SURESI = 60 * 60
+
+
+def fotograf_isci_sayisi():
+    """Fotoğraf kopyalama/özetleme için iş parçacığı sayısı (settings.YEDEK_FOTOGRAF_ISCI_SAYISI)"""
+    return max(1, getattr(settings, 'YEDEK_FOTOGRAF_ISCI_SAYISI', 4))
+
+
+def paralel_isle(islem, ogeler, isci_sayisi=None, ilerleme=None):
+    """
+    islem(oge) çağrılarını sınırlı bir iş parçacığı havuzunda çalıştırır
+
+    Her öğe için (oge, sonuç, hata) üçlüsü tamamlanma sırasıyla döner; bir
+    dosyadaki hata diğerlerini durdurmaz. ilerleme(tamamlanan, toplam) her
+    öğeden sonra çağrılır.
+    """
+    ogeler = list(ogeler)
+    sonuclar = []
+    with ThreadPoolExecutor(max_workers=isci_sayisi or fotograf_isci_sayisi(),
+                            thread_name_prefix='fotograf') as havuz:
+        gorevler = {havuz.submit(islem, oge): oge for oge in ogeler}
+        for tamamlanan, gorev in enumerate(as_completed(gorevler), 1):
+            oge = gorevler[gorev]
+            try:
+                sonuclar.append((oge, gorev.result(), None))
+            except Exception as e:
+                sonuclar.append((oge, None, e))
+            if ilerleme:
+                ilerleme(tamamlanan, len(ogeler))
+    return sonuclar
+
+
+def blob_dizini():
+    """media/backups/blobs dizinini döndürür, yoksa oluşturur"""
+    blobs_dir = os.path.join(settings.MEDIA_ROOT, 'backups', 'blobs')
+    os.makedirs(blobs_dir, exist_ok=True)
+    return blobs_dir
+
+
+def blob_yolu(ozet):
+    return os.path.join(blob_dizini(), ozet)
+
+
+def blob_var_mi(ozet):
+    return bool(ozet) and os.path.exists(blob_yolu(ozet))
+
+
+def dosya_ozeti(path):
+    """Dosyanın SHA-256 özetini parça parça okuyarak hesaplar"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for parca in iter(lambda: f.read(PARCA_BOYUTU), b''):
+            h.update(parca)
+    return h.hexdigest()
+
+
+class OzetOnbellegi:
+    """
+    Kaynak dosya yolu -> (boyut, mtime, özet) önbelleği
+    Değişmeyen fotoğrafların her yedekte yeniden okunup özetlenmesini önler.
+    """
+
+    def __init__(self):
+        self.path = os.path.join(blob_dizini(), OZET_ONBELLEGI)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.kayitlar = json.load(f)
+        except (OSError, ValueError):
+            self.kayitlar = {}
+        self.degisti = False
+
+    def bilinen(self, source_path, st=None):
+        """Dosya değişmediyse önbellekteki özeti, aksi halde None döndürür (dosya okunmaz)"""
+        st = st or os.stat(source_path)
+        kayit = self.kayitlar.get(source_path)
+        if kayit and kayit[0] == st.st_size and kayit[1] == st.st_mtime_ns:
+            return kayit[2]
+        return None
+
+    def ekle(self, source_path, st, ozet):
+        """Okunmadan önce alınan stat bilgisiyle özeti önbelleğe yazar"""
+        self.kayitlar[source_path] = [st.st_size, st.st_mtime_ns, ozet]
+        self.degisti = True
+
+    def ozet(self, source_path):
+        st = os.stat(source_path)
+        ozet = self.bilinen(source_path, st)
+        if ozet is None:
+            ozet = dosya_ozeti(source_path)
+            self.ekle(source_path, st, ozet)
+        return ozet
+
+    def kaydet(self):
+        if not self.degisti:
+            return
+        gecici_path = self.path + '.tmp'
+        with open(gecici_path, 'w', encoding='utf-8') as f:
+            json.dump(self.kayitlar, f)
+        os.replace(gecici_path, self.path)
+        self.degisti = False
+
+
+def blob_kaydet(source_path, ozet):
+    """Fotoğrafı depoya ekler; depoda zaten varsa kopyalamaz. Yeni yazıldıysa True döndürür"""
+    hedef_path = blob_yolu(ozet)
+    if os.path.exists(hedef_path):
+        # Kullanıldığını işaretle - temizlik devam eden yedeğin blob'unu silmesin
+        os.utime(hedef_path)
+        return False
+    gecici_path = f'{hedef_path}.{os.getpid()}.part'
+    try:
+        shutil.copyfile(source_path, gecici_path)
+        os.replace(gecici_path, hedef_path)
+    finally:
+        if os.path.exists(gecici_path):
+            os.remove(gecici_path)
+    return True
+
+
+def blob_ekle(source_path, ozetler=None):
+    """
+    Fotoğrafı depoya ekler ve (özet, yeni yazıldı mı) döndürür
+    Özeti önbellekte yoksa dosya tek geçişte hem geçici blob'a kopyalanır hem
+    özetlenir; önceden ayrıca okunup özetlenmez.
+    """
+    st = os.stat(source_path)
+    ozet = ozetler.bilinen(source_path, st) if ozetler else None
+    if ozet:
+        return ozet, blob_kaydet(source_path, ozet)
+
+    h = hashlib.sha256()
+    gecici_path = os.path.join(blob_dizini(), f'.{os.getpid()}.{threading.get_ident()}.part')
+    try:
+        with open(source_path, 'rb') as kaynak, open(gecici_path, 'wb') as hedef:
+            for parca in iter(lambda: kaynak.read(PARCA_BOYUTU), b''):
+                h.update(parca)
+                hedef.write(parca)
+        ozet = h.hexdigest()
+        if ozetler:
+            ozetler.ekle(source_path, st, ozet)
+        hedef_path = blob_yolu(ozet)
+        if os.path.exists(hedef_path):
+            os.utime(hedef_path)
+            return ozet, False
+        os.replace(gecici_path, hedef_path)
+        return ozet, True
+    finally:
+        if os.path.exists(gecici_path):
+            os.remove(gecici_path)
+
+
+def yedek_ozetleri(zip_path):
+    """Yedek arşivinin referansladığı fotoğraf özetleri"""
+    with zipfile.ZipFile(zip_path, 'r') as zipf:
+        with zipf.open('backup.json') as f:
+            photo_info = json.load(f).get('photo_info', [])
+    return {info['sha256'] for info in photo_info if info.get('sha256')}
+
+
+def kullanilmayan_bloblari_temizle(backup_dir):
+    """
+    Hiçbir yedeğin referanslamadığı blob'ları siler, silinen blob sayısını döndürür
+    Okunamayan bir yedek varsa güvenli tarafta kalınır ve hiçbir şey silinmez.
+    """
+    kullanilan = set()
+    for filename in os.listdir(backup_dir):
+        if not filename.endswith('.zip'):
+            continue
+        try:
+            kullanilan |= yedek_ozetleri(os.path.join(backup_dir, filename))
+        except Exception as e:
+            logger.warning(f"{filename} okunamadı, blob temizliği atlandı: {e}")
+            return 0
+
+    silinen = 0
+    sinir = time.time() - TEMIZLIK_KORUMA_SURESI
+    for ozet in os.listdir(blob_dizini()):
+        if ozet == OZET_ONBELLEGI or ozet in kullanilan or len(ozet) != 64:
+            continue
+        if os.path.getmtime(blob_yolu(ozet)) > sinir:
+            continue
+        os.remove(blob_yolu(ozet))
+        silinen += 1
+    if silinen:
+        logger.info(f"{silinen} kullanılmayan blob silindi")
+    return silinen
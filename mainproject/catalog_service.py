@@ -0,0 +1,308 @@
+"""
+Yedek kataloğu
+media/backups/katalog.json her yedeğin türünü, tabanını, tarihini, boyutunu,
+satır sayılarını ve son doğrulama sonucunu tutar; yedek listeleri dizini
+taramak (os.listdir + stat) yerine bu indeksten okunur. Katalog veritabanında
+tutulmaz çünkü geri yükleme veritabanı dosyasını değiştirir.
+
+Saklama politikası: son N günün, N haftanın ve N ayın en yeni yedekleri tutulur
+(haftalık/aylık yalnızca tam yedeklerden seçilir), toplam boyut disk bütçesini
+aşarsa en eski yedekler bağımlı fark yedekleriyle birlikte silinir.
+"""
+import os
+import json
+import logging
+import threading
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import blob_service
+
+try:
+    import fcntl
+except ImportError:  # Windows - yalnızca süreç içi kilit
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+KATALOG_DOSYASI = 'katalog.json'
+KILIT_DOSYASI = 'katalog.lock'
+MANIFEST_UYESI = 'manifest.json'
+
+_kilit = threading.Lock()
+
+
+def _yedek_dizini():
+    backup_dir = os.path.join(settings.MEDIA_ROOT, 'backups')
+    os.makedirs(backup_dir, exist_ok=True)
+    return backup_dir
+
+
+def _katalog_yolu():
+    return os.path.join(_yedek_dizini(), KATALOG_DOSYASI)
+
+
+def saklama_politikasi():
+    """
+    settings.YEDEK_SAKLA_GUNLUK / _HAFTALIK / _AYLIK: tutulacak dönem sayıları
+    settings.YEDEK_DISK_BUTCESI_MB: yedeklerin toplam boyut sınırı (None: sınırsız)
+    """
+    butce = getattr(settings, 'YEDEK_DISK_BUTCESI_MB', None)
+    return {
+        'gunluk': getattr(settings, 'YEDEK_SAKLA_GUNLUK', 7),
+        'haftalik': getattr(settings, 'YEDEK_SAKLA_HAFTALIK', 4),
+        'aylik': getattr(settings, 'YEDEK_SAKLA_AYLIK', 6),
+        'disk_butcesi': butce * 1024 * 1024 if butce else None,
+    }
+
+
+def arsiv_kaydi(zip_path):
+    """Yedek arşivinin katalog kaydı - yalnızca manifest ve backup.json başlığı okunur"""
+    filename = os.path.basename(zip_path)
+    kayit = {
+        'filename': filename,
+        'tip': 'fark' if filename.startswith('diff_') else 'tam',
+        'base': None,
+        'date': None,
+        'size': os.path.getsize(zip_path),
+        'satir_sayilari': None,
+        'toplam_satir': None,
+        'dogrulama': None,
+    }
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zipf:
+            if MANIFEST_UYESI in zipf.namelist():
+                with zipf.open(MANIFEST_UYESI) as f:
+                    manifest = json.load(f)
+                kayit['satir_sayilari'] = manifest['satir_sayilari']
+                kayit['toplam_satir'] = sum(manifest['satir_sayilari'].values())
+            with zipf.open('backup.json') as f:
+                backup_data = json.load(f)
+        kayit['tip'] = 'fark' if backup_data.get('backup_type') == 'fark' else 'tam'
+        kayit['base'] = backup_data.get('base')
+        kayit['date'] = backup_data.get('backup_date')
+    except Exception as e:
+        logger.warning(f"{filename} kataloğa eklenirken okunamadı: {e}")
+    if not kayit['date']:
+        kayit['date'] = datetime.fromtimestamp(os.path.getmtime(zip_path), tz=dt_timezone.utc).isoformat()
+    return kayit
+
+
+def _tara():
+    """Kataloğu yedek dizinindeki .zip arşivlerinden oluşturur (eski .json dışa aktarımları atlanır)"""
+    backup_dir = _yedek_dizini()
+    return {
+        filename: arsiv_kaydi(os.path.join(backup_dir, filename))
+        for filename in os.listdir(backup_dir)
+        if filename.endswith('.zip') and filename.startswith(('backup_', 'diff_'))
+    }
+
+
+def _oku():
+    try:
+        with open(_katalog_yolu(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _yaz(kayitlar):
+    path = _katalog_yolu()
+    gecici_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(gecici_path, 'w', encoding='utf-8') as f:
+        json.dump(kayitlar, f, ensure_ascii=False)
+    os.replace(gecici_path, path)
+
+
+@contextmanager
+def _katalog_kilidi():
+    """
+    Kataloğun oku-değiştir-yaz adımlarını tüm worker süreçlerine karşı kilitler
+    Aynı süreçteki iş parçacıkları _kilit'te, diğer süreçler katalog.lock
+    üzerindeki flock'ta bekler; kilit dosya kapanınca bırakılır.
+    """
+    with _kilit, open(os.path.join(_yedek_dizini(), KILIT_DOSYASI), 'a') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _guncelle(islem):
+    """Kataloğu kilit altında okur, islem(kayitlar) ile değiştirir ve yazar"""
+    with _katalog_kilidi():
+        kayitlar = _oku()
+        if kayitlar is None:
+            kayitlar = _tara()
+        sonuc = islem(kayitlar)
+        _yaz(kayitlar)
+    return sonuc
+
+
+def _katalog():
+    kayitlar = _oku()
+    if kayitlar is None:
+        # İlk kullanım veya bozuk katalog - dizin bir kez taranır
+        kayitlar = _guncelle(lambda k: k)
+    return kayitlar
+
+
+def yeniden_olustur():
+    """Kataloğu dizini tarayarak baştan yazar, yedek sayısını döndürür"""
+    with _katalog_kilidi():
+        kayitlar = _tara()
+        _yaz(kayitlar)
+    logger.info(f"Yedek kataloğu yeniden oluşturuldu: {len(kayitlar)} yedek")
+    return len(kayitlar)
+
+
+def ekle(zip_path):
+    """Yeni yazılan yedeği kataloğa ekler"""
+    kayit = arsiv_kaydi(zip_path)
+    _guncelle(lambda kayitlar: kayitlar.__setitem__(kayit['filename'], kayit))
+    return kayit
+
+
+def sil(filename):
+    _guncelle(lambda kayitlar: kayitlar.pop(filename, None))
+
+
+def dogrulama_kaydet(filename, rapor):
+    """verify_service raporunun özetini yedeğin katalog kaydına yazar"""
+    def islem(kayitlar):
+        if filename in kayitlar:
+            kayitlar[filename]['dogrulama'] = {
+                'gecerli': rapor['gecerli'],
+                'hata_sayisi': len(rapor['hatalar']),
+                'tarih': timezone.now().isoformat(),
+            }
+    _guncelle(islem)
+
+
+def _tarih(kayit):
+    tarih = parse_datetime(kayit['date'])
+    # Saat dilimi olmadan yazılmış eski yedek tarihleri
+    return tarih if timezone.is_aware(tarih) else timezone.make_aware(tarih)
+
+
+def yedekler():
+    """Katalogdaki yedekler, yeniden eskiye - şablonlar için tarih datetime olarak"""
+    sirali = sorted(_katalog().values(), key=_tarih, reverse=True)
+    return [dict(kayit, date=_tarih(kayit), fark=kayit['tip'] == 'fark') for kayit in sirali]
+
+
+def toplam_boyut():
+    return sum(kayit['size'] for kayit in _katalog().values())
+
+
+def son_yedek_adi():
+    """En yeni yedeğin adı (tam veya fark), hiç yedek yoksa None - dosyası silinmiş kayıtlar atlanır"""
+    backup_dir = _yedek_dizini()
+    kayitlar = {
+        filename: kayit for filename, kayit in _katalog().items()
+        if os.path.isfile(os.path.join(backup_dir, filename))
+    }
+    return max(kayitlar, key=lambda filename: _tarih(kayitlar[filename])) if kayitlar else None
+
+
+def bagimlilar(filename, kayitlar=None):
+    """Verilen yedeği doğrudan taban alan fark yedeklerinin adları"""
+    kayitlar = kayitlar if kayitlar is not None else _katalog()
+    return sorted(f for f, kayit in kayitlar.items() if kayit['tip'] == 'fark' and kayit['base'] == filename)
+
+
+def _zincir(filename, kayitlar):
+    """Yedeği geri yüklemek için gereken yedekler (kendisi ve taban zinciri)"""
+    zincir = set()
+    while filename in kayitlar and filename not in zincir:
+        zincir.add(filename)
+        filename = kayitlar[filename]['base'] if kayitlar[filename]['tip'] == 'fark' else None
+    return zincir
+
+
+def _bagimli_kapanisi(filename, kayitlar):
+    """Yedek ve onu doğrudan veya dolaylı taban alan tüm fark yedekleri"""
+    kapanis, bekleyen = set(), [filename]
+    while bekleyen:
+        f = bekleyen.pop()
+        if f not in kapanis:
+            kapanis.add(f)
+            bekleyen.extend(bagimlilar(f, kayitlar))
+    return kapanis
+
+
+def saklanacaklar(kayitlar, politika=None):
+    """Saklama politikasına göre tutulacak yedeklerin adları"""
+    politika = politika or saklama_politikasi()
+    sirali = sorted(kayitlar.values(), key=_tarih, reverse=True)
+    if not sirali:
+        return set()
+
+    sakla = {sirali[0]['filename']}
+    donemler = (
+        (lambda t: t.date(), politika['gunluk'], False),
+        (lambda t: tuple(t.isocalendar())[:2], politika['haftalik'], True),
+        (lambda t: (t.year, t.month), politika['aylik'], True),
+    )
+    for donem_anahtari, sinir, yalniz_tam in donemler:
+        gorulen = set()
+        for kayit in sirali:
+            if yalniz_tam and kayit['tip'] != 'tam':
+                continue
+            donem = donem_anahtari(timezone.localtime(_tarih(kayit)))
+            if donem in gorulen:
+                continue
+            if len(gorulen) >= sinir:
+                break
+            gorulen.add(donem)
+            sakla.add(kayit['filename'])
+
+    # Tutulan fark yedeklerinin tabanları da tutulmalı
+    for filename in list(sakla):
+        sakla |= _zincir(filename, kayitlar)
+
+    butce = politika['disk_butcesi']
+    korunan = _zincir(sirali[0]['filename'], kayitlar)
+    while butce and sum(kayitlar[f]['size'] for f in sakla) > butce:
+        adaylar = [k['filename'] for k in reversed(sirali)
+                   if k['filename'] in sakla and k['filename'] not in korunan]
+        if not adaylar:
+            logger.warning('En yeni yedek zinciri tek başına disk bütçesini aşıyor')
+            break
+        sakla -= _bagimli_kapanisi(adaylar[0], kayitlar)
+    return sakla
+
+
+def temizle(dene=False):
+    """
+    Saklama politikası dışında kalan yedekleri siler, silinenlerin adlarını döndürür
+    dene=True ise hiçbir şey silinmez, yalnızca silinecekler döndürülür.
+    """
+    kayitlar = _katalog()
+    silinecek = sorted(set(kayitlar) - saklanacaklar(kayitlar))
+    if dene or not silinecek:
+        return silinecek
+
+    backup_dir = _yedek_dizini()
+    for filename in silinecek:
+        try:
+            os.remove(os.path.join(backup_dir, filename))
+        except FileNotFoundError:
+            pass
+        sil(filename)
+    logger.info(f"Saklama politikası: {len(silinecek)} yedek silindi")
+    blob_service.kullanilmayan_bloblari_temizle(backup_dir)
+    return silinecek
+
+
+def otomatik_temizle():
+    """settings.YEDEK_OTOMATIK_TEMIZLIK açıksa yeni yedekten sonra saklama politikasını uygular"""
+    if getattr(settings, 'YEDEK_OTOMATIK_TEMIZLIK', False):
+        try:
+            temizle()
+        except Exception as e:
+            logger.warning(f"Otomatik yedek temizliği başarısız: {e}")
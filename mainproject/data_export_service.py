@@ -0,0 +1,126 @@
+"""
+Veri dışa aktarım servisi
+Not defteri tablolarını (öğrenciler, sınav sonuçları, ezber kayıtları, Elif Ba
+durumları, ders notları) raporlama için CSV veya NDJSON olarak akıtır. Satırlar
+values_list + iterator(chunk_size=...) ile parça parça okunur, model örneği
+oluşturulmaz ve bellek kullanımı satır sayısından bağımsızdır.
+
+Sayfalama anahtar (keyset) tabanlıdır: satırlar pk sırasıyla gelir, sonraki
+sayfa ?after=<son pk> ile istenir. since= filtresi tablonun zaman alanlarına
+uygulanır; değişiklik zamanı tutmayan tablolarda (sınav, ezber, Elif Ba) bu
+alanlar olay tarihleridir (sınav, başlama, bitiş tarihi).
+"""
+import csv
+import json
+import datetime
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import DersNotu, ElifBaEzberDurumu, EzberKaydi, Ogrenci, SinavSonucu
+
+logger = logging.getLogger(__name__)
+
+# Satırlar veritabanından bu boyutta parçalar halinde okunur
+SATIR_PARCASI = 2000
+
+# Çıktı bu kadar satır biriktirilip tek parça olarak gönderilir
+GONDERIM_SATIRI = 500
+
+BICIMLER = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Dışa aktarılabilen tablolar: URL adı -> (model, since= filtresinin uygulandığı alanlar)
+TABLOLAR = {
+    'ogrenciler': (Ogrenci, ('son_guncelleme',)),
+    'sinav-sonuclari': (SinavSonucu, ('tarih',)),
+    'ezber-kayitlari': (EzberKaydi, ('baslama_tarihi', 'bitis_tarihi')),
+    'elifba-durumlari': (ElifBaEzberDurumu, ('baslama_tarihi', 'bitis_tarihi', 'tamamlandi_tarihi')),
+    'ders-notlari': (DersNotu, ('guncelleme_tarihi',)),
+}
+
+
+def sutunlar(model):
+    """Dışa aktarılan sütunlar - somut alanlar, ilişkiler için <alan>_id"""
+    return [alan.attname for alan in model._meta.concrete_fields]
+
+
+def zamani_coz(deger):
+    """since= değerini aware datetime'a çevirir (tarih veya ISO 8601 tarih-saat)"""
+    zaman = parse_datetime(deger)
+    if zaman is None:
+        tarih = parse_date(deger)
+        if tarih is None:
+            raise ValueError(f'Geçersiz since değeri: {deger}')
+        zaman = datetime.datetime.combine(tarih, datetime.time.min)
+    return zaman if timezone.is_aware(zaman) else timezone.make_aware(zaman)
+
+
+def sorgu(tablo, since=None, after=None):
+    """Tablonun pk sırasındaki satır sorgusu; since alanlardan herhangi birine, after pk'ye uygulanır"""
+    if tablo not in TABLOLAR:
+        raise LookupError(f'Bilinmeyen tablo: {tablo}')
+    model, zaman_alanlari = TABLOLAR[tablo]
+    qs = model.objects.order_by('pk')
+    if since is not None:
+        kosul = Q()
+        for alan in zaman_alanlari:
+            tarih_mi = model._meta.get_field(alan).get_internal_type() == 'DateField'
+            kosul |= Q(**{f'{alan}__gte': timezone.localdate(since) if tarih_mi else since})
+        qs = qs.filter(kosul)
+    if after is not None:
+        qs = qs.filter(pk__gt=after)
+    return qs
+
+
+def sonraki_imlec(qs, limit):
+    """limit satırlık sayfadan sonra satır kalıyorsa sonraki ?after= değeri, yoksa None"""
+    pkler = list(qs.values_list('pk', flat=True)[limit - 1:limit + 1])
+    return pkler[0] if len(pkler) == 2 else None
+
+
+def _csv_parcalari(satirlar, basliklar):
+    class _Tampon:
+        def write(self, deger):
+            return deger
+
+    tampon = []
+    yazici = csv.writer(_Tampon())
+    tampon.append(yazici.writerow(basliklar))
+    for satir in satirlar:
+        tampon.append(yazici.writerow([
+            deger.isoformat() if isinstance(deger, (datetime.date, datetime.datetime)) else deger
+            for deger in satir
+        ]))
+        if len(tampon) >= GONDERIM_SATIRI:
+            yield ''.join(tampon)
+            tampon = []
+    if tampon:
+        yield ''.join(tampon)
+
+
+def _ndjson_parcalari(satirlar, basliklar):
+    tampon = []
+    for satir in satirlar:
+        tampon.append(json.dumps(dict(zip(basliklar, satir)), cls=DjangoJSONEncoder, ensure_ascii=False))
+        if len(tampon) >= GONDERIM_SATIRI:
+            yield '\n'.join(tampon) + '\n'
+            tampon = []
+    if tampon:
+        yield '\n'.join(tampon) + '\n'
+
+
+def akis(qs, bicim, limit=None):
+    """Sorgunun satırlarını seçilen biçimde metin parçaları olarak üretir"""
+    basliklar = sutunlar(qs.model)
+    if limit:
+        qs = qs[:limit]
+    satirlar = qs.values_list(*basliklar).iterator(chunk_size=SATIR_PARCASI)
+    if bicim == 'csv':
+        return _csv_parcalari(satirlar, basliklar)
+    return _ndjson_parcalari(satirlar, basliklar)
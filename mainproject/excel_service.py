@@ -0,0 +1,304 @@
+"""
+Excel dışa aktarım servisi
+Listeler openpyxl'in write_only kipinde yazılır: satırlar bellekte tutulmadan
+geçici XML dosyalarına akıtılır, hücre biçimleri her hücrede yeni nesne
+oluşturmak yerine çalışma kitabına bir kez eklenen adlandırılmış stillerden
+gelir. Bitmiş dosya geçici dosyadan parça parça yanıta akıtılır.
+
+Öğrenci detay raporu veritabanından bağımsız bir fonksiyonla (ogrenci_raporu_xlsx)
+oluşturulur; tek rapor isteği ve toplu rapor işi aynı kodu kullanır.
+"""
+import tempfile
+import logging
+from io import BytesIO
+
+from django.db.models import Prefetch
+from django.http import FileResponse
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle
+
+from . import sinif_istatistik_service, stats_service
+from .models import EzberKaydi, Ogrenci, SinavSonucu
+from .stats_service import OgrenciIstatistikleri
+
+logger = logging.getLogger(__name__)
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Sorgu satırları bu boyutta parçalar halinde okunur
+SATIR_PARCASI = 2000
+
+# Elif Ba dışındaki ezber sayısı (sabit)
+TOPLAM_EZBER = 13
+
+
+def stilleri_ekle(wb):
+    """Çalışma kitabına 'baslik' ve 'hucre' adlandırılmış stillerini ekler"""
+    wb.add_named_style(NamedStyle(name='baslik', font=Font(bold=True), alignment=Alignment(horizontal='center')))
+    wb.add_named_style(NamedStyle(name='hucre', alignment=Alignment(horizontal='center')))
+
+
+def satir(ws, degerler, stil='hucre'):
+    """write_only sayfaya tüm hücreleri aynı adlandırılmış stille yazar"""
+    hucreler = []
+    for deger in degerler:
+        hucre = WriteOnlyCell(ws, value=deger)
+        hucre.style = stil
+        hucreler.append(hucre)
+    ws.append(hucreler)
+
+
+def calisma_kitabi():
+    """Stilleri eklenmiş boş write_only çalışma kitabı"""
+    wb = Workbook(write_only=True)
+    stilleri_ekle(wb)
+    return wb
+
+
+def xlsx_yaniti(wb, filename):
+    """Çalışma kitabını geçici dosyaya kaydeder ve dosyayı indirme olarak akıtır"""
+    f = tempfile.TemporaryFile()
+    wb.save(f)
+    f.seek(0)
+    return FileResponse(f, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def ogrenci_listesi_sorgusu(ogrenciler):
+    """Öğrenci listesinin satırları - ortalama ve tamamlanan ezber özet tablosundan, tek sorguda"""
+    return stats_service.istatistik_ekle(ogrenciler).values_list(
+        'ad_soyad', 'ders_ortalamasi', 'tamamlanan_ezber_sayisi', 'seviye', 'kayit_tarihi', 'ozel_notlar'
+    )
+
+
+def ogrenci_listesi_excel(ogrenciler):
+    """Öğrenci listesi çalışma kitabını oluşturur - öğrenci sayısından bağımsız tek sorgu"""
+    wb = calisma_kitabi()
+    ws = wb.create_sheet("Öğrenci Listesi")
+    for harf, genislik in zip('ABCDEFG', [30, 20, 20, 15, 15, 15, 40]):
+        ws.column_dimensions[harf].width = genislik
+
+    satir(ws, ['Öğrenci Adı-Soyadı', 'Sınav Ortalaması', 'Tamamlanan Ezber', 'Toplam Ezber',
+               'Seviye', 'Kayıt Tarihi', 'Özel Notlar'], 'baslik')
+    seviyeler = dict(Ogrenci.SEVIYE_CHOICES)
+    for ad_soyad, ortalama, tamamlanan, seviye, kayit_tarihi, ozel_notlar in (
+            ogrenci_listesi_sorgusu(ogrenciler).iterator(chunk_size=SATIR_PARCASI)):
+        satir(ws, [
+            ad_soyad,
+            ortalama,
+            tamamlanan,
+            TOPLAM_EZBER,
+            seviyeler.get(seviye, seviye),
+            kayit_tarihi.strftime("%d.%m.%Y"),
+            ozel_notlar or "",
+        ])
+    return wb
+
+
+def sinav_durumu(puan):
+    if puan >= 85:
+        return "Çok İyi"
+    elif puan >= 70:
+        return "İyi"
+    elif puan >= 50:
+        return "Orta"
+    return "Zayıf"
+
+
+def sinif_ortalamalari():
+    """Detay raporlarındaki sınıf geneli değerler - toplu dışa aktarımda bir kez hesaplanır"""
+    sinif = sinif_istatistik_service.sinif_istatistikleri()
+    return {
+        'sinav_ortalamasi': sinif['sinif_ortalamasi'],
+        'ezber_ortalamasi': sinif['ezber_ortalamasi'],
+        'toplam_ezber': sinif['toplam_ezber_sayisi'],
+        'bugun': timezone.now().date(),
+    }
+
+
+def rapor_ogrencileri(ogrenciler):
+    """Detay raporu için sınav ve ezber kayıtları önceden yüklenmiş öğrenciler (öğrenci sayısından bağımsız 3 sorgu)"""
+    return ogrenciler.prefetch_related(
+        Prefetch('sinavsonucu_set', queryset=SinavSonucu.objects.select_related('ders').order_by('pk')),
+        Prefetch('ezberkaydi_set', queryset=EzberKaydi.objects.select_related('sure').order_by('sure__sira')),
+    )
+
+
+def ogrenci_rapor_verisi(ogrenci):
+    """
+    Detay raporunun ihtiyaç duyduğu veriler, düz Python değerleri olarak
+    Model örnekleri yerine bu sözlük rapor süreçlerine (pickle ile) gönderilir.
+    """
+    return {
+        'ad_soyad': ogrenci.ad_soyad,
+        'seviye': ogrenci.get_seviye_display(),
+        'kayit_tarihi': ogrenci.kayit_tarihi,
+        'ozel_notlar': ogrenci.ozel_notlar,
+        'sinavlar': [
+            (sinav.ders.get_tur_display(), sinav.get_sinav_tipi_display(), sinav.puan,
+             sinav.tarih, sinav.aciklama)
+            for sinav in ogrenci.sinavsonucu_set.all()
+        ],
+        'ezberler': [
+            (ezber.sure.sira, ezber.sure.ad, ezber.durum, ezber.get_durum_display(),
+             ezber.baslama_tarihi, ezber.bitis_tarihi, ezber.yorum)
+            for ezber in ogrenci.ezberkaydi_set.all()
+        ],
+    }
+
+
+def _tarih(tarih):
+    return tarih.strftime("%d.%m.%Y") if tarih else ''
+
+
+def ogrenci_raporu_xlsx(veri, sinif):
+    """
+    4 sayfalı öğrenci detay raporunu oluşturur ve .xlsx baytlarını döndürür
+    Veritabanına erişmez; toplu dışa aktarımda ayrı süreçlerde çalıştırılır.
+    """
+    wb = Workbook()
+
+    # 1. Öğrenci Bilgileri sayfası
+    ws_info = wb.active
+    ws_info.title = "Öğrenci Bilgileri"
+
+    ws_info.merge_cells('A1:B1')
+    title_cell = ws_info['A1']
+    title_cell.value = f"{veri['ad_soyad']} - Öğrenci Detay Raporu"
+    title_cell.font = Font(bold=True, size=16)
+    title_cell.alignment = Alignment(horizontal='center')
+
+    ogrenci_bilgileri = [
+        ['Ad-Soyad', veri['ad_soyad']],
+        ['Seviye', veri['seviye']],
+        ['Kayıt Tarihi', _tarih(veri['kayit_tarihi'])],
+        ['Kursta Geçen Süre', f"{(sinif['bugun'] - veri['kayit_tarihi']).days} gün"],
+        ['Özel Notlar', veri['ozel_notlar'] or ""]
+    ]
+    for row_num, bilgi in enumerate(ogrenci_bilgileri, 3):
+        ws_info.cell(row=row_num, column=1, value=bilgi[0]).font = Font(bold=True)
+        ws_info.cell(row=row_num, column=2, value=bilgi[1])
+
+    # 2. Sınav Sonuçları sayfası
+    ws_sinav = wb.create_sheet(title="Sınav Sonuçları")
+    ws_sinav.merge_cells('A1:F1')
+    title_cell = ws_sinav['A1']
+    title_cell.value = "Sınav Sonuçları"
+    title_cell.font = Font(bold=True, size=14)
+    title_cell.alignment = Alignment(horizontal='center')
+
+    for col_num, column_title in enumerate(['Ders', 'Sınav Tipi', 'Puan', 'Tarih', 'Açıklama', 'Durum'], 1):
+        cell = ws_sinav.cell(row=3, column=col_num, value=column_title)
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal='center')
+
+    # İstatistikler satırlar yazılırken aynı geçişte toplanır
+    istatistik = OgrenciIstatistikleri()
+    row_num = 4
+    for ders, sinav_tipi, puan, tarih, aciklama in veri['sinavlar']:
+        istatistik.sinav_ekle(puan)
+        row = [ders, sinav_tipi, puan, _tarih(tarih), aciklama or '', sinav_durumu(puan)]
+        for col_num, cell_value in enumerate(row, 1):
+            ws_sinav.cell(row=row_num, column=col_num, value=cell_value).alignment = Alignment(horizontal='center')
+        row_num += 1
+
+    sinav_ortalamasi = istatistik.sinav_ortalamasi
+    ws_sinav.cell(row=row_num+2, column=1, value="İstatistikler").font = Font(bold=True)
+    ws_sinav.cell(row=row_num+3, column=1, value="Ortalama Puan")
+    ws_sinav.cell(row=row_num+3, column=2, value=sinav_ortalamasi)
+    ws_sinav.cell(row=row_num+4, column=1, value="En Yüksek Puan")
+    ws_sinav.cell(row=row_num+4, column=2, value=istatistik.en_yuksek_puan or 0)
+    ws_sinav.cell(row=row_num+5, column=1, value="En Düşük Puan")
+    ws_sinav.cell(row=row_num+5, column=2, value=istatistik.en_dusuk_puan or 0)
+
+    # 3. Ezber Kayıtları sayfası
+    ws_ezber = wb.create_sheet(title="Ezber Kayıtları")
+    ws_ezber.merge_cells('A1:G1')
+    title_cell = ws_ezber['A1']
+    title_cell.value = "Ezber Kayıtları"
+    title_cell.font = Font(bold=True, size=14)
+    title_cell.alignment = Alignment(horizontal='center')
+
+    columns = ['Sıra', 'Sure', 'Durum', 'Başlama Tarihi', 'Bitiş Tarihi', 'Süre (Gün)', 'Yorum']
+    for col_num, column_title in enumerate(columns, 1):
+        cell = ws_ezber.cell(row=3, column=col_num, value=column_title)
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal='center')
+
+    row_num = 4
+    for sira, ad, durum, durum_adi, baslama, bitis, yorum in veri['ezberler']:
+        sure_gun = istatistik.ezber_ekle(durum, baslama, bitis)
+        row = [sira, ad, durum_adi, _tarih(baslama), _tarih(bitis), sure_gun, yorum or '']
+        for col_num, cell_value in enumerate(row, 1):
+            ws_ezber.cell(row=row_num, column=col_num, value=cell_value).alignment = Alignment(horizontal='center')
+        row_num += 1
+
+    tamamlanan_ezberler = istatistik.tamamlanan_ezber
+    devam_eden_ezberler = istatistik.devam_eden_ezber
+    toplam_ezber = sinif['toplam_ezber']
+    ortalama_ezber_suresi = istatistik.ortalama_ezber_suresi
+
+    ws_ezber.cell(row=row_num+2, column=1, value="İstatistikler").font = Font(bold=True)
+    ws_ezber.cell(row=row_num+3, column=1, value="Tamamlanan Ezber")
+    ws_ezber.cell(row=row_num+3, column=2, value=tamamlanan_ezberler)
+    ws_ezber.cell(row=row_num+4, column=1, value="Devam Eden Ezber")
+    ws_ezber.cell(row=row_num+4, column=2, value=devam_eden_ezberler)
+    ws_ezber.cell(row=row_num+5, column=1, value="Toplam Ezber")
+    ws_ezber.cell(row=row_num+5, column=2, value=toplam_ezber)
+    ws_ezber.cell(row=row_num+6, column=1, value="Tamamlama Oranı")
+    ws_ezber.cell(row=row_num+6, column=2, value=f"{(tamamlanan_ezberler/toplam_ezber*100):.1f}%" if toplam_ezber > 0 else "0%")
+    ws_ezber.cell(row=row_num+7, column=1, value="Ortalama Ezber Süresi (Gün)")
+    ws_ezber.cell(row=row_num+7, column=2, value=f"{ortalama_ezber_suresi:.1f}")
+
+    # 4. Performans Analizi sayfası
+    ws_analiz = wb.create_sheet(title="Performans Analizi")
+    ws_analiz.merge_cells('A1:B1')
+    title_cell = ws_analiz['A1']
+    title_cell.value = "Performans Analizi"
+    title_cell.font = Font(bold=True, size=14)
+    title_cell.alignment = Alignment(horizontal='center')
+
+    sinif_ortalamasi = sinif['sinav_ortalamasi']
+    sinif_ezber_ortalamasi = sinif['ezber_ortalamasi']
+    analiz_verileri = [
+        ['Öğrenci Ortalaması', sinav_ortalamasi],
+        ['Sınıf Ortalaması', sinif_ortalamasi],
+        ['Fark', sinav_ortalamasi - sinif_ortalamasi],
+        ['', ''],
+        ['Tamamlanan Ezber', tamamlanan_ezberler],
+        ['Sınıf Ortalaması (Ezber)', sinif_ezber_ortalamasi],
+        ['Fark', tamamlanan_ezberler - sinif_ezber_ortalamasi],
+        ['', ''],
+        ['Önerilen Çalışma Süresi',
+         '8 saat/gün' if sinav_ortalamasi < 50 else
+         '6 saat/gün' if sinav_ortalamasi < 60 else
+         '4 saat/gün' if sinav_ortalamasi < 70 else
+         '2 saat/gün' if sinav_ortalamasi < 80 else
+         '1 saat/gün'],
+        ['Hafızlık Potansiyeli',
+         'Yüksek' if tamamlanan_ezberler >= 10 else
+         'Orta' if tamamlanan_ezberler >= 7 else
+         'Düşük' if tamamlanan_ezberler >= 4 else
+         'Belirsiz']
+    ]
+    for row_num, veri_satiri in enumerate(analiz_verileri, 3):
+        cell = ws_analiz.cell(row=row_num, column=1, value=veri_satiri[0])
+        if veri_satiri[0]:  # Başlık satırları için
+            cell.font = Font(bold=True)
+        ws_analiz.cell(row=row_num, column=2, value=veri_satiri[1])
+
+    # Sütun genişliklerini manuel olarak ayarla (MergedCell hatasını önlemek için)
+    column_widths = {
+        ws_info: {'A': 20, 'B': 30},
+        ws_sinav: {'A': 15, 'B': 15, 'C': 10, 'D': 12, 'E': 20, 'F': 15},
+        ws_ezber: {'A': 8, 'B': 20, 'C': 15, 'D': 15, 'E': 15, 'F': 12, 'G': 30},
+        ws_analiz: {'A': 25, 'B': 20}
+    }
+    for ws, widths in column_widths.items():
+        for col_letter, width in widths.items():
+            ws.column_dimensions[col_letter].width = width
+
+    cikti = BytesIO()
+    wb.save(cikti)
+    return cikti.getvalue()
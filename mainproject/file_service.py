@@ -0,0 +1,196 @@
+"""
+Dosya sunma servisi
+Yedek ve medya dosyaları belleğe okunmadan FileResponse ile sabit boyutlu
+parçalar halinde akıtılır. Range/If-Range ile yarıda kalan indirmeler devam
+ettirilebilir; ETag ve Last-Modified ile değişmemiş dosyalar 304 döner.
+settings.DOSYA_SUNUCU_YONLENDIRME ayarlanmışsa gövde hiç okunmaz, dosya
+X-Accel-Redirect (nginx) veya X-Sendfile (Apache/lighttpd) başlığıyla ön
+sunucuya devredilir.
+"""
+import os
+import re
+import mimetypes
+import logging
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, Http404
+from django.urls import re_path
+from django.utils.cache import get_conditional_response
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+logger = logging.getLogger(__name__)
+
+PARCA_BOYUTU = 64 * 1024
+
+ARALIK_DESENI = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# MEDIA_ROOT altında olup medya yolundan yalnızca yöneticilere (staff) sunulan dizinler
+GIZLI_MEDYA_DIZINLERI = ('backups', 'temp_restore', 'emergency_backup', 'database', 'exports')
+
+
+class _DosyaAraligi:
+    """Açık dosyanın [baslangic, baslangic + uzunluk) aralığını okuyan dosya benzeri nesne"""
+
+    def __init__(self, f, baslangic, uzunluk):
+        self.f = f
+        self.kalan = uzunluk
+        f.seek(baslangic)
+
+    def read(self, boyut=-1):
+        if self.kalan <= 0:
+            return b''
+        boyut = self.kalan if boyut < 0 else min(boyut, self.kalan)
+        veri = self.f.read(boyut)
+        self.kalan -= len(veri)
+        return veri
+
+    def close(self):
+        self.f.close()
+
+
+def dosya_etiketi(stat):
+    """Dosyanın değiştirilme zamanı ve boyutundan üretilen ETag"""
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def araligi_coz(aralik, boyut):
+    """
+    Range başlığını (baslangic, bitis) olarak çözer (bitis dahil)
+    Başlık yoksa, çoklu aralıksa veya çözülemezse None (tüm dosya gönderilir);
+    aralık dosyanın dışındaysa ValueError.
+    """
+    eslesme = ARALIK_DESENI.match(aralik.replace(' ', '')) if aralik else None
+    if not eslesme or eslesme.group(1) == eslesme.group(2) == '':
+        return None
+    bas, son = eslesme.groups()
+    if bas == '':
+        # bytes=-N: son N bayt
+        baslangic, bitis = max(boyut - int(son), 0), boyut - 1
+    else:
+        baslangic = int(bas)
+        bitis = min(int(son), boyut - 1) if son else boyut - 1
+    if baslangic >= boyut or baslangic > bitis:
+        raise ValueError('Aralık dosyanın dışında')
+    return baslangic, bitis
+
+
+def _if_range_gecerli_mi(request, etag, mtime):
+    """If-Range yoksa veya dosyanın güncel ETag/Last-Modified değerini taşıyorsa True"""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    tarih = parse_http_date_safe(if_range)
+    return tarih is not None and int(mtime) <= tarih
+
+
+def _on_sunucu_yolu(path):
+    """
+    settings.DOSYA_SUNUCU_ONEKLERI: {yerel dizin: ön sunucudaki iç URL/yol}
+    Dosya bu dizinlerden birinin altındaysa ön sunucudaki yolunu döndürür.
+    """
+    onekler = getattr(settings, 'DOSYA_SUNUCU_ONEKLERI', {settings.MEDIA_ROOT: '/protected-media/'})
+    gercek = os.path.realpath(path)
+    for dizin, onek in onekler.items():
+        dizin = os.path.realpath(dizin)
+        if gercek.startswith(dizin + os.sep):
+            return onek.rstrip('/') + '/' + os.path.relpath(gercek, dizin).replace(os.sep, '/')
+    return None
+
+
+def dosya_yaniti(request, path, content_type=None, as_attachment=False, filename=None):
+    """
+    Dosyayı koşullu istek ve Range desteğiyle sunar
+    Yanıt 200 (tüm dosya), 206 (istenen aralık), 304/412 (koşullu istek) veya
+    416 (karşılanamayan aralık) olur. Dosya yoksa FileNotFoundError.
+    """
+    stat = os.stat(path)
+    etag = dosya_etiketi(stat)
+    content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        yonlendirme = getattr(settings, 'DOSYA_SUNUCU_YONLENDIRME', None)
+        on_sunucu_yolu = _on_sunucu_yolu(path) if yonlendirme else None
+        if on_sunucu_yolu:
+            # Range ve gövdeyi ön sunucu karşılar, worker hemen serbest kalır
+            response = HttpResponse(content_type=content_type)
+            if yonlendirme == 'x-accel-redirect':
+                response['X-Accel-Redirect'] = on_sunucu_yolu
+            else:
+                response['X-Sendfile'] = os.path.realpath(path)
+        else:
+            response = _akis_yaniti(request, path, stat, etag, content_type)
+        if as_attachment:
+            response['Content-Disposition'] = f'attachment; filename="{filename or os.path.basename(path)}"'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _akis_yaniti(request, path, stat, etag, content_type):
+    boyut = stat.st_size
+    aralik = None
+    if _if_range_gecerli_mi(request, etag, stat.st_mtime):
+        try:
+            aralik = araligi_coz(request.headers.get('Range'), boyut)
+        except ValueError:
+            response = HttpResponse(status=416, content_type=content_type)
+            response['Content-Range'] = f'bytes */{boyut}'
+            return response
+
+    f = open(path, 'rb')
+    if aralik is None:
+        response = FileResponse(f, content_type=content_type)
+    else:
+        baslangic, bitis = aralik
+        response = FileResponse(_DosyaAraligi(f, baslangic, bitis - baslangic + 1),
+                                status=206, content_type=content_type)
+        response['Content-Length'] = str(bitis - baslangic + 1)
+        response['Content-Range'] = f'bytes {baslangic}-{bitis}/{boyut}'
+    response.block_size = PARCA_BOYUTU
+    return response
+
+
+def gizli_medya_mi(filepath):
+    """
+    Çözülmüş yol MEDIA_ROOT dışında veya gizli dizinlerden birinin altındaysa True
+    Karşılaştırma ham URL yerine normalleştirilmiş gerçek yol üzerinde yapılır;
+    ./, // ve x/../ gibi yazımlar aynı dizine çözülür.
+    """
+    goreli = os.path.relpath(os.path.realpath(filepath), os.path.realpath(settings.MEDIA_ROOT))
+    ilk = goreli.split(os.sep, 1)[0]
+    return ilk == os.pardir or ilk.lower() in GIZLI_MEDYA_DIZINLERI
+
+
+def medya_sun(request, path):
+    """
+    MEDIA_ROOT altındaki dosyaları Range/ETag desteğiyle sunan view
+    Yedekler, geri yükleme yüklemeleri, veritabanı kopyaları ve toplu raporlar
+    yalnızca yönetici (staff) oturumuna sunulur; diğer istemciler 404 alır.
+    """
+    try:
+        filepath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Dosya bulunamadı')
+    if gizli_medya_mi(filepath) and not (request.user.is_active and request.user.is_staff):
+        raise Http404('Dosya bulunamadı')
+    if not os.path.isfile(filepath):
+        raise Http404('Dosya bulunamadı')
+    return dosya_yaniti(request, filepath)
+
+
+def medya_yollari():
+    """
+    static(settings.MEDIA_URL, ...) yerine kullanılan URL kalıpları
+    static() gibi yalnızca DEBUG'da veya settings.MEDYA_DJANGO_ILE_SUNULSUN
+    açıkken eklenir; aksi halde medyayı ön sunucu sunar.
+    """
+    if not (settings.DEBUG or getattr(settings, 'MEDYA_DJANGO_ILE_SUNULSUN', False)):
+        return []
+    return [re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), medya_sun)]
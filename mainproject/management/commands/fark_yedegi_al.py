@@ -0,0 +1,35 @@
+"""
+Son yedekten bu yana değişen satırları içeren fark yedeği alan management command
+Günlük cron işi için uygundur; haftalık/aylık tam yedekle birlikte kullanılır.
+Kullanım: python manage.py fark_yedegi_al [--taban backup_20250101_120000.zip]
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mainproject import backup_service
+
+
+class Command(BaseCommand):
+    help = 'Taban yedekten (varsayılan: son yedek) bu yana değişen verilerin fark yedeğini alır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taban', help='media/backups altındaki taban yedeğin adı')
+
+    def handle(self, *args, **options):
+        taban_path = None
+        if options['taban']:
+            taban_path = os.path.join(backup_service.yedek_dizini(), os.path.basename(options['taban']))
+            if not os.path.exists(taban_path):
+                raise CommandError(f"Taban yedek bulunamadı: {options['taban']}")
+
+        try:
+            sonuc = backup_service.fark_yedegi_olustur(taban_path)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Fark yedeği oluşturuldu: {sonuc['filename']} (taban {sonuc['base']}, "
+            f"{sonuc['degisen']} değişen, {sonuc['silinen']} silinen satır, "
+            f"{sonuc['boyut'] / 1024:.1f} KB, {sonuc['sure']:.2f} sn)"
+        ))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from mainproject.models import Ogrenci, ElifBaEzberi, ElifBaEzberDurumu
+from mainproject import stats_service
 from django.utils import timezone
 import datetime
 import random
@@ -63,6 +64,9 @@ class Command(BaseCommand):
             
             self.stdout.write(f"✓ {ogrenci.ad_soyad}: {tamamlanan_sayi} tamamlandı, {devam_eden_sayi} devam ediyor")
         
+        # queryset.update() sinyal göndermez - özet tablosunu yeniden oluştur
+        stats_service.yeniden_olustur()
+        
         # Genel istatistik
         total_tamamlanan = ElifBaEzberDurumu.objects.filter(durum='TAMAMLANDI').count()
         total_devam_eden = ElifBaEzberDurumu.objects.filter(durum='DEVAM').count()
@@ -0,0 +1,34 @@
+"""
+Kuyrukta bekleyen geri yükleme işlerini çalıştıran worker komutu
+Web süreci işi arka plan iş parçacığında başlatır; süreç yeniden başlatılırsa
+veya iş parçacığı kullanılamıyorsa bekleyen işler bu komutla işlenir.
+Kullanım: python manage.py geri_yukleme_calistir [--izle] [--aralik 5]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from mainproject import restore_job_service
+from mainproject.views import restore_backup_process
+
+
+class Command(BaseCommand):
+    help = 'Kuyrukta bekleyen geri yükleme işlerini sırayla çalıştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--izle', action='store_true',
+                            help='Kuyruğu sürekli izle, yeni işleri geldikçe çalıştır')
+        parser.add_argument('--aralik', type=float, default=5,
+                            help='İzleme modunda kuyruğun kontrol aralığı (saniye)')
+
+    def handle(self, *args, **options):
+        while True:
+            calisan = restore_job_service.bekleyen_isleri_calistir(restore_backup_process)
+            if calisan:
+                self.stdout.write(self.style.SUCCESS(f'✅ {calisan} geri yükleme işi çalıştırıldı'))
+            elif not options['izle']:
+                self.stdout.write('Bekleyen geri yükleme işi yok')
+
+            if not options['izle']:
+                break
+            time.sleep(options['aralik'])
@@ -0,0 +1,24 @@
+"""
+Öğrenci istatistik özet tablosunu (OgrenciIstatistik) baştan oluşturan management command
+Tablo normalde sinyallerle güncel tutulur; loaddata, elle yapılan SQL
+değişiklikleri veya veritabanı dosyası geri yüklemesinden sonra çalıştırılır.
+Kullanım: python manage.py ogrenci_istatistiklerini_yenile [--ogrenci ID ...]
+"""
+from django.core.management.base import BaseCommand
+
+from mainproject import stats_service
+
+
+class Command(BaseCommand):
+    help = 'Öğrenci istatistik özet tablosunu sınav, ezber ve Elif Ba kayıtlarından yeniden hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ogrenci', type=int, nargs='+', dest='ogrenciler',
+                            help='Yalnızca bu öğrencilerin satırlarını yeniden hesapla')
+
+    def handle(self, *args, **options):
+        if options['ogrenciler']:
+            sayi = stats_service.ogrenci_istatistiklerini_guncelle(options['ogrenciler'])
+        else:
+            sayi = stats_service.yeniden_olustur()
+        self.stdout.write(self.style.SUCCESS(f'✅ {sayi} öğrencinin istatistikleri güncellendi'))
@@ -0,0 +1,49 @@
+"""
+Çalışan veritabanının tutarlı anlık görüntüsünü alan management command
+Kullanım: python manage.py veritabani_yedekle [--hedef yol] [--geri-yukle yol]
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from mainproject import snapshot_service
+
+
+class Command(BaseCommand):
+    help = 'SQLite veritabanının anlık görüntüsünü alır veya anlık görüntüden geri yükler'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hedef', help='Anlık görüntü dosyası (varsayılan: media/backups/db_<tarih>.sqlite3)')
+        parser.add_argument('--sayfa', type=int, default=snapshot_service.SAYFA_ADIMI,
+                            help='Her adımda kopyalanacak sayfa sayısı')
+        parser.add_argument('--bekleme', type=float, default=snapshot_service.ADIM_BEKLEMESI,
+                            help='Adımlar arasında bekleme süresi (saniye)')
+        parser.add_argument('--geri-yukle', dest='geri_yukle',
+                            help='Verilen anlık görüntüyü veritabanının yerine koyar')
+
+    def handle(self, *args, **options):
+        if options['geri_yukle']:
+            try:
+                snapshot_service.anlik_goruntuyu_geri_yukle(options['geri_yukle'])
+            except snapshot_service.AnlikGoruntuHatasi as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"✅ Veritabanı geri yüklendi: {options['geri_yukle']}"))
+            return
+
+        hedef = options['hedef'] or os.path.join(
+            settings.MEDIA_ROOT, 'backups', f'db_{timezone.now().strftime("%Y%m%d_%H%M%S")}.sqlite3'
+        )
+        try:
+            sonuc = snapshot_service.anlik_goruntu_al(
+                hedef, sayfa_adimi=options['sayfa'], bekleme=options['bekleme']
+            )
+        except snapshot_service.AnlikGoruntuHatasi as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Anlık görüntü alındı: {sonuc['path']} "
+            f"({sonuc['boyut'] / 1024 / 1024:.1f} MB, {sonuc['sure']:.2f} sn, "
+            f"{sonuc['adim_sayisi']} adım, {sonuc['yeniden_baslama']} yeniden başlama)"
+        ))
@@ -0,0 +1,157 @@
+"""
+Yedekleme altyapısı için ölçüm (benchmark) komutu
+Kullanım: python manage.py yedek_benchmark snapshot [--boyut-mb 50]
+          python manage.py yedek_benchmark sikistirma [--fotografsiz]
+"""
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+import threading
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from mainproject import backup_service, snapshot_service
+
+# Karşılaştırılan sıkıştırma politikaları - ilki eski davranış (her üye DEFLATE)
+SIKISTIRMA_POLITIKALARI = [
+    ('Her şey DEFLATE', {'YEDEK_SIKISTIRMA': 'deflate', 'YEDEK_MEDYA_SIKISTIRILSIN': True}),
+    ('DEFLATE', {'YEDEK_SIKISTIRMA': 'deflate'}),
+    ('DEFLATE 9', {'YEDEK_SIKISTIRMA': 'deflate', 'YEDEK_SIKISTIRMA_SEVIYESI': 9}),
+    ('BZIP2', {'YEDEK_SIKISTIRMA': 'bzip2'}),
+    ('LZMA', {'YEDEK_SIKISTIRMA': 'lzma'}),
+]
+
+
+def _yuzdelik(degerler, oran):
+    if not degerler:
+        return 0
+    sirali = sorted(degerler)
+    return sirali[min(len(sirali) - 1, int(len(sirali) * oran))]
+
+
+class _Yazici(threading.Thread):
+    """Ayrı bağlantıdan düzenli aralıklarla yazan ve her yazmanın süresini ölçen iş parçacığı"""
+
+    def __init__(self, db_path, aralik):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.aralik = aralik
+        self.sureler = []
+        self.dur = threading.Event()
+
+    def run(self):
+        baglanti = sqlite3.connect(self.db_path, timeout=60)
+        baglanti.execute('CREATE TABLE IF NOT EXISTS _benchmark_yazma (id INTEGER PRIMARY KEY, zaman REAL)')
+        baglanti.commit()
+        while not self.dur.is_set():
+            baslangic = time.monotonic()
+            baglanti.execute('INSERT INTO _benchmark_yazma (zaman) VALUES (?)', (baslangic,))
+            baglanti.commit()
+            self.sureler.append(time.monotonic() - baslangic)
+            time.sleep(self.aralik)
+        baglanti.close()
+
+
+class Command(BaseCommand):
+    help = 'Yedekleme işlemlerinin hızını ve canlı yazmalara etkisini ölçer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('senaryo', choices=['snapshot', 'sikistirma'], help='Ölçülecek senaryo')
+        parser.add_argument('--boyut-mb', dest='boyut_mb', type=int, default=0,
+                            help='Ölçüm kopyasını bu boyuta kadar dolgu verisiyle büyüt')
+        parser.add_argument('--sayfa', type=int, default=snapshot_service.SAYFA_ADIMI)
+        parser.add_argument('--bekleme', type=float, default=snapshot_service.ADIM_BEKLEMESI)
+        parser.add_argument('--yazma-araligi', dest='yazma_araligi', type=float, default=0.05,
+                            help='Eşzamanlı yazıcının iki yazma arasındaki beklemesi (saniye)')
+        parser.add_argument('--fotografsiz', action='store_true',
+                            help='Sıkıştırma ölçümünde fotoğrafları arşive gömme')
+
+    def handle(self, *args, **options):
+        calisma_dizini = tempfile.mkdtemp(prefix='yedek_benchmark_')
+        try:
+            getattr(self, f"_{options['senaryo']}")(calisma_dizini, options)
+        finally:
+            shutil.rmtree(calisma_dizini, ignore_errors=True)
+
+    def _olcum_veritabani(self, calisma_dizini, boyut_mb):
+        """Canlı veritabanının kopyasını alır; istenirse dolgu verisiyle büyütür"""
+        db_path = os.path.join(calisma_dizini, 'kaynak.sqlite3')
+        if os.path.exists(snapshot_service.veritabani_yolu()):
+            snapshot_service.anlik_goruntu_al(db_path, bekleme=0)
+        baglanti = sqlite3.connect(db_path)
+        baglanti.execute('CREATE TABLE IF NOT EXISTS _benchmark_dolgu (veri BLOB)')
+        while os.path.getsize(db_path) < boyut_mb * 1024 * 1024:
+            baglanti.executemany('INSERT INTO _benchmark_dolgu VALUES (?)',
+                                 [(os.urandom(4096),) for _ in range(256)])
+            baglanti.commit()
+        baglanti.close()
+        return db_path
+
+    def _snapshot(self, calisma_dizini, options):
+        db_path = self._olcum_veritabani(calisma_dizini, options['boyut_mb'])
+        boyut = os.path.getsize(db_path)
+        self.stdout.write(f'Ölçüm veritabanı: {boyut / 1024 / 1024:.1f} MB')
+
+        # Referans: snapshot yokken yazma gecikmesi
+        yazici = _Yazici(db_path, options['yazma_araligi'])
+        yazici.start()
+        time.sleep(1)
+        yazici.dur.set()
+        yazici.join()
+        referans = yazici.sureler
+
+        # Snapshot sırasında yazma gecikmesi
+        yazici = _Yazici(db_path, options['yazma_araligi'])
+        yazici.start()
+        sonuc = snapshot_service.anlik_goruntu_al(
+            os.path.join(calisma_dizini, 'snapshot.sqlite3'), kaynak_path=db_path,
+            sayfa_adimi=options['sayfa'], bekleme=options['bekleme']
+        )
+        yazici.dur.set()
+        yazici.join()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot: {sonuc['sure']:.2f} sn, "
+            f"{sonuc['boyut'] / 1024 / 1024 / max(sonuc['sure'], 1e-9):.1f} MB/sn, "
+            f"{sonuc['adim_sayisi']} adım, {sonuc['yeniden_baslama']} yeniden başlama"
+        ))
+        for baslik, sureler in (('Referans', referans), ('Snapshot sırasında', yazici.sureler)):
+            self.stdout.write(
+                f"{baslik}: {len(sureler)} yazma, "
+                f"p50 {_yuzdelik(sureler, 0.5) * 1000:.1f} ms, "
+                f"p95 {_yuzdelik(sureler, 0.95) * 1000:.1f} ms, "
+                f"en uzun {max(sureler, default=0) * 1000:.1f} ms"
+            )
+
+    def _sikistirma(self, calisma_dizini, options):
+        """Her politika ile tam yedek alır; yedekleme süresini, boyutu ve okuma süresini karşılaştırır"""
+        gom = not options['fotografsiz']
+        for baslik, ayarlar in SIKISTIRMA_POLITIKALARI:
+            zip_path = os.path.join(calisma_dizini, 'yedek.zip')
+            with override_settings(YEDEK_FOTOGRAFLARI_ARSIVE_GOM=gom, **ayarlar):
+                baslangic = time.monotonic()
+                for _ in backup_service.yedek_akisi(zip_path):
+                    pass
+                yazma_suresi = time.monotonic() - baslangic
+
+            baslangic = time.monotonic()
+            with zipfile.ZipFile(zip_path, 'r') as zipf:
+                uyeler = zipf.infolist()
+                for zinfo in uyeler:
+                    with zipf.open(zinfo) as uye:
+                        while uye.read(backup_service.PARCA_BOYUTU):
+                            pass
+            okuma_suresi = time.monotonic() - baslangic
+
+            ham = sum(zinfo.file_size for zinfo in uyeler)
+            boyut = os.path.getsize(zip_path)
+            self.stdout.write(self.style.SUCCESS(
+                f"{baslik}: yedek {yazma_suresi:.2f} sn, okuma {okuma_suresi:.2f} sn, "
+                f"{boyut / 1024 / 1024:.2f} MB (ham {ham / 1024 / 1024:.2f} MB, "
+                f"oran %{boyut * 100 / max(ham, 1):.0f})"
+            ))
+            os.remove(zip_path)
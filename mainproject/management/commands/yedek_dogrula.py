@@ -0,0 +1,54 @@
+"""
+Yedekleri geri yüklemeden doğrulayan management command
+Üye özetlerini manifestle karşılaştırır ve JSON yapısını denetler; veritabanına dokunmaz.
+Kullanım: python manage.py yedek_dogrula backup_20250101_120000.zip [...] | --hepsi
+"""
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mainproject import backup_service, catalog_service, verify_service
+
+
+class Command(BaseCommand):
+    help = 'media/backups altındaki yedeklerin bütünlüğünü geri yüklemeden doğrular'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dosyalar', nargs='*', help='Doğrulanacak yedeklerin adları')
+        parser.add_argument('--hepsi', action='store_true', help='Tüm yedekleri doğrula')
+
+    def handle(self, *args, **options):
+        backup_dir = backup_service.yedek_dizini()
+        if options['hepsi']:
+            dosyalar = [kayit['filename'] for kayit in catalog_service.yedekler()]
+        else:
+            dosyalar = [os.path.basename(f) for f in options['dosyalar']]
+        if not dosyalar:
+            raise CommandError('Doğrulanacak yedek belirtin veya --hepsi kullanın')
+
+        hatali = 0
+        for filename in dosyalar:
+            zip_path = os.path.join(backup_dir, filename)
+            if not os.path.exists(zip_path):
+                self.stdout.write(self.style.ERROR(f'❌ {filename}: bulunamadı'))
+                hatali += 1
+                continue
+
+            rapor = verify_service.yedegi_dogrula(zip_path)
+            catalog_service.dogrulama_kaydet(filename, rapor)
+            toplam_satir = sum(rapor['satir_sayilari'].values())
+            if rapor['gecerli']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {filename}: geçerli (v{rapor['versiyon']}, {rapor['uye_sayisi']} üye, "
+                    f"{toplam_satir} satır, {rapor['sure']:.2f} sn)"
+                ))
+            else:
+                hatali += 1
+                self.stdout.write(self.style.ERROR(f'❌ {filename}: geçersiz'))
+                for hata in rapor['hatalar']:
+                    self.stdout.write(f'   - {hata}')
+            for uyari in rapor['uyarilar']:
+                self.stdout.write(self.style.WARNING(f'   ! {uyari}'))
+
+        if hatali:
+            raise CommandError(f'{hatali} yedek doğrulanamadı')
@@ -0,0 +1,42 @@
+"""
+Yedek saklama politikasını uygulayan management command
+Son N günün, haftanın ve ayın yedeklerini disk bütçesi içinde tutar, diğerlerini siler.
+Günlük cron işi için uygundur (settings.YEDEK_SAKLA_GUNLUK/HAFTALIK/AYLIK, YEDEK_DISK_BUTCESI_MB).
+Kullanım: python manage.py yedekleri_temizle [--dene] [--katalogu-yenile]
+"""
+from django.core.management.base import BaseCommand
+
+from mainproject import catalog_service
+
+
+class Command(BaseCommand):
+    help = 'Saklama politikası dışında kalan yedekleri siler'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dene', action='store_true',
+                            help='Hiçbir şey silme, yalnızca silinecek yedekleri listele')
+        parser.add_argument('--katalogu-yenile', dest='katalogu_yenile', action='store_true',
+                            help='Önce yedek kataloğunu dizini tarayarak yeniden oluştur')
+
+    def handle(self, *args, **options):
+        if options['katalogu_yenile']:
+            sayi = catalog_service.yeniden_olustur()
+            self.stdout.write(f'Katalog yeniden oluşturuldu: {sayi} yedek')
+
+        politika = catalog_service.saklama_politikasi()
+        butce = f"{politika['disk_butcesi'] / 1024 / 1024:.0f} MB" if politika['disk_butcesi'] else 'sınırsız'
+        self.stdout.write(
+            f"Politika: {politika['gunluk']} günlük, {politika['haftalik']} haftalık, "
+            f"{politika['aylik']} aylık, disk bütçesi {butce}"
+        )
+
+        silinenler = catalog_service.temizle(dene=options['dene'])
+        for filename in silinenler:
+            self.stdout.write(f'   - {filename}')
+        if options['dene']:
+            self.stdout.write(self.style.WARNING(f'{len(silinenler)} yedek silinecek (deneme, hiçbir şey silinmedi)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {len(silinenler)} yedek silindi, kalan toplam boyut '
+                f'{catalog_service.toplam_boyut() / 1024 / 1024:.1f} MB'
+            ))
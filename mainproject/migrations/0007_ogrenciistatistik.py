@@ -0,0 +1,66 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def istatistikleri_doldur(apps, schema_editor):
+    """Mevcut öğrencilerin özet satırlarını gruplanmış sorgularla oluşturur"""
+    Ogrenci = apps.get_model('mainproject', 'Ogrenci')
+    SinavSonucu = apps.get_model('mainproject', 'SinavSonucu')
+    EzberKaydi = apps.get_model('mainproject', 'EzberKaydi')
+    ElifBaEzberDurumu = apps.get_model('mainproject', 'ElifBaEzberDurumu')
+    OgrenciIstatistik = apps.get_model('mainproject', 'OgrenciIstatistik')
+
+    sinavlar = {
+        satir['ogrenci']: (satir['sayi'], satir['toplam'])
+        for satir in SinavSonucu.objects.order_by().values('ogrenci').annotate(sayi=Count('id'), toplam=Sum('puan'))
+    }
+    ezberler = dict(
+        EzberKaydi.objects.filter(durum='TAMAMLANDI').order_by().values('ogrenci')
+        .annotate(sayi=Count('id')).values_list('ogrenci', 'sayi')
+    )
+    elifbalar = dict(
+        ElifBaEzberDurumu.objects.filter(durum='TAMAMLANDI').order_by().values('ogrenci')
+        .annotate(sayi=Count('id')).values_list('ogrenci', 'sayi')
+    )
+    satirlar = []
+    for ogrenci_id in Ogrenci.objects.values_list('id', flat=True):
+        sayi, toplam = sinavlar.get(ogrenci_id, (0, 0))
+        satirlar.append(OgrenciIstatistik(
+            ogrenci_id=ogrenci_id,
+            sinav_sayisi=sayi,
+            puan_toplami=toplam,
+            ortalama_puan=toplam / sayi if sayi else None,
+            tamamlanan_ezber=ezberler.get(ogrenci_id, 0),
+            tamamlanan_elifba=elifbalar.get(ogrenci_id, 0),
+        ))
+    OgrenciIstatistik.objects.bulk_create(satirlar, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainproject', '0006_galeri'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OgrenciIstatistik',
+            fields=[
+                ('ogrenci', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='istatistik', serialize=False, to='mainproject.ogrenci')),
+                ('sinav_sayisi', models.PositiveIntegerField(default=0)),
+                ('puan_toplami', models.PositiveIntegerField(default=0)),
+                ('ortalama_puan', models.FloatField(blank=True, db_index=True, null=True)),
+                ('tamamlanan_ezber', models.PositiveIntegerField(db_index=True, default=0)),
+                ('tamamlanan_elifba', models.PositiveIntegerField(default=0)),
+                ('guncelleme', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Öğrenci İstatistiği',
+                'verbose_name_plural': 'Öğrenci İstatistikleri',
+            },
+        ),
+        migrations.RunPython(istatistikleri_doldur, migrations.RunPython.noop),
+    ]
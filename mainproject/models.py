@@ -24,7 +24,10 @@ class Ogrenci(models.Model):
         return self.ad_soyad
     
     def tamamlanan_ezber_sayisi(self):
-        return self.ezberkaydi_set.filter(durum='TAMAMLANDI').count()  # Bu satırı düzelt
+        istatistik = getattr(self, 'istatistik', None)
+        if istatistik is not None:
+            return istatistik.tamamlanan_ezber
+        return self.ezberkaydi_set.filter(durum='TAMAMLANDI').count()
     
     def ortalama_ders_notu(self):
         from django.db.models import Avg
@@ -32,8 +35,33 @@ class Ogrenci(models.Model):
         return round(ortalama, 2) if ortalama else 0
         
     def tamamlanan_elifba_sayisi(self):
+        istatistik = getattr(self, 'istatistik', None)
+        if istatistik is not None:
+            return istatistik.tamamlanan_elifba
         return self.elifbaezberdurumu_set.filter(durum='TAMAMLANDI').count()
 
+
+class OgrenciIstatistik(models.Model):
+    """
+    Öğrenci başına özet istatistikler
+    Sınav, ezber ve Elif Ba kayıtları değiştikçe sinyallerle güncellenir
+    (stats_service); ogrenci_istatistiklerini_yenile komutu baştan oluşturur.
+    """
+    ogrenci = models.OneToOneField(Ogrenci, on_delete=models.CASCADE, primary_key=True, related_name='istatistik')
+    sinav_sayisi = models.PositiveIntegerField(default=0)
+    puan_toplami = models.PositiveIntegerField(default=0)
+    ortalama_puan = models.FloatField(null=True, blank=True, db_index=True)  # sınavı yoksa boş
+    tamamlanan_ezber = models.PositiveIntegerField(default=0, db_index=True)
+    tamamlanan_elifba = models.PositiveIntegerField(default=0)
+    guncelleme = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Öğrenci İstatistiği"
+        verbose_name_plural = "Öğrenci İstatistikleri"
+
+    def __str__(self):
+        return f"{self.ogrenci_id} - ort. {self.ortalama_puan or 0:.1f}"
+
     
 class ElifBaEzberi(models.Model):
     EZBER_SIRASI = [
@@ -0,0 +1,194 @@
+"""
+Toplu öğrenci raporu iş servisi
+Dönem sonunda tüm öğrencilerin detay raporları tek ZIP olarak hazırlanır:
+sınıf geneli değerler bir kez hesaplanır, öğrencilerin sınav ve ezber kayıtları
+birkaç sorguda önceden yüklenir, çalışma kitapları ProcessPoolExecutor ile
+paralel oluşturulur ve hazır oldukça ZIP'e yazılır. İş durumu, restore
+işlerinde olduğu gibi media/exports/jobs altında JSON dosyalarında tutulur.
+Saklama süresi dolan işlerin ZIP'leri ve kayıtları yeni iş başlatılırken silinir.
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import multiprocessing
+import zipfile
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import get_valid_filename
+
+from . import excel_service
+from .models import Ogrenci
+
+logger = logging.getLogger(__name__)
+
+
+def rapor_dizini():
+    """media/exports dizinini döndürür, yoksa oluşturur"""
+    export_dir = os.path.join(settings.MEDIA_ROOT, 'exports')
+    os.makedirs(os.path.join(export_dir, 'jobs'), exist_ok=True)
+    return export_dir
+
+
+def isci_sayisi():
+    """settings.TOPLU_RAPOR_ISCI_SAYISI: raporları oluşturan süreç sayısı (varsayılan CPU sayısı)"""
+    return getattr(settings, 'TOPLU_RAPOR_ISCI_SAYISI', None) or os.cpu_count() or 1
+
+
+def saklama_suresi():
+    """settings.TOPLU_RAPOR_SAKLAMA_SAATI: işler son güncellemeden bu kadar saat sonra silinir (varsayılan 24)"""
+    return getattr(settings, 'TOPLU_RAPOR_SAKLAMA_SAATI', 24) * 60 * 60
+
+
+def _is_yolu(is_id):
+    return os.path.join(rapor_dizini(), 'jobs', f'{is_id}.json')
+
+
+def _yaz(is_kaydi):
+    path = _is_yolu(is_kaydi['id'])
+    gecici_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(gecici_path, 'w', encoding='utf-8') as f:
+        json.dump(is_kaydi, f, ensure_ascii=False)
+    os.replace(gecici_path, path)
+
+
+def is_oku(is_id):
+    """İş kaydını döndürür, yoksa None"""
+    if not is_id or os.path.basename(is_id) != is_id:
+        return None
+    try:
+        with open(_is_yolu(is_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _guncelle(is_kaydi, **alanlar):
+    is_kaydi.update(alanlar)
+    is_kaydi['guncelleme'] = timezone.now().isoformat()
+    _yaz(is_kaydi)
+
+
+def zip_yolu(is_kaydi):
+    return os.path.join(rapor_dizini(), is_kaydi['filename'])
+
+
+def eski_isleri_temizle():
+    """
+    Son güncellemesi saklama süresinden eski işlerin ZIP'ini, yarım kalan .tmp
+    dosyasını ve iş kaydını siler; silinen iş sayısını döndürür
+    Çalışan işler ilerledikçe güncellendiği için yalnızca biten veya süreci
+    ölmüş işler bu sınırı geçer.
+    """
+    sinir = time.time() - saklama_suresi()
+    silinen = 0
+    for filename in os.listdir(os.path.join(rapor_dizini(), 'jobs')):
+        if not filename.endswith('.json'):
+            continue
+        is_kaydi = is_oku(filename[:-len('.json')])
+        guncelleme = parse_datetime(is_kaydi['guncelleme']) if is_kaydi else None
+        if not guncelleme or guncelleme.timestamp() > sinir:
+            continue
+        path = zip_yolu(is_kaydi)
+        for eski_path in (path, f'{path}.tmp', _is_yolu(is_kaydi['id'])):
+            try:
+                os.remove(eski_path)
+            except FileNotFoundError:
+                pass
+        silinen += 1
+    if silinen:
+        logger.info(f"Saklama süresi dolan {silinen} toplu rapor silindi")
+    return silinen
+
+
+def _rapor_adi(ogrenci_id, ad_soyad):
+    return f"{get_valid_filename(ad_soyad) or 'ogrenci'}_{ogrenci_id}_detay_raporu.xlsx"
+
+
+def raporlari_olustur(is_kaydi, ogrenciler):
+    """Seçilen öğrencilerin raporlarını paralel oluşturur ve ZIP'e yazar"""
+    sinif = excel_service.sinif_ortalamalari()
+    ogrenciler = list(excel_service.rapor_ogrencileri(ogrenciler))
+    kimlikler = [(ogrenci.id, ogrenci.ad_soyad) for ogrenci in ogrenciler]
+    veriler = [excel_service.ogrenci_rapor_verisi(ogrenci) for ogrenci in ogrenciler]
+    del ogrenciler
+    toplam = len(veriler)
+    _guncelle(is_kaydi, toplam=toplam, message=f'{toplam} öğrencinin raporu oluşturuluyor...')
+
+    # Alt süreçler veritabanını kullanmaz; fork sırasında açık bağlantı kopyalanmasın
+    connections.close_all()
+    path = zip_yolu(is_kaydi)
+    gecici_path = f'{path}.tmp'
+    son_yuzde = -1
+    try:
+        # İş bir gunicorn işçisindeki iş parçacığından başlar; fork edilen çocuk başka iş
+        # parçacıklarının tuttuğu kilitlerde takılabilir. spawn temiz bir yorumlayıcı açar,
+        # Django her çocukta initializer ile kurulur.
+        with ProcessPoolExecutor(max_workers=isci_sayisi(), mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=django.setup) as havuz, \
+                zipfile.ZipFile(gecici_path, 'w', zipfile.ZIP_STORED) as zipf:
+            raporlar = havuz.map(excel_service.ogrenci_raporu_xlsx, veriler, repeat(sinif), chunksize=4)
+            for sira, ((ogrenci_id, ad_soyad), xlsx) in enumerate(zip(kimlikler, raporlar), 1):
+                # .xlsx zaten sıkıştırılmış bir ZIP - yeniden sıkıştırılmaz
+                zipf.writestr(_rapor_adi(ogrenci_id, ad_soyad), xlsx)
+                yuzde = sira * 100 // toplam
+                if yuzde != son_yuzde:
+                    son_yuzde = yuzde
+                    _guncelle(is_kaydi, progress=yuzde, tamamlanan=sira,
+                              message=f'{sira}/{toplam} rapor hazırlandı')
+        os.replace(gecici_path, path)
+    finally:
+        # Hata olursa yarım kalan ZIP bırakılmaz
+        if os.path.exists(gecici_path):
+            os.remove(gecici_path)
+
+
+def _calistir(is_kaydi, ogrenciler):
+    try:
+        _guncelle(is_kaydi, status='processing')
+        raporlari_olustur(is_kaydi, ogrenciler)
+        _guncelle(is_kaydi, status='completed', progress=100, message='Raporlar hazır')
+        logger.info(f"Toplu rapor tamamlandı: {is_kaydi['id']} ({is_kaydi['toplam']} öğrenci)")
+    except Exception as e:
+        logger.exception(f"Toplu rapor başarısız: {is_kaydi['id']}")
+        _guncelle(is_kaydi, status='error', message=f'Rapor hatası: {e}')
+    finally:
+        connections.close_all()
+
+
+def is_baslat(ogrenciler=None):
+    """
+    Toplu rapor işini arka plan iş parçacığında başlatır ve iş kaydını döndürür
+    ogrenciler verilmezse tüm öğrencilerin raporu hazırlanır.
+    """
+    eski_isleri_temizle()
+    simdi = timezone.now()
+    is_id = f"{simdi.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    is_kaydi = {
+        'id': is_id,
+        'status': 'queued',
+        'progress': 0,
+        'message': 'Raporlar sırada bekliyor...',
+        'filename': f'ogrenci_raporlari_{is_id}.zip',
+        'toplam': None,
+        'tamamlanan': 0,
+        'olusturma': simdi.isoformat(),
+        'guncelleme': simdi.isoformat(),
+    }
+    _yaz(is_kaydi)
+    if ogrenciler is None:
+        ogrenciler = Ogrenci.objects.all()
+    thread = threading.Thread(
+        target=_calistir, args=(is_kaydi, ogrenciler.order_by('ad_soyad')),
+        name='toplu-rapor', daemon=True
+    )
+    thread.start()
+    return is_kaydi
@@ -0,0 +1,309 @@
+"""
+Geri yükleme iş (job) servisi
+Geri yükleme işleri media/backups/jobs altında JSON dosyaları olarak tutulur;
+böylece ilerleme hangi worker sürecinden sorulursa sorulsun okunabilir.
+İşler veritabanında tutulmaz çünkü geri yükleme veritabanı dosyasını değiştirir.
+Aynı anda tek geri yüklemenin çalışması bir kilit dosyasıyla garanti edilir.
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import socket
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+KILIT_DOSYASI = 'restore.lock'
+
+# Onaylanmayan deneme (dry-run) işlerinin yüklenen arşivleri bu süre sonra silinir
+DENEME_YUKLEMESI_SAKLAMA_SURESI = 24 * 60 * 60
+
+# İşi çalıştıran süreçteki aktif iş - ilerleme güncellemeleri bu işe yazılır
+_aktif_is = {'id': None}
+
+
+def is_dizini():
+    """media/backups/jobs dizinini döndürür, yoksa oluşturur"""
+    jobs_dir = os.path.join(settings.MEDIA_ROOT, 'backups', 'jobs')
+    os.makedirs(jobs_dir, exist_ok=True)
+    return jobs_dir
+
+
+def yukleme_dizini(is_id):
+    """İşe ait yüklenen arşivin saklandığı dizin"""
+    upload_dir = os.path.join(settings.MEDIA_ROOT, 'temp_restore', is_id)
+    os.makedirs(upload_dir, exist_ok=True)
+    return upload_dir
+
+
+def kilit_zaman_asimi():
+    """Bu süre (saniye) boyunca ilerleme yazılmayan kilit terk edilmiş sayılır"""
+    return getattr(settings, 'GERI_YUKLEME_KILIT_ZAMAN_ASIMI', 600)
+
+
+def _is_yolu(is_id):
+    return os.path.join(is_dizini(), f'{is_id}.json')
+
+
+def _yaz(is_kaydi):
+    """İş dosyasını atomik olarak yazar - okuyan worker yarım dosya görmez"""
+    path = _is_yolu(is_kaydi['id'])
+    gecici_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(gecici_path, 'w', encoding='utf-8') as f:
+        json.dump(is_kaydi, f, ensure_ascii=False)
+    os.replace(gecici_path, path)
+
+
+def is_oku(is_id):
+    """İş kaydını döndürür, yoksa None"""
+    if not is_id or os.path.basename(is_id) != is_id:
+        return None
+    try:
+        with open(_is_yolu(is_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_listesi():
+    """Tüm işleri oluşturulma sırasına göre (eskiden yeniye) döndürür"""
+    isler = []
+    for filename in sorted(os.listdir(is_dizini())):
+        if filename.endswith('.json'):
+            is_kaydi = is_oku(filename[:-len('.json')])
+            if is_kaydi:
+                isler.append(is_kaydi)
+    return isler
+
+
+def son_is():
+    """En son oluşturulan iş, hiç iş yoksa None"""
+    isler = is_listesi()
+    return isler[-1] if isler else None
+
+
+def eski_deneme_yuklemelerini_temizle():
+    """Onaylanmadan bırakılmış deneme işlerinin yüklenen arşivlerini siler"""
+    sinir = time.time() - DENEME_YUKLEMESI_SAKLAMA_SURESI
+    for is_kaydi in is_listesi():
+        if not is_kaydi.get('dry_run') or is_kaydi['status'] not in ('completed', 'error'):
+            continue
+        upload_dir = os.path.dirname(is_kaydi['zip_path'])
+        if os.path.isdir(upload_dir) and os.path.getmtime(upload_dir) < sinir:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+def is_olustur(is_id, zip_path, dry_run=False):
+    """
+    Yüklenen arşiv için kuyrukta bekleyen yeni bir iş oluşturur
+    dry_run=True ise iş veritabanını değiştirmez, yalnızca fark raporu üretir;
+    yüklenen arşiv onaylanırsa gerçek geri yükleme için yeniden kullanılır.
+    """
+    eski_deneme_yuklemelerini_temizle()
+    simdi = timezone.now()
+    is_kaydi = {
+        'id': is_id,
+        'status': 'queued',
+        'progress': 0,
+        'message': 'Geri yükleme sırada bekliyor...',
+        'zip_path': zip_path,
+        'dry_run': dry_run,
+        'olusturma': simdi.isoformat(),
+        'guncelleme': simdi.isoformat(),
+    }
+    _yaz(is_kaydi)
+    logger.info(f"Geri yükleme işi oluşturuldu: {is_kaydi['id']}")
+    return is_kaydi
+
+
+def yeni_is_id():
+    """Sıralanabilir benzersiz iş kimliği"""
+    return f"{timezone.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+def is_guncelle(is_id, **alanlar):
+    """İş kaydındaki alanları günceller ve güncel kaydı döndürür"""
+    is_kaydi = is_oku(is_id)
+    if not is_kaydi:
+        return None
+    is_kaydi.update(alanlar)
+    is_kaydi['guncelleme'] = timezone.now().isoformat()
+    _yaz(is_kaydi)
+    if is_kaydi['status'] == 'processing':
+        _kilidi_tazele()
+    return is_kaydi
+
+
+def ilerleme_kaydet(progress, message, status='processing'):
+    """Bu süreçte çalışan işin ilerlemesini kaydeder (çalışan iş yoksa bir şey yapmaz)"""
+    if _aktif_is['id']:
+        is_guncelle(_aktif_is['id'], progress=progress, message=message, status=status)
+
+
+def rapor_kaydet(rapor):
+    """Bu süreçte çalışan deneme işinin fark raporunu kaydeder"""
+    if _aktif_is['id']:
+        is_guncelle(_aktif_is['id'], rapor=rapor)
+
+
+def uyari_kaydet(uyarilar):
+    """Bu süreçte çalışan işin uyarılarını kaydeder (ör. geri yüklenemeyen fotoğraflar)"""
+    if _aktif_is['id']:
+        is_guncelle(_aktif_is['id'], uyarilar=uyarilar)
+
+
+def _kilit_yolu():
+    return os.path.join(is_dizini(), KILIT_DOSYASI)
+
+
+def _kilit_bilgisi_yaz(f, is_id):
+    json.dump({'is_id': is_id, 'pid': os.getpid(), 'host': socket.gethostname()}, f)
+
+
+def _kilidi_tazele():
+    try:
+        os.utime(_kilit_yolu())
+    except OSError:
+        pass
+
+
+def _surec_oldu_mu(kilit):
+    """Kilidi tutan süreç bu makinedeyse ve artık çalışmıyorsa True"""
+    if os.name != 'posix' or kilit.get('host') != socket.gethostname() or not kilit.get('pid'):
+        return False
+    try:
+        os.kill(kilit['pid'], 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass
+    return False
+
+
+def _terk_edilmis_kilidi_temizle():
+    """
+    Terk edilmiş kilidi kaldırır, yarıda kalan işi hatalı olarak işaretler
+    Kilit zaman aşımına uğramışsa veya kilidi tutan yerel süreç sonlanmışsa terk edilmiş sayılır.
+    """
+    kilit_path = _kilit_yolu()
+    try:
+        yas = timezone.now().timestamp() - os.path.getmtime(kilit_path)
+        with open(kilit_path, 'r', encoding='utf-8') as f:
+            kilit = json.load(f)
+    except OSError:
+        return
+    except ValueError:
+        # Kilit yeni oluşturulmuş ve henüz yazılıyor olabilir
+        kilit = {}
+    if yas < kilit_zaman_asimi() and not _surec_oldu_mu(kilit):
+        return
+
+    logger.warning(f"Terk edilmiş geri yükleme kilidi kaldırılıyor: {kilit}")
+    is_kaydi = is_oku(kilit.get('is_id'))
+    if is_kaydi and is_kaydi['status'] == 'processing':
+        is_guncelle(is_kaydi['id'], status='error', progress=0,
+                    message='Geri yükleme yarıda kaldı (işi çalıştıran süreç sonlandı)')
+    try:
+        os.remove(kilit_path)
+    except OSError:
+        pass
+
+
+def kilidi_al(is_id):
+    """Geri yükleme kilidini almayı dener; başka geri yükleme çalışıyorsa False döndürür"""
+    _terk_edilmis_kilidi_temizle()
+    try:
+        fd = os.open(_kilit_yolu(), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        _kilit_bilgisi_yaz(f, is_id)
+    return True
+
+
+def kilidi_birak():
+    try:
+        os.remove(_kilit_yolu())
+    except OSError:
+        pass
+
+
+def bekleyen_isler():
+    return [is_kaydi for is_kaydi in is_listesi() if is_kaydi['status'] == 'queued']
+
+
+def isi_calistir(is_kaydi, geri_yukleme):
+    """
+    Kilit alınmış durumda tek bir işi çalıştırır; geri_yukleme(zip_path) çağrılır
+    Deneme işlerinde geri_yukleme(zip_path, dry_run=True) çağrılır.
+    """
+    is_id = is_kaydi['id']
+    _aktif_is['id'] = is_id
+    is_guncelle(is_id, status='processing', progress=0, message='Geri yükleme başlatılıyor...')
+    try:
+        if is_kaydi.get('dry_run'):
+            geri_yukleme(is_kaydi['zip_path'], dry_run=True)
+            mesaj = 'Deneme tamamlandı - veritabanı değiştirilmedi'
+        else:
+            geri_yukleme(is_kaydi['zip_path'])
+            uyarilar = is_oku(is_id).get('uyarilar')
+            if uyarilar:
+                eksik = uyarilar['bulunamayan'] + uyarilar['hatali']
+                mesaj = f"Geri yükleme tamamlandı, {eksik}/{uyarilar['toplam']} fotoğraf geri yüklenemedi"
+            else:
+                mesaj = 'Geri yükleme başarıyla tamamlandı!'
+        is_guncelle(is_id, status='completed', progress=100, message=mesaj)
+    except Exception as e:
+        logger.exception(f"Geri yükleme işi başarısız: {is_id}")
+        is_guncelle(is_id, status='error', progress=0, message=f'Geri yükleme hatası: {e}')
+    finally:
+        _aktif_is['id'] = None
+
+
+def bekleyen_isleri_calistir(geri_yukleme):
+    """
+    Kuyruktaki işleri sırayla çalıştırır ve çalıştırılan iş sayısını döndürür
+
+    Kilit başka bir süreçteyse hemen döner; kilidi tutan süreç kendi işini
+    bitirdikten sonra kuyruğu yeniden kontrol ettiği için bekleyen iş kalmaz.
+    """
+    calisan = 0
+    while bekleyen_isler():
+        if not kilidi_al('kuyruk'):
+            break
+        try:
+            for is_kaydi in bekleyen_isler():
+                # Kilit, terk edilirse hangi işin yarıda kaldığını gösterir
+                with open(_kilit_yolu(), 'w', encoding='utf-8') as f:
+                    _kilit_bilgisi_yaz(f, is_kaydi['id'])
+                isi_calistir(is_kaydi, geri_yukleme)
+                calisan += 1
+        finally:
+            kilidi_birak()
+    return calisan
+
+
+def _arka_plan_isi(geri_yukleme):
+    try:
+        bekleyen_isleri_calistir(geri_yukleme)
+    finally:
+        # İş parçacığının açtığı bağlantılar kapanmazsa SQLite dosyasında okuma
+        # kilidi kalır; anlık görüntü değişimi bu kilidin bırakılmasını bekler
+        connections.close_all()
+
+
+def arka_planda_calistir(geri_yukleme):
+    """Kuyruğu bu süreçte arka plan iş parçacığında işler - istek beklemeden döner"""
+    thread = threading.Thread(
+        target=_arka_plan_isi, args=(geri_yukleme,),
+        name='geri-yukleme', daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,512 @@
+"""
+Geri yükleme servisi
+Yedekteki her model grubunu kaydedilmemiş örneklere çevirir ve tek transaction
+içinde bulk_create ile toplu olarak ekler; satır satır save() çağrılmaz.
+Yüklenen ZIP diske açılmaz; backup.json, fotoğraflar ve veritabanı doğrudan
+arşiv üyelerinden okunur. v2 (NDJSON) bölümleri satır satır okunur, v1.6 da
+okunabilir. Fotoğraflar önce özetleriyle blob deposunda aranır. Fark yedekleri
+taban yedeğin satırları üzerine farklar uygulanarak akış halinde geri yüklenir.
+Deneme (dry-run) modunda arşiv canlı veritabanıyla pk ve satır özeti üzerinden
+karşılaştırılır; hiçbir şey yazılmaz.
+"""
+import io
+import os
+import json
+import time
+import shutil
+import hashlib
+import zipfile
+import logging
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.models import yazi, category
+from . import backup_service, blob_service, snapshot_service, stats_service
+from .models import (
+    Ogrenci, EzberKaydi, SinavSonucu, DersNotu, Alinti, Ders,
+    EzberSuresi, ElifBaEzberi, ElifBaEzberDurumu, Galeri
+)
+
+logger = logging.getLogger(__name__)
+
+# v1.6 yedek anahtarları - foreign key bağımlılıklarına göre ekleme sırasında
+YUKLEME_SIRASI = [
+    ('categories', category),
+    ('ezber_sureleri', EzberSuresi),
+    ('elifba_ezberleri', ElifBaEzberi),
+    ('dersler', Ders),
+    ('yazilar', yazi),
+    ('ogrenciler', Ogrenci),
+    ('alintilar', Alinti),
+    ('galeri', Galeri),
+    ('ezber_kayitlari', EzberKaydi),
+    ('sinav_sonuclari', SinavSonucu),
+    ('ders_notlari', DersNotu),
+    ('elifba_ezber_durumlari', ElifBaEzberDurumu),
+]
+
+# Arşiv üyeleri bu boyutta parçalar halinde kopyalanır
+PARCA_BOYUTU = 64 * 1024
+
+# Bozuk/döngüsel zincirlere karşı en fazla bu kadar fark yedeği izlenir
+AZAMI_ZINCIR_UZUNLUGU = 1000
+
+# Fark raporunda her değişiklik türü için gösterilen örnek pk sayısı
+RAPOR_ORNEK_SAYISI = 10
+
+
+def toplu_ekleme_boyutu():
+    """bulk_create için batch boyutu (settings.YEDEK_TOPLU_EKLEME_BOYUTU ile değiştirilebilir)"""
+    return getattr(settings, 'YEDEK_TOPLU_EKLEME_BOYUTU', 500)
+
+
+def v16_bolumleri(backup_data):
+    """v1.6 backup.json sözlüğünü (model, kayıt listesi) çiftlerine ayırır"""
+    bolumler = []
+    for key, model in YUKLEME_SIRASI:
+        if key not in backup_data:
+            continue
+        kayitlar = backup_data[key]
+        if isinstance(kayitlar, str):
+            kayitlar = json.loads(kayitlar)
+        bolumler.append((model, kayitlar))
+    return bolumler
+
+
+def duz_liste_bolumleri(kayitlar):
+    """'model' alanı taşıyan düz kayıt listesini YUKLEME_SIRASI'na göre gruplar"""
+    gruplar = {}
+    for kayit in kayitlar:
+        model = apps.get_model(kayit['model'])
+        gruplar.setdefault(model, []).append(kayit)
+    return [(model, gruplar[model]) for _, model in YUKLEME_SIRASI if model in gruplar]
+
+
+def nesneleri_coz(model, kayitlar):
+    """Serileştirilmiş kayıtları kaydedilmemiş model örneklerine çevirir"""
+    # Eski yedeklerde model adı farklı büyük/küçük harfle yazılmış olabilir
+    etiket = model._meta.label_lower
+    kayitlar = (dict(kayit, model=etiket) for kayit in kayitlar)
+    for obj in serializers.deserialize('python', kayitlar, ignorenonexistent=True):
+        yield obj.object
+
+
+def tablolari_temizle(modeller=None):
+    """Modellerin tablolarını bağımlılık sırasının tersine göre boşaltır"""
+    modeller = modeller or [model for _, model in YUKLEME_SIRASI]
+    with stats_service.toplu_guncelleme():
+        for model in reversed(modeller):
+            model.objects.all().delete()
+
+
+def sira_sayaclarini_sifirla(modeller):
+    """Açık pk ile eklenen tabloların otomatik artan sayaçlarını en büyük pk'ya çeker"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for model in modeller:
+                tablo = connection.ops.quote_name(model._meta.db_table)
+                pk = connection.ops.quote_name(model._meta.pk.column)
+                cursor.execute(
+                    f"UPDATE sqlite_sequence SET seq = (SELECT COALESCE(MAX({pk}), 0) FROM {tablo}) "
+                    f"WHERE name = %s",
+                    [model._meta.db_table]
+                )
+        else:
+            for sql in connection.ops.sequence_reset_sql(no_style(), modeller):
+                cursor.execute(sql)
+
+
+def ham_toplu_ekle(model, nesneler, batch_size):
+    """
+    Nesneleri loaddata gibi raw modda toplu ekler
+    bulk_create alanların pre_save'ini çalıştırdığı için auto_now/auto_now_add
+    alanlarını şimdiki zamanla ezer; raw eklemede yedekteki değerler korunur.
+    """
+    alanlar = model._meta.local_concrete_fields
+    batch_size = min(batch_size, connection.ops.bulk_batch_size(alanlar, nesneler) or batch_size)
+    for i in range(0, len(nesneler), batch_size):
+        model._base_manager._insert(nesneler[i:i + batch_size], fields=alanlar, raw=True)
+
+
+def toplu_geri_yukle(bolumler, batch_size=None, temizle=True, ilerleme=None):
+    """
+    (model, kayıt listesi) bölümlerini tek transaction içinde toplu olarak ekler
+
+    temizle=True ise önce ilgili tablolar boşaltılır. Her model için eklenen
+    satır sayısı, süre ve saniyedeki satır sayısını içeren rapor döndürür.
+    ilerleme(sira, toplam, rapor_satiri) her model bittikten sonra çağrılır.
+    Ham eklemeler sinyal göndermediği için öğrenci istatistikleri sonda
+    aynı transaction içinde yeniden oluşturulur.
+    """
+    batch_size = batch_size or toplu_ekleme_boyutu()
+    modeller = [model for model, _ in bolumler]
+    rapor = []
+
+    with transaction.atomic(), stats_service.toplu_guncelleme(yeniden=True):
+        if temizle:
+            tablolari_temizle(modeller)
+
+        for sira, (model, kayitlar) in enumerate(bolumler, 1):
+            baslangic = time.monotonic()
+            eklenen = 0
+            nesneler = nesneleri_coz(model, kayitlar)
+            # Bellekte aynı anda en fazla bir batch kadar örnek tutulur
+            while True:
+                batch = list(islice(nesneler, batch_size))
+                if not batch:
+                    break
+                ham_toplu_ekle(model, batch, batch_size)
+                eklenen += len(batch)
+            sure = time.monotonic() - baslangic
+
+            satir = {
+                'model': model._meta.label,
+                'satir': eklenen,
+                'sure': sure,
+                'satir_per_sn': eklenen / sure if sure > 0 else 0,
+            }
+            rapor.append(satir)
+            logger.info(f"{satir['model']}: {satir['satir']} satır, "
+                        f"{satir['sure']:.2f} sn ({satir['satir_per_sn']:.0f} satır/sn)")
+            if ilerleme:
+                ilerleme(sira, len(bolumler), satir)
+
+        sira_sayaclarini_sifirla(modeller)
+
+    return rapor
+
+
+def _satir_ozeti(degerler):
+    """
+    Satır değerlerinin kısa özeti
+    Değerler serileştiricinin kullandığı kodlayıcıyla yazılır; böylece arşivdeki
+    JSON değerleri ile veritabanından okunan değerler aynı metne dönüşür.
+    """
+    veri = json.dumps(degerler, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return hashlib.blake2b(veri.encode('utf-8'), digest_size=8).digest()
+
+
+def canli_satir_ozetleri(model, alanlar):
+    """Modelin veritabanındaki satırları: {pk: satır özeti} - model örneği oluşturulmaz"""
+    sutunlar = [model._meta.pk.attname] + [alan.attname for alan in alanlar]
+    return {
+        satir[0]: _satir_ozeti(list(satir[1:]))
+        for satir in model._base_manager.values_list(*sutunlar).iterator(chunk_size=2000)
+    }
+
+
+def fark_raporu(bolumler, ilerleme=None):
+    """
+    Geri yükleme yapılsaydı (model, kayıtlar) bölümlerinin veritabanında neyi
+    değiştireceğini hesaplar; hiçbir şey yazmaz
+
+    Veritabanı satırları ve arşiv kayıtları pk ve alan değerlerinin özeti ile
+    karşılaştırılır. Arşiv kayıtları akış halinde okunur, bellekte yalnızca
+    canlı tablonun {pk: özet} sözlüğü tutulur. Model başına eklenecek,
+    silinecek, değişecek ve aynı kalacak satır sayıları ile örnek pk'lar döner.
+    """
+    rapor = []
+    for sira, (model, kayitlar) in enumerate(bolumler, 1):
+        baslangic = time.monotonic()
+        alanlar = [alan for alan in model._meta.local_concrete_fields if not alan.primary_key]
+        canli = canli_satir_ozetleri(model, alanlar)
+        sayilar = {'eklenecek': 0, 'degisecek': 0, 'ayni': 0}
+        ornekler = {'eklenecek': [], 'degisecek': [], 'silinecek': []}
+
+        for kayit in kayitlar:
+            pk = model._meta.pk.to_python(kayit['pk'])
+            fields = kayit['fields']
+            ozet = _satir_ozeti([fields.get(alan.name) for alan in alanlar])
+            mevcut = canli.pop(pk, None)
+            if mevcut is None:
+                tur = 'eklenecek'
+            elif mevcut != ozet:
+                tur = 'degisecek'
+            else:
+                sayilar['ayni'] += 1
+                continue
+            sayilar[tur] += 1
+            if len(ornekler[tur]) < RAPOR_ORNEK_SAYISI:
+                ornekler[tur].append(pk)
+
+        # Arşivde olmayan satırlar tablo boşaltılınca silinir
+        ornekler['silinecek'] = sorted(canli)[:RAPOR_ORNEK_SAYISI]
+        satir = {
+            'model': model._meta.label,
+            'eklenecek': sayilar['eklenecek'],
+            'silinecek': len(canli),
+            'degisecek': sayilar['degisecek'],
+            'ayni': sayilar['ayni'],
+            'ornekler': ornekler,
+            'sure': time.monotonic() - baslangic,
+        }
+        rapor.append(satir)
+        if ilerleme:
+            ilerleme(sira, len(bolumler), satir)
+    return rapor
+
+
+def akisi_kopyala(kaynak, hedef_path):
+    """Açık kaynak dosyayı parça parça hedefe yazar ve kapatır (yarım dosya bırakmaz)"""
+    os.makedirs(os.path.dirname(hedef_path), exist_ok=True)
+    gecici_path = hedef_path + '.part'
+    try:
+        with kaynak, open(gecici_path, 'wb') as hedef:
+            shutil.copyfileobj(kaynak, hedef, PARCA_BOYUTU)
+        os.replace(gecici_path, hedef_path)
+    finally:
+        if os.path.exists(gecici_path):
+            os.remove(gecici_path)
+
+
+class YedekArsivi:
+    """
+    Yüklenen yedek ZIP'ini diske açmadan okur
+    Üyeler ZipFile.open ile ihtiyaç anında açılır; fotoğraflar ve veritabanı
+    doğrudan hedeflerine parça parça kopyalanır.
+    """
+
+    def __init__(self, zip_path):
+        if not zipfile.is_zipfile(zip_path):
+            raise ValueError('Geçerli bir ZIP dosyası değil')
+        self.zip_path = zip_path
+        self.zip = zipfile.ZipFile(zip_path, 'r')
+        self.uyeler = set(self.zip.namelist())
+        # Fark yedeğinin okunmakta olan taban arşivi - bu arşivle birlikte kapatılır
+        self._taban = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self._taban:
+            self._taban.close()
+        self.zip.close()
+
+    def yedek_verisi(self):
+        """
+        backup.json üyesini akıştan çözer
+        v2'de yalnızca başlık (bölüm üyeleri, photo_info, tarih) döner; model
+        kayıtları bolumler() ile satır satır okunur.
+        """
+        if 'backup.json' not in self.uyeler:
+            raise ValueError('Yedek dosyasında backup.json bulunamadı')
+        with self.zip.open('backup.json') as f:
+            return json.load(io.TextIOWrapper(f, encoding='utf-8'))
+
+    def bolumler(self, backup_data=None):
+        """
+        Yedeğin (model, kayıt akışı) bölümlerini YUKLEME_SIRASI'na göre döndürür
+        Biçim (v2 NDJSON, v1.6, düz 'data' listesi) ve fark zinciri farkı burada gizlenir.
+        """
+        backup_data = backup_data or self.yedek_verisi()
+        if backup_data.get('backup_type') == 'fark':
+            return fark_zinciri_bolumleri(self, backup_data)
+        if 'data' in backup_data:
+            return duz_liste_bolumleri(backup_data['data'])
+        return [(model, kayitlar) for _, model, kayitlar in self.anahtarli_bolumler(backup_data)]
+
+    def anahtarli_bolumler(self, backup_data):
+        """(yedek anahtarı, model, kayıt akışı) üçlüleri - tam yedekler için"""
+        bolum_anahtarlari = backup_data.get('bolumler', backup_data)
+        return [
+            (key, model, backup_service.bolum_kayitlari(self.zip, backup_data, key))
+            for key, model in YUKLEME_SIRASI if key in bolum_anahtarlari
+        ]
+
+    def fotograf_uyesi(self, filename):
+        """Fotoğrafın arşivdeki üye adı, yoksa None"""
+        uye = f'photos/{filename}'
+        return uye if uye in self.uyeler else None
+
+    def _fotograf_kaynagi(self, photo_data):
+        """
+        Fotoğrafın kaynağını ('blob', yol) veya ('uye', üye adı) olarak bulur
+        Sıra: blob deposu (özet ile), arşive gömülü fotoğraf, eski yedeklerdeki photos/<ad>
+        """
+        ozet = photo_data.get('sha256')
+        if blob_service.blob_var_mi(ozet):
+            return 'blob', blob_service.blob_yolu(ozet)
+        if photo_data.get('uye') in self.uyeler:
+            return 'uye', photo_data['uye']
+        if ozet and f'blobs/{ozet}' in self.uyeler:
+            return 'uye', f'blobs/{ozet}'
+        uye = self.fotograf_uyesi(photo_data['filename'])
+        return ('uye', uye) if uye else (None, None)
+
+    def fotografi_ac(self, photo_data):
+        """Fotoğrafı okumak için açar, bulunamazsa None döndürür"""
+        tur, yer = self._fotograf_kaynagi(photo_data)
+        if tur == 'blob':
+            return open(yer, 'rb')
+        if tur == 'uye':
+            return self.zip.open(yer)
+        return None
+
+    def fotograf_dosyasi(self, photo_data):
+        """Fotoğrafı Django File olarak açar (FieldFile.save içeriği parça parça okur), bulunamazsa None"""
+        tur, yer = self._fotograf_kaynagi(photo_data)
+        if tur is None:
+            return None
+        dosya = File(self.fotografi_ac(photo_data), name=photo_data['filename'])
+        dosya.size = os.path.getsize(yer) if tur == 'blob' else self.zip.getinfo(yer).file_size
+        return dosya
+
+    def uyeyi_kopyala(self, uye, hedef_path):
+        """Üyeyi parça parça hedef dosyaya yazar (yarım dosya bırakmaz)"""
+        akisi_kopyala(self.zip.open(uye), hedef_path)
+
+
+def yedek_zinciri(backup_data):
+    """
+    Fark yedeğinin taban (tam) yedeğinin yolunu ve tabandan itibaren fark
+    yedeklerinin backup.json verilerini (eskiden yeniye) döndürür
+    Taban ve ara fark yedekleri media/backups altında aranır.
+    """
+    farklar = [backup_data]
+    while True:
+        if len(farklar) > AZAMI_ZINCIR_UZUNLUGU:
+            raise ValueError('Fark yedeği zinciri çok uzun veya döngüsel')
+        taban = os.path.basename(farklar[0]['base'])
+        taban_path = os.path.join(backup_service.yedek_dizini(), taban)
+        if not os.path.exists(taban_path):
+            raise ValueError(f'Fark yedeğinin tabanı bulunamadı: {taban}')
+        with YedekArsivi(taban_path) as arsiv:
+            taban_verisi = arsiv.yedek_verisi()
+        if taban_verisi.get('backup_type') != 'fark':
+            return taban_path, farklar
+        farklar.insert(0, taban_verisi)
+
+
+def _farklari_uygula(kayitlar, degisen, silinen):
+    """Taban kayıtlarını akış halinde verir; silinenleri atlar, değişenleri yenisiyle değiştirir"""
+    kalan = dict(degisen)
+    for kayit in kayitlar:
+        pk = str(kayit['pk'])
+        if pk in silinen:
+            continue
+        yield kalan.pop(pk, kayit)
+    # Tabanda olmayan (yeni) kayıtlar
+    yield from kalan.values()
+
+
+def fark_zinciri_bolumleri(arsiv, backup_data):
+    """
+    Fark yedeği için (model, kayıt akışı) bölümleri
+    Farklar bellekte birleştirilir (küçüktür); taban yedeğin satırları ise
+    arşivden satır satır okunurken farklar üzerine uygulanır.
+    """
+    taban_path, farklar = yedek_zinciri(backup_data)
+
+    degisen, silinen = {}, {}
+    for fark in farklar:
+        for key, pkler in fark.get('silinenler', {}).items():
+            for pk in pkler:
+                degisen.setdefault(key, {}).pop(str(pk), None)
+                silinen.setdefault(key, set()).add(str(pk))
+        for key, kayitlar in fark.get('degisiklikler', {}).items():
+            if isinstance(kayitlar, str):
+                kayitlar = json.loads(kayitlar)
+            for kayit in kayitlar:
+                degisen.setdefault(key, {})[str(kayit['pk'])] = kayit
+                silinen.get(key, set()).discard(str(kayit['pk']))
+
+    arsiv._taban = YedekArsivi(taban_path)
+    taban_bolumleri = {
+        key: kayitlar
+        for key, _, kayitlar in arsiv._taban.anahtarli_bolumler(arsiv._taban.yedek_verisi())
+    }
+    bolumler = []
+    for key, model in YUKLEME_SIRASI:
+        if key not in taban_bolumleri and key not in degisen:
+            continue
+        bolumler.append((model, _farklari_uygula(
+            taban_bolumleri.get(key, []), degisen.get(key, {}), silinen.get(key, set())
+        )))
+    return bolumler
+
+
+def fotograf_hedef_yolu(photo_data):
+    """photo_info kaydına göre fotoğrafın media altındaki hedef yolunu döndürür"""
+    if photo_data.get('new_path'):
+        return os.path.join(settings.MEDIA_ROOT, photo_data['new_path'])
+    if photo_data.get('name'):
+        # v1.7+: dosya alanındaki özgün yol - kayıtlar aynı dosyayı gösterir, ad çakışması olmaz
+        media_root = os.path.abspath(settings.MEDIA_ROOT)
+        dest_path = os.path.abspath(os.path.join(media_root, photo_data['name']))
+        if not dest_path.startswith(media_root + os.sep):
+            raise ValueError(f"Geçersiz fotoğraf yolu: {photo_data['name']}")
+        return dest_path
+
+    if photo_data['type'] == 'yazi':
+        dest_dir = os.path.join(settings.MEDIA_ROOT, 'uploads')
+    elif photo_data['type'] == 'ogrenci':
+        dest_dir = os.path.join(settings.MEDIA_ROOT, 'ogrenci_profil')
+    elif photo_data['type'] == 'galeri':
+        # Galeri fotoğrafları için yıl/ay dizini
+        current_date = timezone.now()
+        dest_dir = os.path.join(settings.MEDIA_ROOT, 'galeri',
+                                str(current_date.year),
+                                str(current_date.month).zfill(2))
+    else:
+        return None
+    return os.path.join(dest_dir, photo_data['filename'])
+
+
+def fotografi_geri_yukle(arsiv, photo_data):
+    """Tek fotoğrafı arşivden hedefine kopyalar, başarılıysa True döndürür"""
+    dest_path = fotograf_hedef_yolu(photo_data)
+    if not dest_path:
+        return False
+    kaynak = arsiv.fotografi_ac(photo_data)
+    if kaynak is None:
+        return False
+    akisi_kopyala(kaynak, dest_path)
+    return True
+
+
+def fotograflari_geri_yukle(arsiv, photo_info, ilerleme=None):
+    """
+    Tüm fotoğrafları sınırlı iş parçacığı havuzunda geri yükler
+    Dosya başına sonuçları içeren rapor döndürür:
+    {'toplam', 'yuklenen', 'bulunamayan': [ad], 'hatalar': [(ad, hata)]}
+    """
+    rapor = {'toplam': len(photo_info), 'yuklenen': 0, 'bulunamayan': [], 'hatalar': []}
+    sonuclar = blob_service.paralel_isle(
+        lambda photo_data: fotografi_geri_yukle(arsiv, photo_data), photo_info, ilerleme=ilerleme
+    )
+    for photo_data, yuklendi, hata in sonuclar:
+        if hata:
+            rapor['hatalar'].append((photo_data['filename'], str(hata)))
+            logger.warning(f"Fotoğraf geri yüklenemedi {photo_data['filename']}: {hata}")
+        elif yuklendi:
+            rapor['yuklenen'] += 1
+        else:
+            rapor['bulunamayan'].append(photo_data['filename'])
+    return rapor
+
+
+def veritabanini_geri_yukle(arsiv):
+    """
+    Arşivdeki database/db.sqlite3 üyesini veritabanı dizinine açar ve atomik
+    olarak yerine koyar. Üye yoksa False döndürür.
+    """
+    uye = 'database/db.sqlite3'
+    if uye not in arsiv.uyeler:
+        return False
+    # Aynı dizine açılır; böylece ikinci bir kopya yerine os.replace ile taşınır
+    gecici_path = snapshot_service.veritabani_yolu() + '.restore'
+    arsiv.uyeyi_kopyala(uye, gecici_path)
+    snapshot_service.anlik_goruntuyu_geri_yukle(gecici_path, kopyala=False)
+    return True
@@ -0,0 +1,73 @@
+"""
+İstatistik sinyalleri
+Sınav, ezber ve Elif Ba kayıtları kaydedildiğinde veya silindiğinde ilgili
+öğrencinin OgrenciIstatistik satırı güncellenir (stats_service). Kaydın
+öğrencisi değiştirildiyse eski öğrencinin satırı da güncellenir; eski öğrenci
+kaydın yüklendiği andaki değerden okunur, yalnızca bilinmiyorsa sorgulanır.
+Sınıf geneli değerlerin kaynağı olan modellerdeki her değişiklik önbellekteki
+sınıf istatistiklerinin sürümünü artırır (sinif_istatistik_service).
+"""
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from . import sinif_istatistik_service, stats_service
+from .models import Ders, ElifBaEzberDurumu, ElifBaEzberi, EzberKaydi, EzberSuresi, Ogrenci, SinavSonucu
+
+KAYNAK_MODELLER = (SinavSonucu, EzberKaydi, ElifBaEzberDurumu)
+
+SINIF_MODELLERI = (Ogrenci, SinavSonucu, EzberKaydi, ElifBaEzberDurumu, Ders, EzberSuresi, ElifBaEzberi)
+
+
+def yuklenen_ogrenciyi_sakla(sender, instance, **kwargs):
+    # ogrenci_id ertelenmişse (only/defer) sözlükte yoktur
+    instance._yuklenen_ogrenci_id = instance.__dict__.get('ogrenci_id')
+
+
+def onceki_ogrenciyi_sakla(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    # Veritabanından yüklenmiş veya kaydedilmiş nesnede eski öğrenci bilinir
+    if not instance._state.adding and instance._yuklenen_ogrenci_id is not None:
+        instance._onceki_ogrenci_id = instance._yuklenen_ogrenci_id
+        return
+    instance._onceki_ogrenci_id = (
+        sender._base_manager.filter(pk=instance.pk).values_list('ogrenci_id', flat=True).first()
+    )
+
+
+def kayit_kaydedildi(sender, instance, raw=False, **kwargs):
+    instance._yuklenen_ogrenci_id = instance.ogrenci_id
+    # loaddata (raw) sonrası tablo ogrenci_istatistiklerini_yenile ile oluşturulur
+    if raw:
+        return
+    stats_service.degisiklik_bildir(instance.ogrenci_id, getattr(instance, '_onceki_ogrenci_id', None))
+
+
+def kayit_silindi(sender, instance, origin=None, **kwargs):
+    # Öğrenci silinirken kayıtları da silinir; özet satırı cascade ile gider
+    if isinstance(origin, Ogrenci) or getattr(origin, 'model', None) is Ogrenci:
+        return
+    stats_service.degisiklik_bildir(instance.ogrenci_id)
+
+
+def ogrenci_kaydedildi(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats_service.degisiklik_bildir(instance.pk)
+
+
+def sinif_verisi_degisti(sender, **kwargs):
+    sinif_istatistik_service.degisiklik_bildir()
+
+
+def baglan():
+    """Sinyalleri bağlar - MainprojectConfig.ready içinden çağrılır"""
+    for model in KAYNAK_MODELLER:
+        uid = f'ogrenci_istatistik_{model._meta.model_name}'
+        post_init.connect(yuklenen_ogrenciyi_sakla, sender=model, dispatch_uid=f'{uid}_post_init')
+        pre_save.connect(onceki_ogrenciyi_sakla, sender=model, dispatch_uid=f'{uid}_pre_save')
+        post_save.connect(kayit_kaydedildi, sender=model, dispatch_uid=f'{uid}_post_save')
+        post_delete.connect(kayit_silindi, sender=model, dispatch_uid=f'{uid}_post_delete')
+    post_save.connect(ogrenci_kaydedildi, sender=Ogrenci, dispatch_uid='ogrenci_istatistik_ogrenci')
+    for model in SINIF_MODELLERI:
+        uid = f'sinif_istatistik_{model._meta.model_name}'
+        post_save.connect(sinif_verisi_degisti, sender=model, dispatch_uid=f'{uid}_post_save')
+        post_delete.connect(sinif_verisi_degisti, sender=model, dispatch_uid=f'{uid}_post_delete')
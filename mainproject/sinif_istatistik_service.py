@@ -0,0 +1,105 @@
+"""
+Sınıf geneli istatistik servisi
+Panolarda ve listelerde kullanılan sınıf geneli değerler (öğrenci sayısı,
+seviye dağılımı, sınav ve ders ortalamaları, ezber/Elif Ba durum sayıları)
+birkaç GROUP BY sorgusuyla birlikte hesaplanır ve önbellekte tutulur.
+
+Önbellek anahtarı bir sürüm numarası içerir; kaynak modeller kaydedildiğinde
+veya silindiğinde sinyaller (signals.py) sürümü transaction commit edildikten
+sonra yeniler, böylece eski değerler bir daha okunmaz. Veriler değişmedikçe
+sayfalar önbellekten beslenir. Sürümün tüm gunicorn süreçlerince görülmesi
+için önbellek süreçler arası paylaşılır (settings.CACHES, dosya tabanlı).
+"""
+import time
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Sum
+
+from .models import Ders, ElifBaEzberDurumu, ElifBaEzberi, EzberKaydi, EzberSuresi, Ogrenci, OgrenciIstatistik
+
+logger = logging.getLogger(__name__)
+
+SURUM_ANAHTARI = 'sinif_istatistikleri:surum'
+
+# Seviye dağılımı anahtarları - grafikler eski 'HAFIZLIK' seviyesini de bekler
+SEVIYELER = [kod for kod, _ in Ogrenci.SEVIYE_CHOICES] + ['HAFIZLIK']
+
+
+def onbellek_suresi():
+    """settings.SINIF_ISTATISTIK_ONBELLEK_SURESI: önbellekte tutulma süresi (saniye, varsayılan 300)"""
+    return getattr(settings, 'SINIF_ISTATISTIK_ONBELLEK_SURESI', 300)
+
+
+def _surum():
+    surum = cache.get(SURUM_ANAHTARI)
+    if surum is None:
+        # Sürüm önbellekten düştüyse eski sonuçlarla çakışmayan yeni bir değerden başlanır
+        cache.add(SURUM_ANAHTARI, time.time_ns(), None)
+        surum = cache.get(SURUM_ANAHTARI)
+    return surum
+
+
+def surumu_artir():
+    """
+    Önbellekteki sınıf istatistiklerini geçersiz kılar
+    Dosya önbelleğinde incr süreçler arası atomik değildir; her seferinde yeni
+    bir değer yazılır, eşzamanlı iki artırma da eski sürümü geçersiz kılar.
+    """
+    cache.set(SURUM_ANAHTARI, time.time_ns(), None)
+
+
+def degisiklik_bildir():
+    """Kaynak veriler değişti - sürüm transaction commit edildikten sonra artırılır"""
+    transaction.on_commit(surumu_artir)
+
+
+def _durum_sayilari(model):
+    return dict(model.objects.order_by().values_list('durum').annotate(sayi=Count('pk')))
+
+
+def hesapla():
+    """Sınıf geneli değerleri veritabanından hesaplar (önbelleğe bakmaz)"""
+    seviyeler = dict(Ogrenci.objects.order_by().values_list('seviye').annotate(sayi=Count('pk')))
+
+    # Ders başına sınav sayısı ve puan toplamı - sınıf ortalaması bunlardan çıkarılır
+    dersler = list(Ders.objects.order_by('pk').annotate(
+        sayi=Count('sinavsonucu'), toplam=Sum('sinavsonucu__puan')
+    ))
+    sinav_sayisi = sum(ders.sayi for ders in dersler)
+    puan_toplami = sum(ders.toplam or 0 for ders in dersler)
+
+    ezberler = _durum_sayilari(EzberKaydi)
+    elifbalar = _durum_sayilari(ElifBaEzberDurumu)
+
+    return {
+        'toplam_ogrenci': sum(seviyeler.values()),
+        'seviye_dagilimi': {kod: seviyeler.get(kod, 0) for kod in SEVIYELER},
+        'sinif_ortalamasi': puan_toplami / sinav_sayisi if sinav_sayisi else 0,
+        'ders_ortalamalari': {
+            ders.get_tur_display(): round(ders.toplam / ders.sayi, 1) if ders.sayi else 0
+            for ders in dersler
+        },
+        'tamamlanan_ezber': ezberler.get('TAMAMLANDI', 0),
+        'devam_eden_ezber': ezberler.get('DEVAM', 0),
+        'tamamlanan_elifba': elifbalar.get('TAMAMLANDI', 0),
+        'devam_eden_elifba': elifbalar.get('DEVAM', 0),
+        # En az bir ezber tamamlamış öğrencilerin ortalama tamamlanan ezber sayısı
+        'ezber_ortalamasi': OgrenciIstatistik.objects.filter(tamamlanan_ezber__gt=0).aggregate(
+            ortalama=Avg('tamamlanan_ezber')
+        )['ortalama'] or 0,
+        'toplam_ezber_sayisi': EzberSuresi.objects.count(),
+        'toplam_elifba_sayisi': ElifBaEzberi.objects.count(),
+    }
+
+
+def sinif_istatistikleri():
+    """Sınıf geneli değerler - veriler değişmedikçe önbellekten"""
+    anahtar = f'sinif_istatistikleri:{_surum()}'
+    istatistikler = cache.get(anahtar)
+    if istatistikler is None:
+        istatistikler = hesapla()
+        cache.set(anahtar, istatistikler, onbellek_suresi())
+    return istatistikler
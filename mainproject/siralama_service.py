@@ -0,0 +1,79 @@
+"""
+Öğrenci sıralama servisi
+Başarı sıralaması (liderlik tablosu) tek sorguda hesaplanır: ortalamalar
+OgrenciIstatistik özet tablosundan gelir, sıra numarası veritabanında RANK()
+pencere fonksiyonuyla verilir. Öğrenciler sınav ortalamasına, eşitlikte
+tamamlanan ezber sayısına göre sıralanır; sınavı olmayan öğrencilerin
+ortalaması 0 sayılır, iki ölçütte de eşit olanlar aynı sırayı paylaşır.
+Tek öğrencinin sırası, öğrenciler belleğe alınmadan önündeki öğrenciler
+sayılarak bulunur (RANK() ile aynı sonuç).
+"""
+import logging
+
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import Rank
+
+from . import stats_service
+from .models import Ogrenci
+
+logger = logging.getLogger(__name__)
+
+# Sıralama ölçütleri (istatistik_ekle alanları), önem sırasıyla - büyük olan önde
+SIRALAMA_OLCUTLERI = ('ders_ortalamasi', 'tamamlanan_ezber_sayisi')
+
+
+def _sirali(ogrenciler):
+    if ogrenciler is None:
+        ogrenciler = Ogrenci.objects.all()
+    return stats_service.istatistik_ekle(ogrenciler).annotate(
+        sira=Window(Rank(), order_by=[F(alan).desc() for alan in SIRALAMA_OLCUTLERI])
+    )
+
+
+def siralama(ogrenciler=None, en_dusukten=False):
+    """
+    Öğrencileri başarı sırasına göre queryset olarak döndürür
+    Her öğrencide sira (RANK, en başarılı 1) ile istatistik_ekle alanları
+    (ders_ortalamasi, tamamlanan_ezber_sayisi, ...) bulunur.
+    """
+    if en_dusukten:
+        return _sirali(ogrenciler).order_by(*SIRALAMA_OLCUTLERI, 'pk')
+    return _sirali(ogrenciler).order_by(*[f'-{alan}' for alan in SIRALAMA_OLCUTLERI], 'pk')
+
+
+def en_basarili(k=5, ogrenciler=None):
+    """Ortalaması en yüksek k öğrenci (liste, tek sorgu)"""
+    return list(siralama(ogrenciler)[:k])
+
+
+def en_dusuk(k=5, ogrenciler=None):
+    """Ortalaması en düşük k öğrenci (liste, tek sorgu)"""
+    return list(siralama(ogrenciler, en_dusukten=True)[:k])
+
+
+def ogrenci_sirasi(ogrenci, ogrenciler=None):
+    """
+    Öğrencinin (sıra, toplam öğrenci) değerleri - tek sorgu
+    ogrenci istatistik_ekle alanlarını taşımalıdır. Sıra, ölçütlerde öğrencinin
+    önünde olanların sayısı + 1'dir; RANK() ile aynıdır.
+    """
+    onde = Q()
+    esit = {}
+    for alan in SIRALAMA_OLCUTLERI:
+        deger = getattr(ogrenci, alan)
+        onde |= Q(**esit, **{f'{alan}__gt': deger})
+        esit[alan] = deger
+    if ogrenciler is None:
+        ogrenciler = Ogrenci.objects.all()
+    sayilar = stats_service.istatistik_ekle(ogrenciler).aggregate(
+        onde=Count('pk', filter=onde), toplam=Count('pk')
+    )
+    return sayilar['onde'] + 1, sayilar['toplam']
+
+
+def karsilastirma_verileri(ogrenciler=None):
+    """Sınıf karşılaştırma tablosu ve grafikleri için sıralı öğrenci satırları (sözlük listesi, tek sorgu)"""
+    return list(siralama(ogrenciler).values(
+        'id', 'ad_soyad', 'sira', ortalama=F('ders_ortalamasi'),
+        tamamlanan_ezber=F('tamamlanan_ezber_sayisi'), tamamlanan_elifba=F('tamamlanan_elifba_sayisi'),
+    ))
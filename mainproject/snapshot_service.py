@@ -0,0 +1,223 @@
+"""
+SQLite anlık görüntü (snapshot) servisi
+sqlite3 backup API ile çalışan veritabanının tutarlı bir kopyasını sayfa sayfa
+alır; adımlar arasında kilidi bırakarak canlı isteklerin yazmasına izin verir.
+Geri yükleme, doğrulanmış kopyanın veritabanı dosyasının yerine atomik olarak
+taşınmasıyla yapılır.
+
+Geri yüklemeden önce alınan acil durum görüntüleri media/emergency_backup
+altında en fazla ACIL_YEDEK_SAYISI dosyalık bir halka olarak tutulur; geri
+dönüş satır sayısından bağımsız olarak tek dosya değişimiyle yapılır.
+"""
+import os
+import time
+import sqlite3
+import logging
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from . import sinif_istatistik_service
+
+logger = logging.getLogger(__name__)
+
+# Her adımda kopyalanan sayfa sayısı (varsayılan sayfa boyutu 4 KB -> 1 MB)
+SAYFA_ADIMI = 256
+# Adımlar arasında yazıcılara bırakılan süre (saniye)
+ADIM_BEKLEMESI = 0.005
+# Kaynak bu kadar kez değişip kopya baştan başlarsa tek adımda kopyalanır
+AZAMI_YENIDEN_BASLAMA = 5
+
+
+class AnlikGoruntuHatasi(Exception):
+    """Anlık görüntü alınamadığında veya doğrulanamadığında fırlatılır"""
+
+
+class _CokFazlaYenidenBaslama(Exception):
+    pass
+
+
+def veritabani_yolu():
+    """Varsayılan veritabanının dosya yolunu döndürür"""
+    return str(settings.DATABASES['default']['NAME'])
+
+
+def _dogrula(path):
+    """Kopyanın açılabilir ve sağlam bir SQLite dosyası olduğunu kontrol eder"""
+    baglanti = sqlite3.connect(path)
+    try:
+        sonuc = baglanti.execute('PRAGMA quick_check').fetchone()
+    except sqlite3.DatabaseError as e:
+        raise AnlikGoruntuHatasi(f'Geçersiz veritabanı dosyası: {e}')
+    finally:
+        baglanti.close()
+    if not sonuc or sonuc[0] != 'ok':
+        raise AnlikGoruntuHatasi(f'Veritabanı bütünlük hatası: {sonuc[0] if sonuc else "?"}')
+
+
+def anlik_goruntu_al(hedef_path, kaynak_path=None, sayfa_adimi=SAYFA_ADIMI,
+                     bekleme=ADIM_BEKLEMESI, ilerleme=None):
+    """
+    Veritabanının tutarlı kopyasını hedef_path'e yazar ve istatistikleri döndürür
+
+    Kopya sayfa_adimi'lık adımlarla alınır; kaynak yalnızca bir adım süresince
+    okuma kilidi altında kalır. Kopya sırasında başka bir bağlantı yazarsa SQLite
+    kopyayı baştan başlatır; bu AZAMI_YENIDEN_BASLAMA kez olursa kalan kopya tek
+    adımda tamamlanır.
+    """
+    kaynak_path = kaynak_path or veritabani_yolu()
+    if not os.path.exists(kaynak_path):
+        raise AnlikGoruntuHatasi(f'Veritabanı bulunamadı: {kaynak_path}')
+
+    os.makedirs(os.path.dirname(hedef_path) or '.', exist_ok=True)
+    gecici_path = hedef_path + '.part'
+    if os.path.exists(gecici_path):
+        os.remove(gecici_path)
+
+    durum = {'adim': 0, 'yeniden_baslama': 0, 'kalan': None}
+
+    def _ilerleme(status, remaining, total):
+        durum['adim'] += 1
+        if durum['kalan'] is not None and remaining > durum['kalan']:
+            durum['yeniden_baslama'] += 1
+        durum['kalan'] = remaining
+        if ilerleme:
+            ilerleme(total - remaining, total)
+        if durum['yeniden_baslama'] >= AZAMI_YENIDEN_BASLAMA:
+            raise _CokFazlaYenidenBaslama()
+        if bekleme:
+            # Adımlar arasında kilit yok - bekleyen yazıcılar bu sırada çalışır
+            time.sleep(bekleme)
+
+    baslangic = time.monotonic()
+    kaynak = sqlite3.connect(kaynak_path, timeout=30)
+    hedef = sqlite3.connect(gecici_path)
+    try:
+        try:
+            kaynak.backup(hedef, pages=sayfa_adimi, progress=_ilerleme)
+        except _CokFazlaYenidenBaslama:
+            logger.warning('Veritabanı kopya sırasında sürekli değişti, tek adımda kopyalanıyor')
+            kaynak.backup(hedef, pages=-1)
+        sayfa_sayisi = hedef.execute('PRAGMA page_count').fetchone()[0]
+        sayfa_boyutu = hedef.execute('PRAGMA page_size').fetchone()[0]
+    finally:
+        hedef.close()
+        kaynak.close()
+
+    _dogrula(gecici_path)
+    os.replace(gecici_path, hedef_path)
+
+    sure = time.monotonic() - baslangic
+    boyut = sayfa_sayisi * sayfa_boyutu
+    logger.info(f'Anlık görüntü alındı: {hedef_path} ({boyut} bayt, {sure:.2f} sn)')
+    return {
+        'path': hedef_path,
+        'boyut': boyut,
+        'sayfa_sayisi': sayfa_sayisi,
+        'adim_sayisi': durum['adim'],
+        'yeniden_baslama': durum['yeniden_baslama'],
+        'sure': sure,
+    }
+
+
+def anlik_goruntuyu_geri_yukle(kaynak_path, hedef_path=None, kopyala=True):
+    """
+    Anlık görüntüyü çalışan veritabanının yerine atomik olarak koyar
+
+    Kopya önce doğrulanır ve veritabanı dizinine yazılır. Canlı dosya üzerinde
+    EXCLUSIVE kilit alınarak devam eden yazma ve sıcak journal olmadığı garanti
+    edilir, ardından dosya os.replace ile tek adımda değiştirilir.
+    kopyala=False ise kaynak dosyanın kendisi taşınır (aynı dosya sisteminde
+    olmalı; kaynak dosya yerinde kalmaz).
+    """
+    hedef_path = hedef_path or veritabani_yolu()
+    _dogrula(kaynak_path)
+
+    if kopyala:
+        gecici_path = hedef_path + '.restore'
+        kaynak = sqlite3.connect(kaynak_path)
+        hedef = sqlite3.connect(gecici_path)
+        try:
+            kaynak.backup(hedef)
+        finally:
+            hedef.close()
+            kaynak.close()
+    else:
+        gecici_path = kaynak_path
+
+    with open(gecici_path, 'rb') as f:
+        os.fsync(f.fileno())
+
+    # Bu süreçteki Django bağlantıları yeni dosyayı görebilmek için kapatılır
+    connections.close_all()
+
+    kilit = sqlite3.connect(hedef_path, timeout=30, isolation_level=None)
+    try:
+        kilit.execute('BEGIN EXCLUSIVE')
+        os.replace(gecici_path, hedef_path)
+        kilit.execute('ROLLBACK')
+    finally:
+        kilit.close()
+        if os.path.exists(gecici_path):
+            os.remove(gecici_path)
+
+    # Veritabanı tümüyle değişti - önbellekteki sınıf istatistikleri geçersiz
+    sinif_istatistik_service.surumu_artir()
+
+    logger.info(f'Veritabanı anlık görüntüden geri yüklendi: {kaynak_path}')
+
+
+def acil_durum_dizini():
+    """media/emergency_backup dizinini döndürür, yoksa oluşturur"""
+    emergency_dir = os.path.join(settings.MEDIA_ROOT, 'emergency_backup')
+    os.makedirs(emergency_dir, exist_ok=True)
+    return emergency_dir
+
+
+def acil_durum_halkasi_boyutu():
+    """Tutulacak acil durum görüntüsü sayısı (settings.ACIL_YEDEK_SAYISI)"""
+    return max(1, getattr(settings, 'ACIL_YEDEK_SAYISI', 5))
+
+
+def acil_durum_goruntuleri():
+    """Acil durum görüntüleri, yeniden eskiye (eski .json acil yedekleri dahil)"""
+    emergency_dir = acil_durum_dizini()
+    yollar = [
+        os.path.join(emergency_dir, f) for f in os.listdir(emergency_dir)
+        if f.startswith('emergency_') and f.endswith(('.sqlite3', '.json'))
+    ]
+    return sorted(yollar, key=os.path.getmtime, reverse=True)
+
+
+def acil_durum_halkasini_buda():
+    """Halka boyutunu aşan en eski görüntüleri siler, silinen sayısını döndürür"""
+    fazlalar = acil_durum_goruntuleri()[acil_durum_halkasi_boyutu():]
+    for path in fazlalar:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f'Eski acil durum görüntüsü silinemedi: {path} ({e})')
+    return len(fazlalar)
+
+
+def acil_durum_goruntusu_al():
+    """
+    Geri yükleme öncesi acil durum görüntüsü alır ve yolunu döndürür
+    Ad mikro saniye ve süreç numarası içerir - aynı saniyedeki iki geri yükleme
+    birbirinin görüntüsünü ezmez. Görüntü alındıktan sonra halka budanır.
+    """
+    zaman = timezone.now().strftime('%Y%m%d_%H%M%S_%f')
+    path = os.path.join(acil_durum_dizini(), f'emergency_{zaman}_{os.getpid()}.sqlite3')
+    anlik_goruntu_al(path)
+    acil_durum_halkasini_buda()
+    return path
+
+
+def acil_durum_goruntusune_don(path):
+    """Veritabanını verilen acil durum görüntüsüne atomik olarak geri döndürür"""
+    if not path.endswith('.sqlite3'):
+        raise AnlikGoruntuHatasi(f'Acil durum görüntüsü değil: {path}')
+    baslangic = time.monotonic()
+    anlik_goruntuyu_geri_yukle(path)
+    logger.info(f'Acil durum görüntüsüne dönüldü: {path} ({time.monotonic() - baslangic:.2f} sn)')
@@ -0,0 +1,174 @@
+"""
+Öğrenci istatistikleri servisi
+OgrenciIstatistikleri, bir öğrencinin sınav ve ezber satırları zaten
+dolaşılırken (örneğin rapora yazılırken) aynı geçişte güncellenen bir
+toplayıcıdır; ortalama, en yüksek/düşük puan ve ezber sayıları için ayrıca
+sorgu çalıştırılmaz.
+
+Listeler ve panolar öğrenci başına değerleri (ortalama puan, tamamlanan ezber
+ve Elif Ba sayısı) OgrenciIstatistik özet tablosundan okur. Tablo sınav, ezber
+ve Elif Ba kayıtları kaydedildikçe/silindikçe sinyallerle (signals.py) yalnızca
+etkilenen öğrenciler için güncellenir; sinyal göndermeyen toplu işlemler
+toplu_guncelleme() bloğu içinde çalışır.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import sinif_istatistik_service
+from .models import ElifBaEzberDurumu, EzberKaydi, Ogrenci, OgrenciIstatistik, SinavSonucu
+
+logger = logging.getLogger(__name__)
+
+# Özet tablosu bu boyutta parçalar halinde yazılır
+TOPLU_YAZMA_BOYUTU = 500
+
+OZET_ALANLARI = ['sinav_sayisi', 'puan_toplami', 'ortalama_puan', 'tamamlanan_ezber', 'tamamlanan_elifba']
+
+_yerel = threading.local()
+
+
+class OgrenciIstatistikleri:
+    """Tek öğrencinin sınav ve ezber istatistiklerini satır satır toplar"""
+
+    def __init__(self):
+        self.sinav_sayisi = 0
+        self.puan_toplami = 0
+        self.en_yuksek_puan = None
+        self.en_dusuk_puan = None
+        self.tamamlanan_ezber = 0
+        self.devam_eden_ezber = 0
+        self.tamamlanan_ezber_gunu = 0
+
+    def sinav_ekle(self, puan):
+        self.sinav_sayisi += 1
+        self.puan_toplami += puan
+        self.en_yuksek_puan = puan if self.en_yuksek_puan is None else max(self.en_yuksek_puan, puan)
+        self.en_dusuk_puan = puan if self.en_dusuk_puan is None else min(self.en_dusuk_puan, puan)
+
+    def ezber_ekle(self, durum, baslama_tarihi=None, bitis_tarihi=None):
+        """Ezber kaydını ekler ve ezberin gün cinsinden süresini döndürür (tarihler eksikse 0)"""
+        sure_gun = (bitis_tarihi - baslama_tarihi).days if baslama_tarihi and bitis_tarihi else 0
+        if durum == 'TAMAMLANDI':
+            self.tamamlanan_ezber += 1
+            self.tamamlanan_ezber_gunu += sure_gun
+        elif durum == 'DEVAM':
+            self.devam_eden_ezber += 1
+        return sure_gun
+
+    @property
+    def sinav_ortalamasi(self):
+        return self.puan_toplami / self.sinav_sayisi if self.sinav_sayisi else 0
+
+    @property
+    def ortalama_ezber_suresi(self):
+        """Tamamlanan ezberlerin ortalama süresi (gün)"""
+        return self.tamamlanan_ezber_gunu / self.tamamlanan_ezber if self.tamamlanan_ezber else 0
+
+
+def _alt_sorgu(model, toplam, **filtre):
+    deger = (
+        model.objects.filter(ogrenci=OuterRef('pk'), **filtre).order_by()
+        .values('ogrenci').annotate(deger=toplam).values('deger')
+    )
+    return Coalesce(Subquery(deger, output_field=IntegerField()), Value(0))
+
+
+def ozet_satirlari(ogrenciler):
+    """Öğrencilerin özet tablosu satırları (kaydedilmemiş) - öğrenci sayısından bağımsız tek sorgu"""
+    satirlar = ogrenciler.order_by().annotate(
+        _sinav_sayisi=_alt_sorgu(SinavSonucu, Count('pk')),
+        _puan_toplami=_alt_sorgu(SinavSonucu, Sum('puan')),
+        _tamamlanan_ezber=_alt_sorgu(EzberKaydi, Count('pk'), durum='TAMAMLANDI'),
+        _tamamlanan_elifba=_alt_sorgu(ElifBaEzberDurumu, Count('pk'), durum='TAMAMLANDI'),
+    ).values_list('pk', '_sinav_sayisi', '_puan_toplami', '_tamamlanan_ezber', '_tamamlanan_elifba')
+    for ogrenci_id, sinav_sayisi, puan_toplami, tamamlanan_ezber, tamamlanan_elifba in (
+            satirlar.iterator(chunk_size=TOPLU_YAZMA_BOYUTU)):
+        yield OgrenciIstatistik(
+            ogrenci_id=ogrenci_id,
+            sinav_sayisi=sinav_sayisi,
+            puan_toplami=puan_toplami,
+            ortalama_puan=puan_toplami / sinav_sayisi if sinav_sayisi else None,
+            tamamlanan_ezber=tamamlanan_ezber,
+            tamamlanan_elifba=tamamlanan_elifba,
+        )
+
+
+def ogrenci_istatistiklerini_guncelle(ogrenci_ids):
+    """Verilen öğrencilerin özet satırlarını yeniden hesaplar (iki sorgu: hesaplama ve upsert)"""
+    satirlar = list(ozet_satirlari(Ogrenci.objects.filter(pk__in=list(ogrenci_ids))))
+    if satirlar:
+        OgrenciIstatistik.objects.bulk_create(
+            satirlar, update_conflicts=True, unique_fields=['ogrenci'],
+            update_fields=OZET_ALANLARI + ['guncelleme'],
+        )
+    return len(satirlar)
+
+
+def yeniden_olustur():
+    """Özet tablosunu tüm öğrenciler için baştan oluşturur, yazılan satır sayısını döndürür"""
+    with transaction.atomic():
+        OgrenciIstatistik.objects.all().delete()
+        toplam = 0
+        satirlar = ozet_satirlari(Ogrenci.objects.all())
+        while True:
+            parca = [satir for _, satir in zip(range(TOPLU_YAZMA_BOYUTU), satirlar)]
+            if not parca:
+                break
+            OgrenciIstatistik.objects.bulk_create(parca)
+            toplam += len(parca)
+    # Bu yola gelen toplu işlemler sinyal göndermez - sınıf istatistikleri de yenilenmeli
+    sinif_istatistik_service.degisiklik_bildir()
+    logger.info(f"Öğrenci istatistikleri yeniden oluşturuldu: {toplam} öğrenci")
+    return toplam
+
+
+def istatistik_ekle(ogrenciler):
+    """
+    Öğrencilere özet tablosundaki değerleri ekler (aynı sorguda LEFT JOIN)
+    ders_ortalamasi (sınavı yoksa 0), tamamlanan_ezber_sayisi ve tamamlanan_elifba_sayisi.
+    """
+    return ogrenciler.annotate(
+        ders_ortalamasi=Coalesce(F('istatistik__ortalama_puan'), Value(0.0)),
+        tamamlanan_ezber_sayisi=Coalesce(F('istatistik__tamamlanan_ezber'), Value(0)),
+        tamamlanan_elifba_sayisi=Coalesce(F('istatistik__tamamlanan_elifba'), Value(0)),
+    )
+
+
+def degisiklik_bildir(*ogrenci_ids):
+    """Kayıtları değişen öğrencilerin özetini günceller; toplu_guncelleme() içindeyse blok sonuna erteler"""
+    ogrenci_ids = {ogrenci_id for ogrenci_id in ogrenci_ids if ogrenci_id is not None}
+    bekleyenler = getattr(_yerel, 'bekleyenler', None)
+    if bekleyenler is not None:
+        bekleyenler.update(ogrenci_ids)
+    elif ogrenci_ids:
+        ogrenci_istatistiklerini_guncelle(ogrenci_ids)
+
+
+@contextmanager
+def toplu_guncelleme(yeniden=False):
+    """
+    Blok içindeki değişikliklerde özet satırları kayıt kayıt güncellenmez
+    Etkilenen öğrenciler blok sonunda bir kez güncellenir. yeniden=True ise
+    (sinyal göndermeyen ham eklemeler, queryset.update) tablo baştan
+    oluşturulur. İç içe bloklarda güncellemeyi en dıştaki blok yapar.
+    """
+    if getattr(_yerel, 'bekleyenler', None) is not None:
+        _yerel.yeniden = _yerel.yeniden or yeniden
+        yield
+        return
+
+    _yerel.bekleyenler, _yerel.yeniden = set(), yeniden
+    try:
+        yield
+        bekleyenler, yeniden = _yerel.bekleyenler, _yerel.yeniden
+    finally:
+        _yerel.bekleyenler = None
+    if yeniden:
+        yeniden_olustur()
+    elif bekleyenler:
+        ogrenci_istatistiklerini_guncelle(bekleyenler)
@@ -1,3 +1,476 @@
-from django.test import TestCase
+import io
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import zipfile
 
-# Create your tests here.
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import re_path, reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import (
+    backup_service, catalog_service, file_service, restore_job_service, restore_service,
+    sinif_istatistik_service, siralama_service, stats_service, views
+)
+from .models import (
+    Ders, ElifBaEzberDurumu, ElifBaEzberi, EzberKaydi, EzberSuresi, GunlukMesaj, Ogrenci, SinavSonucu
+)
+
+# Testler DEBUG=False çalışır; medya_yollari() boş döner, medya yolu burada tanımlanır
+urlpatterns = [re_path(r'^media/(?P<path>.*)$', file_service.medya_sun)]
+
+
+@override_settings(ROOT_URLCONF='mainproject.tests')
+class MedyaSunumuTests(TestCase):
+    """Medya yolundan gizli dizinlerin (yedekler, veritabanı...) sunulmaması"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        for dizin, ad in (('database', 'db.sqlite3'), ('backups', 'backup_1.zip'), ('galeri', 'foto.jpg')):
+            os.makedirs(os.path.join(self.media_root, dizin))
+            with open(os.path.join(self.media_root, dizin, ad), 'wb') as f:
+                f.write(b'icerik')
+        ayarlar = override_settings(MEDIA_ROOT=self.media_root)
+        ayarlar.enable()
+        self.addCleanup(ayarlar.disable)
+
+    def test_gizli_dizinlerin_farkli_yazimlari_sunulmaz(self):
+        for url in (
+            '/media/database/db.sqlite3',
+            '/media/./database/db.sqlite3',
+            '/media/.//database/db.sqlite3',
+            '/media//database/db.sqlite3',
+            '/media/database//db.sqlite3',
+            '/media/x/../database/db.sqlite3',
+            '/media/galeri/../backups/backup_1.zip',
+            '/media/./backups/backup_1.zip',
+            '/media/Backups/backup_1.zip',
+            '/media/../media/database/db.sqlite3',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_gizli_dizinler_oturumlu_ama_yonetici_olmayana_sunulmaz(self):
+        self.client.force_login(User.objects.create_user('ogretmen', password='x'))
+        self.assertEqual(self.client.get('/media/./database/db.sqlite3').status_code, 404)
+
+    def test_gizli_dizinler_yoneticiye_sunulur(self):
+        self.client.force_login(User.objects.create_user('yonetici', password='x', is_staff=True))
+        response = self.client.get('/media/./backups/backup_1.zip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'icerik')
+
+    def test_normal_medya_sunulur(self):
+        for url in ('/media/galeri/foto.jpg', '/media/./galeri/foto.jpg', '/media/x/../galeri/foto.jpg'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+
+def sinif_olustur(ogrenci_sayisi):
+    """
+    Sorgu sayısı testleri için sınıf verisi
+    Öğrencilerin sınav, ezber ve Elif Ba kayıt sayıları farklıdır (0-4); ilk
+    öğrencinin hiç kaydı yoktur. Kayıtlar toplu eklenir, özet tablosu sonra oluşturulur.
+    """
+    # Dersler, ezber sureleri ve Elif Ba ezberleri post_migrate ile (apps.py) gelir
+    dersler = list(Ders.objects.order_by('pk'))
+    sureler = list(EzberSuresi.objects.order_by('sira'))
+    elifba = list(ElifBaEzberi.objects.order_by('sira'))
+    seviyeler = [seviye for seviye, _ in Ogrenci.SEVIYE_CHOICES]
+    ogrenciler = Ogrenci.objects.bulk_create(
+        Ogrenci(ad_soyad=f'Öğrenci {i:03d}', seviye=seviyeler[i % len(seviyeler)],
+                kayit_tarihi=date(2024, 9, 1) + timedelta(days=i))
+        for i in range(ogrenci_sayisi)
+    )
+    sinavlar, ezberler, durumlar = [], [], []
+    for i, ogrenci in enumerate(ogrenciler):
+        for j, ders in enumerate(dersler[:i % 5]):
+            sinavlar.append(SinavSonucu(ogrenci=ogrenci, ders=ders, sinav_tipi='GENEL', puan=(i * 7 + j * 13) % 101))
+        for j, sure in enumerate(sureler[:i % 5]):
+            ezberler.append(EzberKaydi(ogrenci=ogrenci, sure=sure, durum='TAMAMLANDI' if j % 2 == 0 else 'DEVAM',
+                                       baslama_tarihi=date(2024, 10, 1), bitis_tarihi=date(2024, 10, 10 + j)))
+        for j, ezber in enumerate(elifba[:i % 5]):
+            durumlar.append(ElifBaEzberDurumu(ogrenci=ogrenci, ezber=ezber,
+                                              durum='TAMAMLANDI' if j % 2 == 0 else 'DEVAM'))
+    SinavSonucu.objects.bulk_create(sinavlar)
+    EzberKaydi.objects.bulk_create(ezberler)
+    ElifBaEzberDurumu.objects.bulk_create(durumlar)
+    stats_service.yeniden_olustur()
+    return ogrenciler
+
+
+class SorguSayisiTestleri:
+    """
+    Sayfaların sorgu sayısı öğrenci ve kayıt sayısından bağımsız olmalı (N+1 yok)
+    Aynı testler farklı sınıf büyüklükleriyle çalışır ve aynı sayıyı bekler.
+    Giriş gerektiren sayfaların sayılarına oturum ve kullanıcı sorguları (2) dahildir.
+    """
+    ogrenci_sayisi = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ogrenciler = sinif_olustur(cls.ogrenci_sayisi)
+        cls.kayitsiz, cls.en_cok_kayitli = cls.ogrenciler[0], cls.ogrenciler[4]
+        cls.kullanici = User.objects.create_user('yonetici', password='x', is_staff=True)
+
+    def setUp(self):
+        # admin_dashboard bugünün mesajı yoksa üretip yazar; mesaj hazır olmalı
+        GunlukMesaj.objects.create(tarih=timezone.now().date(), mesaj='Hayırlı günler', ai_generated=False)
+        # Sınıf geneli değerler önbellekten okunur; ilk hesaplama ölçüme katılmaz
+        cache.clear()
+        sinif_istatistik_service.sinif_istatistikleri()
+        self.client.force_login(self.kullanici)
+
+    def _getir(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def test_ogrenci_detay_excel(self):
+        for ogrenci in (self.kayitsiz, self.en_cok_kayitli):
+            with self.subTest(ogrenci=ogrenci.ad_soyad), self.assertNumQueries(3):
+                self._getir(reverse('export_ogrenci_detay_excel', args=[ogrenci.pk]))
+
+    def test_admin_dashboard(self):
+        with self.assertNumQueries(8):
+            self._getir(reverse('admin-dashboard'))
+
+    def test_ogrenci_detay(self):
+        for ogrenci in (self.kayitsiz, self.en_cok_kayitli):
+            with self.subTest(ogrenci=ogrenci.ad_soyad), self.assertNumQueries(11):
+                self._getir(reverse('ogrenci_detay', args=[ogrenci.pk]))
+
+    def test_ogrenci_sirasi_tek_sorgu_ve_rank_ile_ayni(self):
+        siralar = {ogrenci.pk: ogrenci.sira for ogrenci in siralama_service.siralama()}
+        ogrenciler = stats_service.istatistik_ekle(Ogrenci.objects.filter(pk__in=[
+            self.kayitsiz.pk, self.en_cok_kayitli.pk, self.ogrenciler[-1].pk
+        ]))
+        for ogrenci in ogrenciler:
+            with self.subTest(ogrenci=ogrenci.ad_soyad):
+                with self.assertNumQueries(1):
+                    sira, toplam = siralama_service.ogrenci_sirasi(ogrenci)
+                self.assertEqual((sira, toplam), (siralar[ogrenci.pk], self.ogrenci_sayisi))
+
+    def test_ogrenci_listesi(self):
+        for siralama in ('ad_soyad', '-ortalama', 'tamamlanan_ezber'):
+            with self.subTest(siralama=siralama), self.assertNumQueries(5):
+                self._getir(f"{reverse('ogrenci_listesi')}?siralama={siralama}&page=2")
+
+
+class KucukSinifSorguSayisiTests(SorguSayisiTestleri, TestCase):
+    ogrenci_sayisi = 5
+
+
+class BuyukSinifSorguSayisiTests(SorguSayisiTestleri, TestCase):
+    ogrenci_sayisi = 50
+
+
+def gecici_medya_dizini(test):
+    """Testi geçici bir MEDIA_ROOT ile çalıştırır (yedekler, blob deposu, iş dosyaları)"""
+    media_root = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+    ayarlar = override_settings(MEDIA_ROOT=media_root)
+    ayarlar.enable()
+    test.addCleanup(ayarlar.disable)
+    return media_root
+
+
+def veritabani_durumu():
+    """
+    Yedeklenen modellerin satırları: {yedek anahtarı: {pk: alanlar}}
+    Yedekle aynı JSON serileştiricisinden geçer (zamanlar milisaniye hassasiyetinde).
+    """
+    return {
+        key: {kayit['pk']: kayit['fields'] for kayit in json.loads(serializers.serialize('json', queryset))}
+        for key, queryset in backup_service.yedek_bolumleri()
+    }
+
+
+def tam_yedek_al(fotograflari_gom=None):
+    zip_filename, akis = backup_service.yedek_akisi_olustur(fotograflari_gom)
+    for _ in akis:
+        pass
+    return os.path.join(backup_service.yedek_dizini(), zip_filename)
+
+
+class FarkYedegiTests(TestCase):
+    """Fark yedekleri ve zincirin geri yüklenmesi: tam yedek -> fark -> fark"""
+
+    def setUp(self):
+        gecici_medya_dizini(self)
+        self.ogrenciler = sinif_olustur(6)
+        self.tam_yedek = tam_yedek_al()
+
+    def _fark_al(self):
+        sonuc = backup_service.fark_yedegi_olustur()
+        # Fark yedeği adı saniye çözünürlüklü; zincirdeki sonraki fark aynı adı almasın
+        time.sleep(1)
+        return sonuc
+
+    def _zinciri_geri_yukle(self, zip_path):
+        with restore_service.YedekArsivi(zip_path) as arsiv:
+            restore_service.toplu_geri_yukle(arsiv.bolumler())
+
+    def test_iki_halkali_zincir_veritabanini_aynen_geri_yukler(self):
+        duzenlenen, silinen_ogrenci = self.ogrenciler[1], self.ogrenciler[5]
+        # 1. fark: düzenleme, ekleme, silme (silinen öğrencinin kayıtları da gider)
+        duzenlenen.ozel_notlar = 'ilk düzenleme'
+        duzenlenen.save()
+        silinen_sinav = SinavSonucu.objects.filter(ogrenci=self.ogrenciler[4]).order_by('pk').first()
+        silinen_sinav.delete()
+        eklenen_sinav = SinavSonucu.objects.create(
+            ogrenci=self.ogrenciler[2], ders=Ders.objects.first(), sinav_tipi='GENEL', puan=77
+        )
+        durum = ElifBaEzberDurumu.objects.filter(ogrenci=self.ogrenciler[3]).first()
+        durum.durum = 'DEVAM' if durum.durum == 'TAMAMLANDI' else 'TAMAMLANDI'
+        durum.save()
+        silinen_ogrenci.delete()
+        fark1 = self._fark_al()
+        self.assertEqual(fark1['base'], os.path.basename(self.tam_yedek))
+        self.assertGreater(fark1['silinen'], 1)
+
+        # 2. fark: aynı satırı yeniden düzenle, 1. farkta eklenen satırı sil,
+        # 1. farkta silinen satırı aynı pk ile geri ekle
+        duzenlenen.ozel_notlar = 'ikinci düzenleme'
+        duzenlenen.save()
+        eklenen_sinav.delete()
+        silinen_sinav.save(force_insert=True)
+        fark2 = self._fark_al()
+        self.assertEqual(fark2['base'], fark1['filename'])
+
+        beklenen = veritabani_durumu()
+        Ogrenci.objects.all().delete()
+        Ogrenci.objects.create(ad_soyad='Yedekte olmayan', seviye=Ogrenci.SEVIYE_CHOICES[0][0])
+
+        self._zinciri_geri_yukle(fark2['path'])
+        self.assertEqual(veritabani_durumu(), beklenen)
+        self.assertEqual(Ogrenci.objects.get(pk=duzenlenen.pk).ozel_notlar, 'ikinci düzenleme')
+        self.assertTrue(SinavSonucu.objects.filter(pk=silinen_sinav.pk).exists())
+        self.assertFalse(SinavSonucu.objects.filter(pk=eklenen_sinav.pk).exists())
+        self.assertFalse(Ogrenci.objects.filter(pk=silinen_ogrenci.pk).exists())
+
+    def test_ara_halka_geri_yuklenebilir(self):
+        self.ogrenciler[0].delete()
+        fark1 = self._fark_al()
+        beklenen = veritabani_durumu()
+        Ogrenci.objects.create(ad_soyad='Sonradan eklenen', seviye=Ogrenci.SEVIYE_CHOICES[0][0])
+        self._fark_al()
+
+        self._zinciri_geri_yukle(fark1['path'])
+        self.assertEqual(veritabani_durumu(), beklenen)
+
+    def test_ortusme_payindaki_degisiklik_farka_girer(self):
+        # Taban yedek okunurken kaydedilmiş gibi: zaman damgası taban tarihinden biraz önce
+        ogrenci = self.ogrenciler[2]
+        taban_tarihi = parse_datetime(backup_service.yedek_durumu(self.tam_yedek)['backup_date'])
+        Ogrenci.objects.update(son_guncelleme=taban_tarihi - timedelta(hours=1))
+        Ogrenci.objects.filter(pk=ogrenci.pk).update(
+            ozel_notlar='geç commit', son_guncelleme=taban_tarihi - backup_service.FARK_ORTUSME_PAYI / 2
+        )
+        fark = self._fark_al()
+        self.assertEqual(fark['degisen'], 1)
+
+        Ogrenci.objects.filter(pk=ogrenci.pk).update(ozel_notlar='')
+        self._zinciri_geri_yukle(fark['path'])
+        self.assertEqual(Ogrenci.objects.get(pk=ogrenci.pk).ozel_notlar, 'geç commit')
+
+
+class ParcaliYuklemeTests(TestCase):
+    """Parçalı yedek yükleme protokolü: oturum, ofsetli PUT, tamamlama"""
+
+    def setUp(self):
+        self.media_root = gecici_medya_dizini(self)
+        self.client.force_login(User.objects.create_user('yonetici', password='x', is_staff=True))
+        arsiv = io.BytesIO()
+        with zipfile.ZipFile(arsiv, 'w') as zipf:
+            zipf.writestr('backup.json', '{}')
+        self.veri = arsiv.getvalue()
+        self.ozet = hashlib.sha256(self.veri).hexdigest()
+
+    def _oturum_ac(self, **alanlar):
+        response = self.client.post(reverse('restore_upload'), {'boyut': len(self.veri), **alanlar})
+        self.assertEqual(response.status_code, 201)
+        oturum = response.json()
+        self.assertEqual(oturum['offset'], 0)
+        return oturum['id']
+
+    def _parca_gonder(self, yukleme_id, offset, parca, **basliklar):
+        return self.client.put(
+            reverse('restore_upload_chunk', args=[yukleme_id]), parca,
+            content_type='application/octet-stream', headers={'Upload-Offset': str(offset), **basliklar}
+        )
+
+    def _ofset(self, yukleme_id):
+        return self.client.get(reverse('restore_upload_chunk', args=[yukleme_id])).json()['offset']
+
+    def _tamamla(self, yukleme_id, **alanlar):
+        with mock.patch('mainproject.views.restore_job_service.arka_planda_calistir') as calistir:
+            response = self.client.post(reverse('restore_upload_complete', args=[yukleme_id]), alanlar)
+        return response, calistir
+
+    def test_yanlis_ofsetli_parca_409_ve_dogru_ofset_doner(self):
+        yukleme_id = self._oturum_ac()
+        yari = len(self.veri) // 2
+        response = self._parca_gonder(yukleme_id, 0, self.veri[:yari])
+        self.assertEqual(response.json()['offset'], yari)
+
+        # Yanıtı kaybolan parça yeniden gönderildi
+        response = self._parca_gonder(yukleme_id, 0, self.veri[:yari])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], yari)
+        self.assertEqual(self._ofset(yukleme_id), yari)
+
+    def test_ozeti_tutmayan_parca_eklenmez(self):
+        yukleme_id = self._oturum_ac()
+        response = self._parca_gonder(yukleme_id, 0, self.veri, **{'X-Chunk-Sha256': '0' * 64})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._ofset(yukleme_id), 0)
+
+        response = self._parca_gonder(yukleme_id, 0, self.veri, **{'X-Chunk-Sha256': self.ozet})
+        self.assertEqual(response.json()['offset'], len(self.veri))
+
+    def test_dosya_ozeti_uyusmazsa_yukleme_sifirlanir(self):
+        yukleme_id = self._oturum_ac(sha256='0' * 64)
+        self._parca_gonder(yukleme_id, 0, self.veri)
+
+        response, calistir = self._tamamla(yukleme_id)
+        self.assertEqual(response.status_code, 400)
+        calistir.assert_not_called()
+        self.assertEqual(self._ofset(yukleme_id), 0)
+
+    def test_tamamlanan_yukleme_geri_yukleme_isini_baslatir(self):
+        yukleme_id = self._oturum_ac(sha256=self.ozet)
+        response, _ = self._tamamla(yukleme_id)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 0)
+
+        self._parca_gonder(yukleme_id, 0, self.veri)
+        response, calistir = self._tamamla(yukleme_id)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['id'], yukleme_id)
+        calistir.assert_called_once()
+        with open(response.json()['zip_path'], 'rb') as f:
+            self.assertEqual(f.read(), self.veri)
+
+        self.assertEqual(self._parca_gonder(yukleme_id, 0, self.veri).status_code, 400)
+
+    def test_bilinmeyen_yukleme_dizin_birakmaz(self):
+        response, _ = self._tamamla('bilinmeyen')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self._parca_gonder('bilinmeyen', 0, self.veri).status_code, 404)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'temp_restore', 'bilinmeyen')))
+
+
+def geri_yukleme_isi_calistir(yedek_path, dry_run=False):
+    """Yedeği geri yükleme işi olarak kuyruğa ekler, işi bu süreçte çalıştırır ve iş kaydını döndürür"""
+    is_id = restore_job_service.yeni_is_id()
+    zip_path = os.path.join(restore_job_service.yukleme_dizini(is_id), 'restore.zip')
+    shutil.copy(yedek_path, zip_path)
+    restore_job_service.is_olustur(is_id, zip_path, dry_run=dry_run)
+    with mock.patch('builtins.print'):
+        restore_job_service.bekleyen_isleri_calistir(views.restore_backup_process)
+    return restore_job_service.is_oku(is_id)
+
+
+class DenemeGeriYuklemeTests(TestCase):
+    """Deneme modu (dry-run): fark raporu doğru sayar, veritabanına yazmaz"""
+
+    def setUp(self):
+        gecici_medya_dizini(self)
+        self.ogrenciler = sinif_olustur(6)
+        self.yedek = tam_yedek_al()
+
+    def _deneme_raporu(self):
+        is_kaydi = geri_yukleme_isi_calistir(self.yedek, dry_run=True)
+        self.assertEqual(is_kaydi['status'], 'completed', is_kaydi['message'])
+        return is_kaydi['rapor']
+
+    def test_degismeyen_veritabaninda_tum_satirlar_ayni(self):
+        onceki = veritabani_durumu()
+        rapor = self._deneme_raporu()
+        self.assertEqual(
+            {tur: rapor['toplam'][tur] for tur in ('eklenecek', 'silinecek', 'degisecek')},
+            {'eklenecek': 0, 'silinecek': 0, 'degisecek': 0},
+        )
+        self.assertEqual(rapor['toplam']['ayni'], sum(len(satirlar) for satirlar in onceki.values()))
+        self.assertEqual(veritabani_durumu(), onceki)
+
+    def test_tek_satir_degisince_degisecek_bir(self):
+        sinav = SinavSonucu.objects.order_by('pk').first()
+        sinav.puan = (sinav.puan + 1) % 101
+        sinav.save()
+        onceki = veritabani_durumu()
+
+        rapor = self._deneme_raporu()
+        satir = next(satir for satir in rapor['modeller'] if satir['model'] == 'mainproject.SinavSonucu')
+        self.assertEqual((satir['degisecek'], satir['ornekler']['degisecek']), (1, [sinav.pk]))
+        self.assertEqual(rapor['toplam']['degisecek'], 1)
+        self.assertEqual(veritabani_durumu(), onceki)
+
+
+class FotografGeriYuklemeTests(TestCase):
+    """Yedek başka sunucuda (boş media/) geri yüklenince fotoğraflar"""
+
+    def setUp(self):
+        gecici_medya_dizini(self)
+        self.ogrenci = Ogrenci.objects.create(ad_soyad='Fotoğraflı', seviye='HAZ1')
+        self.ogrenci.profil_foto.save('profil.jpg', ContentFile(b'\xff\xd8\xff fotograf'))
+
+    def _baska_sunucuda_geri_yukle(self, yedek):
+        tasinan = os.path.join(tempfile.mkdtemp(), 'yedek.zip')
+        self.addCleanup(shutil.rmtree, os.path.dirname(tasinan), ignore_errors=True)
+        shutil.copy(yedek, tasinan)
+        yeni_medya = gecici_medya_dizini(self)
+        return geri_yukleme_isi_calistir(tasinan), yeni_medya
+
+    def test_fotografsiz_yedekte_eksik_fotograflar_iste_uyari_olur(self):
+        is_kaydi, _ = self._baska_sunucuda_geri_yukle(tam_yedek_al())
+        self.assertEqual(is_kaydi['status'], 'completed')
+        self.assertEqual(is_kaydi['uyarilar']['bulunamayan'], 1)
+        self.assertEqual(is_kaydi['uyarilar']['ornekler'], ['profil.jpg'])
+        self.assertIn('1/1 fotoğraf geri yüklenemedi', is_kaydi['message'])
+
+    def test_tasinabilir_yedek_fotograflari_icerir(self):
+        is_kaydi, yeni_medya = self._baska_sunucuda_geri_yukle(tam_yedek_al(fotograflari_gom=True))
+        self.assertEqual(is_kaydi['status'], 'completed')
+        self.assertNotIn('uyarilar', is_kaydi)
+        foto = Ogrenci.objects.get(pk=self.ogrenci.pk).profil_foto
+        self.assertTrue(foto.path.startswith(yeni_medya))
+        with open(foto.path, 'rb') as f:
+            self.assertEqual(f.read(), b'\xff\xd8\xff fotograf')
+
+
+class YedekDogrulamaTests(TestCase):
+    """Doğrulama yalnızca yedek dizinindeki ZIP'ler için çalışır ve kataloğa yazılır"""
+
+    def setUp(self):
+        gecici_medya_dizini(self)
+        self.client.force_login(User.objects.create_user('yonetici', password='x', is_staff=True))
+        self.yedek = os.path.basename(tam_yedek_al())
+
+    def test_yedek_olmayan_adlar_dogrulanmaz(self):
+        os.makedirs(os.path.join(backup_service.yedek_dizini(), 'blobs'), exist_ok=True)
+        for filename in ('..', '.', 'blobs', 'katalog.json', 'yok.zip'):
+            with self.subTest(filename=filename):
+                response = self.client.get(reverse('verify_backup', args=[filename]))
+                self.assertEqual(response.status_code, 404)
+        self.assertEqual([kayit['filename'] for kayit in catalog_service.yedekler()], [self.yedek])
+
+    def test_yedek_dogrulanir_ve_kataloga_yazilir(self):
+        response = self.client.get(reverse('verify_backup', args=[self.yedek]))
+        self.assertTrue(response.json()['gecerli'], response.json())
+        self.assertTrue(catalog_service.yedekler()[0]['dogrulama']['gecerli'])
@@ -0,0 +1,255 @@
+"""
+Parçalı ve kaldığı yerden devam edebilen yedek yükleme servisi
+Büyük yedekler tek multipart istekte değil, bir yükleme oturumu açılıp
+ofset adresli parçalar halinde (PUT) gönderilir. Parçalar geri yükleme işinin
+dizinindeki geçici dosyanın sonuna eklenir; onaylanan ofset her zaman bu
+dosyanın boyutudur, bağlantı koparsa istemci bu ofsetten devam eder.
+Yükleme tamamlanınca boyut ve SHA-256 özeti denetlenir, geri yükleme işi
+ancak bundan sonra oluşturulur.
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import zipfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import restore_job_service
+
+try:
+    import fcntl
+except ImportError:  # Windows - yalnızca süreç içi kilit
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+OTURUM_DOSYASI = 'yukleme.json'
+GECICI_DOSYA = 'restore.zip.part'
+ARSIV_DOSYASI = 'restore.zip'
+
+PARCA_BOYUTU = 64 * 1024
+
+# Tamamlanmayan yükleme oturumları bu süre sonra silinir
+YUKLEME_SAKLAMA_SURESI = 24 * 60 * 60
+
+# Aynı süreçte eşzamanlı iki parça eklenmesini engeller; süreçler arası
+# koruma geçici dosya üzerindeki flock ile sağlanır (_gecici_dosya_kilidi)
+_kilit = threading.Lock()
+
+
+class OfsetUyusmazligi(ValueError):
+    """Parça, onaylanmış ofsetten farklı bir yerden gönderildi"""
+
+    def __init__(self, offset):
+        super().__init__(f'Beklenen ofset {offset}')
+        self.offset = offset
+
+
+def azami_parca_boyutu():
+    """settings.YEDEK_YUKLEME_PARCA_BOYUTU: tek PUT isteğinde kabul edilen en büyük parça (bayt)"""
+    return getattr(settings, 'YEDEK_YUKLEME_PARCA_BOYUTU', 8 * 1024 * 1024)
+
+
+def _oturum_yolu(yukleme_id):
+    return os.path.join(restore_job_service.yukleme_dizini(yukleme_id), OTURUM_DOSYASI)
+
+
+def _gecici_yol(yukleme_id):
+    return os.path.join(restore_job_service.yukleme_dizini(yukleme_id), GECICI_DOSYA)
+
+
+def _oturum_yaz(oturum):
+    path = _oturum_yolu(oturum['id'])
+    gecici_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(gecici_path, 'w', encoding='utf-8') as f:
+        json.dump(oturum, f, ensure_ascii=False)
+    os.replace(gecici_path, path)
+
+
+@contextmanager
+def _gecici_dosya_kilidi(yukleme_id):
+    """
+    Geçici dosyayı sonuna eklemek üzere açar ve tüm worker süreçlerine karşı kilitler
+    Ofset denetimi ile ekleme aynı kilit altında yapılır. Kilit beklenirken dosya
+    değiştirildiyse (yükleme tamamlandı veya özet uyuşmadığı için sıfırlandı)
+    güncel dosya yeniden açılır; dosya yoksa hata verilir, yeniden oluşturulmaz.
+    """
+    gecici_path = _gecici_yol(yukleme_id)
+    with _kilit:
+        while True:
+            try:
+                hedef = os.fdopen(os.open(gecici_path, os.O_WRONLY | os.O_APPEND), 'ab')
+            except FileNotFoundError:
+                oturum = oturum_oku(yukleme_id)
+                if oturum and oturum['tamamlandi']:
+                    raise ValueError('Yükleme zaten tamamlandı')
+                raise LookupError('Yükleme oturumu bulunamadı')
+            with hedef:
+                if fcntl:
+                    fcntl.flock(hedef, fcntl.LOCK_EX)
+                try:
+                    guncel = os.stat(gecici_path).st_ino == os.fstat(hedef.fileno()).st_ino
+                except FileNotFoundError:
+                    guncel = False
+                if guncel:
+                    yield hedef
+                    return
+
+
+def oturum_oku(yukleme_id):
+    """Yükleme oturumunu onaylanmış ofsetiyle döndürür, yoksa None"""
+    if not yukleme_id or os.path.basename(yukleme_id) != yukleme_id:
+        return None
+    path = os.path.join(settings.MEDIA_ROOT, 'temp_restore', yukleme_id, OTURUM_DOSYASI)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            oturum = json.load(f)
+    except (OSError, ValueError):
+        return None
+    try:
+        oturum['offset'] = os.path.getsize(_gecici_yol(yukleme_id))
+    except OSError:
+        oturum['offset'] = oturum['boyut'] if oturum['tamamlandi'] else 0
+    return oturum
+
+
+def eski_yuklemeleri_temizle():
+    """Süresi içinde tamamlanmayan yükleme oturumlarını siler"""
+    kok = os.path.join(settings.MEDIA_ROOT, 'temp_restore')
+    if not os.path.isdir(kok):
+        return
+    sinir = time.time() - YUKLEME_SAKLAMA_SURESI
+    for yukleme_id in os.listdir(kok):
+        oturum_path = os.path.join(kok, yukleme_id, OTURUM_DOSYASI)
+        gecici_path = os.path.join(kok, yukleme_id, GECICI_DOSYA)
+        try:
+            son_islem = os.path.getmtime(gecici_path if os.path.exists(gecici_path) else oturum_path)
+        except OSError:
+            continue
+        if os.path.exists(gecici_path) and son_islem < sinir:
+            shutil.rmtree(os.path.join(kok, yukleme_id), ignore_errors=True)
+            logger.info(f"Tamamlanmayan yükleme silindi: {yukleme_id}")
+
+
+def oturum_olustur(boyut, sha256=None, dry_run=False):
+    """
+    Yeni yükleme oturumu açar
+    boyut: yüklenecek dosyanın bayt cinsinden boyutu
+    sha256: verilirse tamamlanınca dosyanın özetiyle karşılaştırılır
+    dry_run: tamamlanınca oluşturulacak geri yükleme işi deneme modunda çalışır
+    """
+    if boyut <= 0:
+        raise ValueError('Dosya boyutu pozitif olmalı')
+    if sha256 and (len(sha256) != 64 or any(c not in '0123456789abcdef' for c in sha256.lower())):
+        raise ValueError('Geçersiz SHA-256 özeti')
+    eski_yuklemeleri_temizle()
+
+    yukleme_id = restore_job_service.yeni_is_id()
+    oturum = {
+        'id': yukleme_id,
+        'boyut': boyut,
+        'sha256': sha256.lower() if sha256 else None,
+        'dry_run': dry_run,
+        'tamamlandi': False,
+        'olusturma': timezone.now().isoformat(),
+    }
+    _oturum_yaz(oturum)
+    open(_gecici_yol(yukleme_id), 'wb').close()
+    logger.info(f"Yükleme oturumu açıldı: {yukleme_id} ({boyut} bayt)")
+    return oturum_oku(yukleme_id)
+
+
+def parca_ekle(yukleme_id, offset, kaynak, uzunluk, sha256=None):
+    """
+    kaynak akışından uzunluk baytı geçici dosyanın sonuna ekler, yeni ofseti döndürür
+
+    Parça önce ayrı bir dosyaya yazılır; sha256 verilmişse özeti tutmayan parça
+    hiç eklenmez. Bellekte aynı anda yalnızca PARCA_BOYUTU kadar veri tutulur.
+    """
+    oturum = oturum_oku(yukleme_id)
+    if not oturum:
+        raise LookupError('Yükleme oturumu bulunamadı')
+    if oturum['tamamlandi']:
+        raise ValueError('Yükleme zaten tamamlandı')
+    if uzunluk > azami_parca_boyutu():
+        raise ValueError(f'Parça en fazla {azami_parca_boyutu()} bayt olabilir')
+    if offset + uzunluk > oturum['boyut']:
+        raise ValueError('Parça dosya boyutunu aşıyor')
+
+    upload_dir = restore_job_service.yukleme_dizini(yukleme_id)
+    ozet, okunan = hashlib.sha256(), 0
+    with tempfile.TemporaryFile(dir=upload_dir) as parca_dosyasi:
+        while okunan < uzunluk:
+            veri = kaynak.read(min(PARCA_BOYUTU, uzunluk - okunan))
+            if not veri:
+                break
+            ozet.update(veri)
+            parca_dosyasi.write(veri)
+            okunan += len(veri)
+        if okunan != uzunluk:
+            raise ValueError(f'Parça eksik geldi ({okunan}/{uzunluk} bayt)')
+        if sha256 and ozet.hexdigest() != sha256.lower():
+            raise ValueError('Parça özeti uyuşmuyor')
+
+        parca_dosyasi.seek(0)
+        with _gecici_dosya_kilidi(yukleme_id) as hedef:
+            mevcut = os.fstat(hedef.fileno()).st_size
+            if offset != mevcut:
+                raise OfsetUyusmazligi(mevcut)
+            shutil.copyfileobj(parca_dosyasi, hedef, PARCA_BOYUTU)
+            hedef.flush()
+            os.fsync(hedef.fileno())
+            return mevcut + uzunluk
+
+
+def _dosya_ozeti(path):
+    ozet = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for parca in iter(lambda: f.read(PARCA_BOYUTU), b''):
+            ozet.update(parca)
+    return ozet.hexdigest()
+
+
+def tamamla(yukleme_id, sha256=None):
+    """
+    Yüklemeyi denetler ve geri yükleme işini kuyruğa ekler, iş kaydını döndürür
+    Boyut eksikse veya özet uyuşmuyorsa ValueError; özet uyuşmazsa yüklenen
+    dosya silinir ve yükleme baştan yapılmalıdır.
+    """
+    # Kilit yükleme dizinini oluşturur; bilinmeyen id için dizin bırakılmaz
+    if not oturum_oku(yukleme_id):
+        raise LookupError('Yükleme oturumu bulunamadı')
+    with _gecici_dosya_kilidi(yukleme_id):
+        oturum = oturum_oku(yukleme_id)
+        if not oturum:
+            raise LookupError('Yükleme oturumu bulunamadı')
+        if oturum['tamamlandi']:
+            raise ValueError('Yükleme zaten tamamlandı')
+        if oturum['offset'] != oturum['boyut']:
+            raise OfsetUyusmazligi(oturum['offset'])
+
+        gecici_path = _gecici_yol(yukleme_id)
+        beklenen = (sha256 or oturum['sha256'] or '').lower()
+        ozet = _dosya_ozeti(gecici_path)
+        if beklenen and ozet != beklenen:
+            os.remove(gecici_path)
+            open(gecici_path, 'wb').close()
+            raise ValueError('Dosya özeti uyuşmuyor, yükleme baştan yapılmalı')
+        if not zipfile.is_zipfile(gecici_path):
+            raise ValueError('Yüklenen dosya geçerli bir ZIP arşivi değil')
+
+        zip_path = os.path.join(os.path.dirname(gecici_path), ARSIV_DOSYASI)
+        os.replace(gecici_path, zip_path)
+        oturum.update(tamamlandi=True, sha256=ozet)
+        oturum.pop('offset')
+        _oturum_yaz(oturum)
+
+    logger.info(f"Yükleme tamamlandı: {yukleme_id} ({oturum['boyut']} bayt, {ozet})")
+    return restore_job_service.is_olustur(yukleme_id, zip_path, dry_run=oturum['dry_run'])
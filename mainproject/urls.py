@@ -3,7 +3,7 @@ from django.http import HttpResponse
 from . import views
 from . import bildirim_views
 from django.conf import settings
-from django.conf.urls.static import static
+from . import file_service
 
 urlpatterns = [
     path('', views.home, name="home"),
@@ -23,9 +23,13 @@ urlpatterns = [
     path('admin-paneli/backup-data/', views.backup_data, name='backup_data'),
     path('admin-paneli/backup-list/', views.list_backups, name='list_backups'),
     path('admin-paneli/restore-data/', views.restore_data, name='restore_data'),
+    path('admin-paneli/restore-upload/', views.restore_upload, name='restore_upload'),
+    path('admin-paneli/restore-upload/<str:yukleme_id>/', views.restore_upload_chunk, name='restore_upload_chunk'),
+    path('admin-paneli/restore-upload/<str:yukleme_id>/complete/', views.restore_upload_complete, name='restore_upload_complete'),
     path('admin-paneli/restore-progress/', views.restore_progress_api, name='restore_progress'),
     path('admin-paneli/download-backup/<str:filename>/', views.download_backup, name='download_backup'),
     path('admin-paneli/delete-backup/<str:filename>/', views.delete_backup, name='delete_backup'),
+    path('admin-paneli/verify-backup/<str:filename>/', views.verify_backup, name='verify_backup'),
     
 
     path('admin-paneli/yazi-yaz/', views.yaziyaz, name='admin-paneli'),
@@ -44,6 +48,9 @@ urlpatterns = [
     path('ogrenci/<int:id>/sinav-sonucu-ekle/', views.sinav_sonucu_ekle, name='sinav_sonucu_ekle'),
     path('ogrenci/export/excel/', views.export_ogrenci_listesi_excel, name='export_ogrenci_listesi_excel'),
     path('ogrenci/<int:id>/export/excel/', views.export_ogrenci_detay_excel, name='export_ogrenci_detay_excel'),
+    path('ogrenci/export/raporlar/', views.export_ogrenci_raporlari, name='export_ogrenci_raporlari'),
+    path('ogrenci/export/raporlar/<str:is_id>/', views.export_ogrenci_raporlari_durum, name='export_ogrenci_raporlari_durum'),
+    path('ogrenci/export/raporlar/<str:is_id>/indir/', views.export_ogrenci_raporlari_indir, name='export_ogrenci_raporlari_indir'),
     path('ezber-tamamla/<int:id>/<int:ezber_id>/', views.ezber_tamamla, name='ezber_tamamla'),
     path('admin-paneli/ogrenci/detay/<int:id>/', views.ogrenci_detay, name='ogrenci_detay'),
     path('giris', views.login,name="login"),
@@ -55,6 +62,7 @@ urlpatterns = [
     path('sw.js', views.service_worker, name='service_worker'),
     
     # Bildirim API Routes
+    path('api/disa-aktar/<str:tablo>/', views.veri_disa_aktar, name='veri_disa_aktar'),
     path('api/bildirim-abonelik/', views.bildirim_abonelik_kaydet, name='bildirim_abonelik'),
     path('api/test-bildirim/', views.test_bildirim_gonder, name='test_bildirim'),
     path('api/daily-message-notification/', views.gunluk_mesaj_bildirimi_api, name='daily_message_notification'),
@@ -68,4 +76,4 @@ urlpatterns = [
     path('admin-paneli/galeri/', views.galeri, name='galeri'),
     path('admin-paneli/galeri/yukle/', views.galeri_yukle, name='galeri_yukle'),
     path('admin-paneli/galeri/sil/<int:fotograf_id>/', views.galeri_sil, name='galeri_sil'),
-]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]+ file_service.medya_yollari()
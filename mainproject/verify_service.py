@@ -0,0 +1,230 @@
+"""
+Yedek doğrulama servisi
+Arşivi geri yüklemeden ve veritabanına dokunmadan denetler: üyeler parça parça
+okunup manifest.json'daki SHA-256 özetleriyle karşılaştırılır, aynı geçişte
+NDJSON satırları ve backup.json yapısı çözümlenir. Manifesti olmayan eski
+yedeklerde ZIP CRC'leri ve JSON yapısı denetlenir.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import zipfile
+
+from django.db.migrations.loader import MigrationLoader
+
+from . import backup_service, blob_service
+
+logger = logging.getLogger(__name__)
+
+# Serileştirilmiş her kaydın taşıması gereken alanlar
+KAYIT_ALANLARI = ('model', 'pk', 'fields')
+
+
+class _Denetim:
+    """Doğrulama sırasında bulunan hataları ve uyarıları toplar"""
+
+    def __init__(self):
+        self.hatalar = []
+        self.uyarilar = []
+
+    def hata(self, mesaj):
+        self.hatalar.append(mesaj)
+
+    def uyari(self, mesaj):
+        self.uyarilar.append(mesaj)
+
+
+def _kayit_gecerli_mi(kayit):
+    return (isinstance(kayit, dict) and all(alan in kayit for alan in KAYIT_ALANLARI)
+            and isinstance(kayit['fields'], dict))
+
+
+def uyeyi_tara(zipf, arcname, satir_isle=None):
+    """
+    Üyeyi parça parça okur; (SHA-256, boyut) döndürür
+    satir_isle verilirse her tam satır (bayt) ile çağrılır - NDJSON üyeleri aynı
+    okumada hem özetlenir hem çözümlenir. ZIP CRC hatası BadZipFile fırlatır.
+    """
+    ozet, boyut, kalan = hashlib.sha256(), 0, b''
+    with zipf.open(arcname) as uye:
+        for parca in iter(lambda: uye.read(backup_service.PARCA_BOYUTU), b''):
+            ozet.update(parca)
+            boyut += len(parca)
+            if satir_isle:
+                satirlar = (kalan + parca).split(b'\n')
+                kalan = satirlar.pop()
+                for satir in satirlar:
+                    satir_isle(satir)
+    if satir_isle and kalan:
+        satir_isle(kalan)
+    return ozet.hexdigest(), boyut
+
+
+def _ndjson_denetleyici(denetim, arcname):
+    """NDJSON satırlarını çözümleyen ve geçerli kayıtları sayan satir_isle fonksiyonu"""
+    sayac = {'satir': 0, 'hatali': 0}
+
+    def isle(satir):
+        if not satir.strip():
+            return
+        try:
+            kayit = json.loads(satir)
+        except ValueError:
+            kayit = None
+        if _kayit_gecerli_mi(kayit):
+            sayac['satir'] += 1
+        else:
+            if not sayac['hatali']:
+                denetim.hata(f'{arcname}: {sayac["satir"] + 1}. satır geçerli bir kayıt değil')
+            sayac['hatali'] += 1
+
+    return isle, sayac
+
+
+def _bolumleri_denetle(denetim, backup_data, sayilar):
+    """backup.json içinde taşınan bölümleri (v1.6/1.7 ve fark yedekleri) denetler"""
+    if backup_data.get('backup_type') == 'fark':
+        bolumler = backup_data.get('degisiklikler', {})
+        for key, pkler in backup_data.get('silinenler', {}).items():
+            if not isinstance(pkler, list):
+                denetim.hata(f'silinenler.{key} liste değil')
+    else:
+        anahtarlar = {key for key, _ in backup_service.yedek_bolumleri()}
+        bolumler = {key: deger for key, deger in backup_data.items() if key in anahtarlar}
+
+    for key, kayitlar in bolumler.items():
+        try:
+            if isinstance(kayitlar, str):
+                kayitlar = json.loads(kayitlar)
+        except ValueError:
+            denetim.hata(f'{key} bölümü çözümlenemedi')
+            continue
+        if not isinstance(kayitlar, list) or not all(_kayit_gecerli_mi(k) for k in kayitlar):
+            denetim.hata(f'{key} bölümü geçerli kayıtlar içermiyor')
+            continue
+        sayilar[key] = len(kayitlar)
+
+
+def _gocleri_denetle(denetim, gocler):
+    """Yedeğin göç durumunu koddaki göçlerle karşılaştırır (veritabanı okunmaz)"""
+    diskteki = set(MigrationLoader(None, ignore_no_migrations=True).disk_migrations)
+    yedekteki = {(app_label, name) for app_label, names in gocler.items() for name in names}
+    bilinmeyen = sorted(yedekteki - diskteki)
+    eksik = sorted((app_label, name) for app_label, name in diskteki - yedekteki
+                   if app_label in gocler)
+    if bilinmeyen:
+        denetim.uyari(f'Yedek koddaki göçlerden yeni: {", ".join(f"{a}.{n}" for a, n in bilinmeyen)}')
+    if eksik:
+        denetim.uyari(f'Yedekte uygulanmamış {len(eksik)} göç var - '
+                      'geri yüklemeden sonra migrate çalıştırılmalı')
+
+
+def _fotograflari_denetle(denetim, zipf, photo_info):
+    """photo_info'daki fotoğrafların arşivde veya blob deposunda bulunduğunu kontrol eder"""
+    uyeler = set(zipf.namelist())
+    eksik = 0
+    for info in photo_info:
+        ozet = info.get('sha256')
+        if info.get('uye') in uyeler:
+            continue
+        if ozet and (f'blobs/{ozet}' in uyeler or blob_service.blob_var_mi(ozet)):
+            continue
+        # Eski yedekler fotoğrafları photos/<ad> üyesi olarak taşır
+        if f"photos/{info.get('filename')}" in uyeler:
+            continue
+        eksik += 1
+    if eksik:
+        denetim.uyari(f'{eksik} fotoğraf ne arşivde ne de blob deposunda bulunamadı')
+
+
+def yedegi_dogrula(zip_path):
+    """
+    Yedeği doğrular ve raporu döndürür:
+    {'filename', 'gecerli', 'hatalar', 'uyarilar', 'manifest', 'versiyon',
+     'backup_type', 'satir_sayilari', 'uye_sayisi', 'sure'}
+    """
+    baslangic = time.monotonic()
+    denetim = _Denetim()
+    rapor = {
+        'filename': os.path.basename(zip_path),
+        'manifest': False,
+        'versiyon': None,
+        'backup_type': None,
+        'satir_sayilari': {},
+        'uye_sayisi': 0,
+    }
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zipf:
+            uyeler = set(zipf.namelist())
+            rapor['uye_sayisi'] = len(uyeler)
+            manifest = None
+            if backup_service.MANIFEST_UYESI in uyeler:
+                with zipf.open(backup_service.MANIFEST_UYESI) as f:
+                    manifest = json.load(f)
+                rapor['manifest'] = True
+            else:
+                denetim.uyari('Manifest yok (eski yedek) - yalnızca CRC ve JSON yapısı denetlendi')
+
+            if 'backup.json' not in uyeler:
+                raise ValueError('backup.json bulunamadı')
+            with zipf.open('backup.json') as f:
+                backup_data = json.load(f)
+            rapor['versiyon'] = backup_data.get('backup_version')
+            rapor['backup_type'] = backup_data.get('backup_type', 'tam')
+
+            # Manifestteki üyeler özetlenir; manifest yoksa tüm üyeler CRC için okunur
+            beklenen = manifest['uyeler'] if manifest else {n: None for n in uyeler}
+            ndjson_uyeleri = {uye: key for key, uye in backup_data.get('bolumler', {}).items()}
+            for arcname, kayit in beklenen.items():
+                if arcname not in uyeler:
+                    denetim.hata(f'{arcname} arşivde yok')
+                    continue
+                satir_isle = sayac = None
+                if arcname in ndjson_uyeleri:
+                    satir_isle, sayac = _ndjson_denetleyici(denetim, arcname)
+                try:
+                    ozet, boyut = uyeyi_tara(zipf, arcname, satir_isle)
+                except Exception as e:
+                    # CRC hatası veya yönteme göre zlib/bz2/lzma açma hatası
+                    denetim.hata(f'{arcname} okunamadı: {e}')
+                    continue
+                if kayit and (ozet != kayit['sha256'] or boyut != kayit['boyut']):
+                    denetim.hata(f'{arcname} özeti manifestle uyuşmuyor')
+                if arcname.startswith('blobs/') and ozet != arcname[len('blobs/'):]:
+                    denetim.hata(f'{arcname} içeriği adındaki özetle uyuşmuyor')
+                if sayac:
+                    rapor['satir_sayilari'][ndjson_uyeleri[arcname]] = sayac['satir']
+
+            for arcname in ndjson_uyeleri:
+                if arcname not in uyeler:
+                    denetim.hata(f'{arcname} arşivde yok')
+            if not ndjson_uyeleri:
+                _bolumleri_denetle(denetim, backup_data, rapor['satir_sayilari'])
+
+            if manifest:
+                for key, sayi in manifest.get('satir_sayilari', {}).items():
+                    if rapor['satir_sayilari'].get(key) != sayi:
+                        denetim.hata(f'{key}: manifestte {sayi} satır, arşivde '
+                                     f'{rapor["satir_sayilari"].get(key, 0)} satır')
+                _gocleri_denetle(denetim, manifest.get('gocler', {}))
+
+            if rapor['backup_type'] == 'fark':
+                taban = backup_data.get('base')
+                if not taban or not os.path.exists(os.path.join(os.path.dirname(zip_path), taban)):
+                    denetim.hata(f'Taban yedek bulunamadı: {taban}')
+
+            _fotograflari_denetle(denetim, zipf, backup_data.get('photo_info', []))
+    except (zipfile.BadZipFile, OSError, ValueError, KeyError, TypeError) as e:
+        denetim.hata(f'Arşiv okunamadı: {e}')
+
+    rapor.update({
+        'gecerli': not denetim.hatalar,
+        'hatalar': denetim.hatalar,
+        'uyarilar': denetim.uyarilar,
+        'sure': round(time.monotonic() - baslangic, 3),
+    })
+    if denetim.hatalar:
+        logger.warning(f"Yedek doğrulanamadı: {rapor['filename']} - {denetim.hatalar}")
+    return rapor
@@ -3,26 +3,19 @@ import os
 import re
 import json
 import random
-import zipfile
-import tempfile
 import shutil
 import threading
-import time
 import datetime
 from datetime import timedelta
 from io import BytesIO
 from PIL import Image
 
 import requests
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from openpyxl.styles import Border, Side
 
 from django.conf import settings
-from django.core import serializers
 from django.core.cache import cache
 from django.core.files import File
-from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.core.files.temp import NamedTemporaryFile
 from django.core.files.uploadedfile import InMemoryUploadedFile
@@ -36,12 +29,13 @@ from django.contrib.auth import (
 from django.contrib.auth.forms import AuthenticationForm, PasswordChangeForm
 from django.contrib.auth.decorators import login_required
 
+from django.db import transaction
 from django.db.models import (
-    Prefetch, Q, Count, Avg, Sum, Max, Min, F,
+    Prefetch, Q, Count, Sum, F,
     ExpressionWrapper, DurationField
 )
 
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
 from django.utils.safestring import mark_safe
@@ -51,10 +45,15 @@ from django.views.decorators.http import require_POST
 from blog import models
 from blog.models import yazi, category, SiteContent
 from .models import ElifBaEzberDurumu, ElifBaEzberi, Ogrenci, Ders, EzberSuresi, DersNotu, EzberKaydi, SinavSonucu
-from .models import Alinti, GunlukMesaj
+from .models import Alinti, GunlukMesaj, Galeri, OgrenciIstatistik
+from . import (
+    backup_service, blob_service, catalog_service, data_export_service, excel_service,
+    file_service, report_job_service, restore_service, restore_job_service, sinif_istatistik_service,
+    siralama_service, snapshot_service, stats_service, upload_service, verify_service
+)
 
-# Global restore progress değişkeni
-restore_progress = {
+# Henüz hiç geri yükleme işi yokken döndürülen durum
+RESTORE_BASLAMADI = {
     'status': 'not_started',
     'progress': 0,
     'message': 'Geri yükleme başlatılmadı'
@@ -63,256 +62,204 @@ restore_progress = {
 @login_required(login_url='login')
 def restore_data(request):
     """Basit ve güvenilir yedekleme geri yükleme sistemi"""
-    global restore_progress
-    
     if request.method == 'GET':
-        # GET isteği için yedek listesini göster
-        backup_dir = os.path.join(settings.MEDIA_ROOT, 'backups')
-        backups = []
-        
-        if os.path.exists(backup_dir):
-            for filename in os.listdir(backup_dir):
-                if filename.endswith('.zip'):
-                    filepath = os.path.join(backup_dir, filename)
-                    file_time = os.path.getmtime(filepath)
-                    file_size = os.path.getsize(filepath)
-                    
-                    backups.append({
-                        'filename': filename,
-                        'filepath': filepath,
-                        'date': timezone.datetime.fromtimestamp(file_time),
-                        'size': file_size
-                    })
-        
-        backups.sort(key=lambda x: x['date'], reverse=True)
-        
+        # GET isteği için yedek listesini katalogdan göster
         return render(request, 'restore_data.html', {
-            'backups': backups,
-            'restore_progress': restore_progress
+            'backups': yedek_sayfasi(request),
+            'total_size': catalog_service.toplam_boyut(),
+            'restore_progress': restore_job_service.son_is() or RESTORE_BASLAMADI
         })
     
+    # POST isteği - deneme raporu onaylandıysa aynı arşiv yeniden yüklenmeden geri yüklenir
+    onaylanan = request.POST.get('onayla')
+    if onaylanan:
+        deneme = restore_job_service.is_oku(onaylanan)
+        if not (deneme and deneme.get('dry_run') and deneme['status'] == 'completed'
+                and os.path.exists(deneme['zip_path'])):
+            error_msg = 'Onaylanacak deneme bulunamadı, lütfen yedeği yeniden yükleyin.'
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return JsonResponse({'status': 'error', 'progress': 0, 'message': error_msg}, status=400)
+            messages.error(request, error_msg)
+            return redirect('restore_data')
+        is_kaydi = restore_job_service.is_olustur(restore_job_service.yeni_is_id(), deneme['zip_path'])
+        restore_job_service.arka_planda_calistir(restore_backup_process)
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse(is_kaydi, status=202)
+        messages.info(request, 'Geri yükleme başlatıldı, ilerleme bu sayfadan takip edilebilir.')
+        return redirect('restore_data')
+    
     # POST isteği - Dosya yükleme
     if 'backup_file' not in request.FILES:
         messages.error(request, 'Lütfen bir yedek dosyası seçin.')
         return redirect('restore_data')
     
     backup_file = request.FILES['backup_file']
-    
-    # İlerleme durumunu başlat
-    restore_progress = {
-        'status': 'started',
-        'progress': 0,
-        'message': 'Geri yükleme işlemi başlatılıyor...'
-    }
+    # Deneme modunda yalnızca neyin değişeceği raporlanır
+    dry_run = bool(request.POST.get('dry_run'))
     
     try:
-        # Geçici dizin oluştur
-        temp_dir = os.path.join(settings.MEDIA_ROOT, 'temp_restore')
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # ZIP dosyasını kaydet
-        zip_path = os.path.join(temp_dir, f'restore_{int(time.time())}.zip')
+        # ZIP dosyasını işe ait dizine kaydet
+        is_id = restore_job_service.yeni_is_id()
+        zip_path = os.path.join(restore_job_service.yukleme_dizini(is_id), 'restore.zip')
         with open(zip_path, 'wb+') as destination:
             for chunk in backup_file.chunks():
                 destination.write(chunk)
         
-        update_restore_progress(10, 'ZIP dosyası kaydedildi')
-        
-        # ZIP dosyasını aç
-        if not zipfile.is_zipfile(zip_path):
-            raise ValueError('Geçerli bir ZIP dosyası değil!')
-        
-        extract_dir = os.path.join(temp_dir, 'extracted')
-        os.makedirs(extract_dir, exist_ok=True)
-        
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
+        # Geri yükleme arka planda çalışır - istek dosya kaydedilir kaydedilmez döner
+        is_kaydi = restore_job_service.is_olustur(is_id, zip_path, dry_run=dry_run)
+        restore_job_service.arka_planda_calistir(restore_backup_process)
         
+    except Exception as e:
+        error_msg = f'Geri yükleme başlatılamadı: {str(e)}'
+        print(f"Restore error: {e}")
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({'status': 'error', 'progress': 0, 'message': error_msg}, status=500)
+        messages.error(request, error_msg)
+        return redirect('restore_data')
+    
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse(is_kaydi, status=202)
+    messages.info(request, 'Geri yükleme başlatıldı, ilerleme bu sayfadan takip edilebilir.')
+    return redirect('restore_data')
+
+@login_required(login_url='login')
+@require_POST
+def restore_upload(request):
+    """
+    Parçalı yükleme oturumu açar
+    POST boyut=<bayt> [sha256=<hex>] [dry_run=1] -> {'id', 'offset', 'boyut', 'parca_boyutu'}
+    """
+    try:
+        boyut = int(request.POST.get('boyut', ''))
+        oturum = upload_service.oturum_olustur(
+            boyut, request.POST.get('sha256') or None, dry_run=bool(request.POST.get('dry_run'))
+        )
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e) or 'Geçersiz boyut'}, status=400)
+    oturum['parca_boyutu'] = upload_service.azami_parca_boyutu()
+    return JsonResponse(oturum, status=201)
+
+@login_required(login_url='login')
+def restore_upload_chunk(request, yukleme_id):
+    """
+    GET: onaylanmış ofseti döndürür (bağlantı koptuktan sonra buradan devam edilir)
+    PUT: gövdeyi Upload-Offset başlığındaki ofsete ekler; X-Chunk-Sha256 verilirse
+    parça eklenmeden önce denetlenir. Ofset uyuşmazsa 409 ile doğru ofset döner.
+    """
+    if request.method == 'GET':
+        oturum = upload_service.oturum_oku(yukleme_id)
+        if not oturum:
+            return JsonResponse({'status': 'error', 'message': 'Yükleme oturumu bulunamadı'}, status=404)
+        oturum['parca_boyutu'] = upload_service.azami_parca_boyutu()
+        return JsonResponse(oturum)
+    if request.method != 'PUT':
+        return HttpResponse(status=405, headers={'Allow': 'GET, PUT'})
+    
+    try:
+        offset = int(request.headers.get('Upload-Offset', request.GET.get('offset', '')))
+        uzunluk = int(request.META.get('CONTENT_LENGTH') or 0)
+        yeni_offset = upload_service.parca_ekle(
+            yukleme_id, offset, request, uzunluk, request.headers.get('X-Chunk-Sha256')
+        )
+    except LookupError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=404)
+    except upload_service.OfsetUyusmazligi as e:
+        return JsonResponse({'status': 'error', 'message': str(e), 'offset': e.offset}, status=409)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e) or 'Geçersiz ofset'}, status=400)
+    return JsonResponse({'id': yukleme_id, 'offset': yeni_offset})
+
+@login_required(login_url='login')
+@require_POST
+def restore_upload_complete(request, yukleme_id):
+    """Yüklemeyi boyut ve SHA-256 ile denetler, geri yükleme işini başlatır (202)"""
+    try:
+        is_kaydi = upload_service.tamamla(yukleme_id, request.POST.get('sha256') or None)
+    except LookupError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=404)
+    except upload_service.OfsetUyusmazligi as e:
+        return JsonResponse({'status': 'error', 'message': 'Yükleme henüz tamamlanmadı', 'offset': e.offset}, status=409)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    restore_job_service.arka_planda_calistir(restore_backup_process)
+    return JsonResponse(is_kaydi, status=202)
+
+def restore_dry_run(arsiv, bolumler, photo_info, onek=''):
+    """
+    Deneme modu - bölümleri canlı veritabanıyla karşılaştırır, hiçbir şey yazmaz
+    Model başına eklenecek/silinecek/değişecek satır raporu işe kaydedilir.
+    """
+    update_restore_progress(50, f'{onek}Yedek mevcut verilerle karşılaştırılıyor...')
+    
+    def model_karsilastirildi(sira, toplam, satir):
+        update_restore_progress(
+            50 + int(45 * sira / toplam),
+            f"{onek}{satir['model']} karşılaştırıldı ({satir['eklenecek']} eklenecek, "
+            f"{satir['silinecek']} silinecek, {satir['degisecek']} değişecek)"
+        )
+    
+    modeller = restore_service.fark_raporu(bolumler, ilerleme=model_karsilastirildi)
+    rapor = {
+        'modeller': modeller,
+        'toplam': {
+            tur: sum(satir[tur] for satir in modeller)
+            for tur in ('eklenecek', 'silinecek', 'degisecek', 'ayni')
+        },
+        'fotograf_sayisi': len(photo_info),
+    }
+    restore_job_service.rapor_kaydet(rapor)
+    return rapor
+
+def restore_backup_process(zip_path, dry_run=False):
+    """
+    Yüklenen yedeği geri yükler - arka plandaki geri yükleme işi tarafından çağrılır
+    dry_run=True ise yalnızca fark raporu üretilir; yüklenen arşiv onay için saklanır.
+    """
+    update_restore_progress(10, 'ZIP dosyası kaydedildi')
+    arsiv = None
+    emergency_file = None
+    
+    try:
+        # ZIP dosyasını aç - üyeler diske açılmadan doğrudan arşivden okunur
+        arsiv = restore_service.YedekArsivi(zip_path)
         update_restore_progress(20, 'ZIP dosyası açıldı')
         
         # JSON dosyasını oku
-        json_path = os.path.join(extract_dir, 'backup.json')
-        if not os.path.exists(json_path):
-            raise ValueError('Yedek dosyasında backup.json bulunamadı!')
-        
-        with open(json_path, 'r', encoding='utf-8') as f:
-            backup_data = json.load(f)
-        
+        backup_data = arsiv.yedek_verisi()
         update_restore_progress(30, 'Yedek verileri okundu')
         
+        if dry_run:
+            restore_dry_run(arsiv, arsiv.bolumler(backup_data), backup_data.get('photo_info', []))
+            return
+        
         # Acil yedek oluştur
-        create_emergency_backup()
+        emergency_file = create_emergency_backup()
         update_restore_progress(40, 'Acil yedek oluşturuldu')
         
-        # Veritabanını temizle ve geri yükle
-        from django.db import transaction, connection
+        # Veritabanını temizle ve geri yükle - model başına toplu ekleme, tek transaction
+        update_restore_progress(50, 'Eski veriler siliniyor ve veriler yükleniyor...')
         
-        with transaction.atomic():
-            # Foreign key kontrollerini geçici olarak kapat
-            with connection.cursor() as cursor:
-                cursor.execute('PRAGMA foreign_keys=OFF;')
-            
-            update_restore_progress(50, 'Eski veriler siliniyor...')
-            
-            # Verileri doğru sırayla sil
-            try:
-                from .models import Galeri
-                ElifBaEzberDurumu.objects.all().delete()
-                DersNotu.objects.all().delete()
-                SinavSonucu.objects.all().delete()
-                EzberKaydi.objects.all().delete()
-                Ogrenci.objects.all().delete()
-                Alinti.objects.all().delete()
-                yazi.objects.all().delete()
-                Ders.objects.all().delete()
-                ElifBaEzberi.objects.all().delete()
-                EzberSuresi.objects.all().delete()
-                category.objects.all().delete()
-                Galeri.objects.all().delete()  # Galeri kayıtlarını da sil
-            except Exception as e:
-                print(f"Silme hatası: {e}")
-            
-            update_restore_progress(60, 'Eski veriler silindi')
-            
-            # Verileri geri yükle - sıralı olarak
-            progress_per_model = 30 / 12  # 12 model için 30% alan (galeri dahil)
-            current_progress = 60
-            
-            # 1. Categories
-            if 'categories' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['categories']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Kategoriler yüklendi')
-            
-            # 2. Ezber Sureleri
-            if 'ezber_sureleri' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['ezber_sureleri']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Ezber sureleri yüklendi')
-            
-            # 3. Elif Ba Ezberleri
-            if 'elifba_ezberleri' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['elifba_ezberleri']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Elif Ba ezberleri yüklendi')
-            
-            # 4. Dersler
-            if 'dersler' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['dersler']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Dersler yüklendi')
-            
-            # 5. Yazılar
-            if 'yazilar' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['yazilar']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Yazılar yüklendi')
-            
-            # 6. Öğrenciler
-            if 'ogrenciler' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['ogrenciler']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Öğrenciler yüklendi')
-            
-            # 7. Alıntılar
-            if 'alintilar' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['alintilar']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Alıntılar yüklendi')
-            
-            # 8. Galeri
-            if 'galeri' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['galeri']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Galeri yüklendi')
-            
-            # 9. Ezber Kayıtları
-            if 'ezber_kayitlari' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['ezber_kayitlari']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Ezber kayıtları yüklendi')
-            
-            # 10. Sınav Sonuçları
-            if 'sinav_sonuclari' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['sinav_sonuclari']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Sınav sonuçları yüklendi')
-            
-            # 11. Ders Notları
-            if 'ders_notlari' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['ders_notlari']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Ders notları yüklendi')
-            
-            # 12. Elif Ba Ezber Durumları
-            if 'elifba_ezber_durumlari' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['elifba_ezber_durumlari']):
-                    obj.save()
-                current_progress += progress_per_model
-                update_restore_progress(int(current_progress), 'Elif Ba durumları yüklendi')
-            
-            # Foreign key kontrollerini tekrar aç
-            with connection.cursor() as cursor:
-                cursor.execute('PRAGMA foreign_keys=ON;')
+        def model_yuklendi(sira, toplam, satir):
+            update_restore_progress(
+                50 + int(40 * sira / toplam),
+                f"{satir['model']} yüklendi ({satir['satir']} kayıt, {satir['satir_per_sn']:.0f} kayıt/sn)"
+            )
+        
+        restore_service.toplu_geri_yukle(
+            arsiv.bolumler(backup_data), ilerleme=model_yuklendi
+        )
         
         update_restore_progress(90, 'Fotoğraflar yükleniyor...')
         
-        # Fotoğrafları geri yükle
-        photos_dir = os.path.join(extract_dir, 'photos')
-        if os.path.exists(photos_dir) and 'photo_info' in backup_data:
-            for photo_data in backup_data['photo_info']:
-                try:
-                    filename = photo_data['filename']
-                    source_path = os.path.join(photos_dir, filename)
-                    
-                    if os.path.exists(source_path):
-                        # Hedef dizini belirle
-                        if photo_data['type'] == 'yazi':
-                            dest_dir = os.path.join(settings.MEDIA_ROOT, 'uploads')
-                        elif photo_data['type'] == 'ogrenci':
-                            dest_dir = os.path.join(settings.MEDIA_ROOT, 'ogrenci_profil')
-                        elif photo_data['type'] == 'galeri':
-                            # Galeri fotoğrafları için yıl/ay dizini oluştur
-                            current_date = timezone.now()
-                            dest_dir = os.path.join(settings.MEDIA_ROOT, 'galeri', 
-                                                  str(current_date.year), 
-                                                  str(current_date.month).zfill(2))
-                        else:
-                            continue
-                        
-                        os.makedirs(dest_dir, exist_ok=True)
-                        dest_path = os.path.join(dest_dir, filename)
-                        shutil.copy2(source_path, dest_path)
-                        print(f"Fotoğraf kopyalandı: {filename} ({photo_data['type']})")
-                except Exception as e:
-                    print(f"Fotoğraf yükleme hatası {filename}: {e}")
-                    continue
+        # Fotoğrafları geri yükle - paralel, arşiv üyesinden/blob deposundan hedef dosyaya
+        restore_photos(arsiv, backup_data.get('photo_info', []), 90, 95)
         
         # Veritabanı dosyasını geri yükle
         update_restore_progress(95, 'Veritabanı dosyası geri yükleniyor...')
         try:
-            # ZIP içindeki veritabanı dosyasını kontrol et
-            db_source_path = os.path.join(extract_dir, 'database', 'db.sqlite3')
-            if os.path.exists(db_source_path):
-                # Hedef dizini oluştur
-                db_dest_dir = os.path.join(settings.MEDIA_ROOT, 'database')
-                os.makedirs(db_dest_dir, exist_ok=True)
-                
-                # Veritabanı dosyasını kopyala
-                db_dest_path = os.path.join(db_dest_dir, 'db.sqlite3')
-                shutil.copy2(db_source_path, db_dest_path)
-                print(f"Veritabanı dosyası geri yüklendi: {db_dest_path}")
+            # ZIP içindeki veritabanı doğrulanıp atomik olarak yerine konur
+            if restore_service.veritabanini_geri_yukle(arsiv):
+                print(f"Veritabanı dosyası geri yüklendi: {snapshot_service.veritabani_yolu()}")
             else:
                 print("Yedek dosyasında veritabanı bulunamadı")
         except Exception as e:
@@ -320,178 +267,99 @@ def restore_data(request):
         
         update_restore_progress(100, 'Geri yükleme başarıyla tamamlandı!')
         
-        # Geçici dosyaları temizle
+    except Exception:
+        # Yarım kalan geri yüklemeyi bu iş için alınan acil yedeğe döndür
+        if emergency_file:
+            restore_from_emergency_backup(emergency_file)
+        raise
+    finally:
+        # Yüklenen arşivi ve iş dizinini temizle
         try:
-            shutil.rmtree(temp_dir)
+            if arsiv:
+                arsiv.close()
+            if not dry_run:
+                shutil.rmtree(os.path.dirname(zip_path))
         except:
             pass
-        
-        messages.success(request, '✅ Geri yükleme başarıyla tamamlandı!')
-        return redirect('restore_data')
-        
-    except Exception as e:
-        error_msg = f'Geri yükleme hatası: {str(e)}'
-        restore_progress = {
-            'status': 'error',
-            'progress': 0,
-            'message': error_msg
-        }
-        messages.error(request, error_msg)
-        print(f"Restore error: {e}")
-        import traceback
-        traceback.print_exc()
-        return redirect('restore_data')
 
-def restore_photo_file(photo_data, photos_dir):
-    """Render için optimize edilmiş fotoğraf geri yükleme fonksiyonu"""
-    try:
-        old_path = photo_data['old_path']
-        new_path = photo_data['new_path']
-        filename = photo_data['filename']
-        
-        # Kaynak dosyayı bul
-        source_path = os.path.join(photos_dir, filename)
-        if not os.path.exists(source_path):
-            print(f"Render: Fotoğraf bulunamadı: {filename}")
-            return False
-        
-        # Hedef dizini oluştur
-        dest_full_path = os.path.join(settings.MEDIA_ROOT, new_path)
-        dest_dir = os.path.dirname(dest_full_path)
-        os.makedirs(dest_dir, exist_ok=True)
-        
-        # Dosyayı HIZLICA kopyala (Render için)
-        shutil.copy2(source_path, dest_full_path)
-        print(f"Render: Fotoğraf geri yüklendi: {filename}")
-        return True
-        
-    except Exception as e:
-        print(f"Render: Fotoğraf geri yükleme hatası {filename}: {e}")
-        return False
 
-def restore_backup_process_render_optimized(zip_path):
-    """Render sunucusu için optimize edilmiş geri yükleme işlemi"""
-    global restore_progress
+def restore_photos(arsiv, photo_info, baslangic, bitis, onek=''):
+    """Fotoğrafları paralel geri yükler; ilerlemeyi baslangic-bitis yüzdeleri arasında bildirir"""
+    son_yuzde = [None]
+    
+    def fotograf_yuklendi(tamamlanan, toplam):
+        yuzde = baslangic + int((bitis - baslangic) * tamamlanan / toplam)
+        if yuzde != son_yuzde[0]:
+            son_yuzde[0] = yuzde
+            update_restore_progress(yuzde, f'{onek}Fotoğraflar yükleniyor ({tamamlanan}/{toplam})...')
+    
+    rapor = restore_service.fotograflari_geri_yukle(arsiv, photo_info, ilerleme=fotograf_yuklendi)
+    for filename in rapor['bulunamayan']:
+        print(f"{onek}Fotoğraf bulunamadı: {filename}")
+    for filename, hata in rapor['hatalar']:
+        print(f"{onek}Fotoğraf geri yükleme hatası {filename}: {hata}")
+    print(f"{onek}{rapor['yuklenen']}/{rapor['toplam']} fotoğraf geri yüklendi")
+    # Arşivde ve blob deposunda olmayan fotoğraflar iş kaydında uyarı olarak görünür
+    if rapor['bulunamayan'] or rapor['hatalar']:
+        restore_job_service.uyari_kaydet({
+            'bulunamayan': len(rapor['bulunamayan']),
+            'hatali': len(rapor['hatalar']),
+            'toplam': rapor['toplam'],
+            'ornekler': (rapor['bulunamayan'] + [filename for filename, _ in rapor['hatalar']])[:10],
+        })
+    return rapor
+
+def restore_backup_process_render_optimized(zip_path, dry_run=False):
+    """Render sunucusu için optimize edilmiş geri yükleme işlemi (dry_run=True: yalnızca fark raporu)"""
+    emergency_file = None
     
     try:
         # 1. Adım: Hızlı dosya doğrulama
         update_restore_progress(10, 'Render: Yedek dosyası doğrulanıyor...')
         
-        if not zipfile.is_zipfile(zip_path):
-            raise ValueError('Geçerli bir ZIP dosyası değil')
+        arsiv = restore_service.YedekArsivi(zip_path)
         
-        # 2. Adım: Hızlı ZIP açma
+        # 2. Adım: ZIP diske açılmaz, üyeler gerektikçe arşivden okunur
         update_restore_progress(20, 'Render: Yedek dosyası açılıyor...')
         
-        extract_dir = tempfile.mkdtemp()
-        
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            
-            # 3. Adım: JSON'ı hızlıca oku
+            # 3. Adım: JSON'ı arşivden akış olarak oku
             update_restore_progress(30, 'Render: Yedek verileri okunuyor...')
             
-            json_path = os.path.join(extract_dir, 'backup.json')
-            if not os.path.exists(json_path):
-                raise ValueError('Yedek dosyasında backup.json bulunamadı')
+            backup_data = arsiv.yedek_verisi()
             
-            with open(json_path, 'r', encoding='utf-8') as f:
-                backup_data = json.load(f)
+            if dry_run:
+                restore_dry_run(arsiv, arsiv.bolumler(backup_data),
+                                backup_data.get('photo_info', []), 'Render: ')
+                return
             
             # 4. Adım: Acil yedek oluştur (küçük)
             update_restore_progress(40, 'Render: Acil yedek oluşturuluyor...')
-            create_emergency_backup()
+            emergency_file = create_emergency_backup()
             
             # 5. Adım: RENDER OPTIMIZE - Veritabanı constraint'lerini KAPALI tut
             update_restore_progress(50, 'Render: Veritabanı optimize ediliyor...')
             
-            from django.db import transaction, connection
+            from django.db import connection
             with connection.cursor() as cursor:
                 # SQLite için foreign key'leri kapat
                 cursor.execute('PRAGMA foreign_keys=OFF;')
                 cursor.execute('PRAGMA synchronous=OFF;')  # Render için hız
                 cursor.execute('PRAGMA journal_mode=MEMORY;')  # Render için hız
             
-            # 6. Adım: RENDER OPTIMIZE - Tüm işlemi tek transaction'da yap
-            update_restore_progress(60, 'Render: Veriler temizleniyor...')
+            # 6-7. Adım: RENDER OPTIMIZE - Tek transaction'da temizle ve model başına toplu ekle
+            update_restore_progress(60, 'Render: Veriler temizleniyor ve geri yükleniyor...')
             
-            with transaction.atomic():
-                # HIZLI VE GÜVENLİ silme sırası
-                from django.apps import apps
-                
-                # Foreign key bağımlılıklarına göre ters sırada sil
-                delete_order = [
-                    'mainproject.ElifBaEzberDurumu',
-                    'mainproject.DersNotu', 
-                    'mainproject.SinavSonucu',
-                    'mainproject.EzberKaydi',
-                    'mainproject.Alinti',
-                    'mainproject.Ogrenci',
-                    'blog.yazi',
-                    'mainproject.Ders',
-                    'mainproject.ElifBaEzberi',
-                    'mainproject.EzberSuresi',
-                    'blog.category',
-                ]
-                
-                for model_name in delete_order:
-                    try:
-                        model = apps.get_model(model_name)
-                        count = model.objects.count()
-                        if count > 0:
-                            model.objects.all().delete()
-                            print(f"Render: {model_name} silindi ({count} kayıt)")
-                    except Exception as e:
-                        print(f"Render: {model_name} silme hatası: {e}")
-                        continue
-                
-                # 7. Adım: RENDER OPTIMIZE - Verileri hızlıca geri yükle
-                update_restore_progress(70, 'Render: Veriler geri yükleniyor...')
-                
-                # Verileri deserialize et - HIZLI
-                data_objects = backup_data.get('data', [])
-                
-                # Batch insert için group by model
-                model_groups = {}
-                for obj_data in data_objects:
-                    model_name = obj_data['model']
-                    if model_name not in model_groups:
-                        model_groups[model_name] = []
-                    model_groups[model_name].append(obj_data)
-                
-                # Model sırasına göre insert et
-                insert_order = [
-                    'blog.category',
-                    'mainproject.ezberSuresi', 
-                    'mainproject.elifBaEzberi',
-                    'mainproject.ders',
-                    'blog.yazi',
-                    'mainproject.ogrenci',
-                    'mainproject.alinti',
-                    'mainproject.ezberKaydi',
-                    'mainproject.sinavSonucu',
-                    'mainproject.dersNotu',
-                    'mainproject.elifBaEzberDurumu',
-                ]
-                
-                progress_step = 20 / len(insert_order)
-                current_progress = 70
-                
-                for model_name in insert_order:
-                    if model_name in model_groups:
-                        try:
-                            # Django deserializer kullan - güvenli ve hızlı
-                            for obj_data in model_groups[model_name]:
-                                for obj in serializers.deserialize('json', [obj_data]):
-                                    obj.save()
-                            
-                            current_progress += progress_step
-                            update_restore_progress(int(current_progress), f'Render: {model_name} yüklendi')
-                            
-                        except Exception as e:
-                            print(f"Render: {model_name} yükleme hatası: {e}")
-                            continue
+            # v2 NDJSON, v1.6 anahtarları veya düz 'data' listesi - kayıtlar satır satır okunur
+            bolumler = arsiv.bolumler(backup_data)
+            
+            def model_yuklendi(sira, toplam, satir):
+                update_restore_progress(
+                    60 + int(30 * sira / toplam),
+                    f"Render: {satir['model']} yüklendi ({satir['satir_per_sn']:.0f} kayıt/sn)"
+                )
+            
+            restore_service.toplu_geri_yukle(bolumler, ilerleme=model_yuklendi)
             
             # 8. Adım: Foreign key'leri tekrar aç
             with connection.cursor() as cursor:
@@ -502,83 +370,65 @@ def restore_backup_process_render_optimized(zip_path):
             # 9. Adım: Fotoğrafları yükle (opsiyonel)
             update_restore_progress(95, 'Render: Fotoğraflar işleniyor...')
             
-            photo_info = backup_data.get('photo_info', [])
-            photos_dir = os.path.join(extract_dir, 'photos')
-            
-            if os.path.exists(photos_dir) and photo_info:
-                for photo_data in photo_info[:10]:  # İlk 10 fotoğraf - Render limitli
-                    try:
-                        restore_photo_file(photo_data, photos_dir)
-                    except:
-                        continue  # Fotoğraf hatası durumunda devam et
+            # Tüm fotoğraflar - sınırlı iş parçacığı havuzunda paralel kopyalanır
+            restore_photos(arsiv, backup_data.get('photo_info', []), 95, 99, 'Render: ')
             
             # 10. Başarı
             update_restore_progress(100, 'Render: Geri yükleme başarıyla tamamlandı!')
             
         finally:
-            # Temp dizini temizle
+            # Yüklenen arşivi temizle (deneme modunda onay için saklanır)
             try:
-                shutil.rmtree(extract_dir)
-                os.unlink(zip_path)
+                arsiv.close()
+                if not dry_run:
+                    os.unlink(zip_path)
             except:
                 pass
                 
     except Exception as e:
         error_msg = f"Render optimize hatası: {str(e)}"
-        restore_progress = {
-            'status': 'error',
-            'progress': 0,
-            'message': error_msg
-        }
+        update_restore_progress(0, error_msg, 'error')
         print(f"Render restore error: {e}")
+        if emergency_file:
+            restore_from_emergency_backup(emergency_file)
         raise
 
-def restore_backup_process_legacy(zip_path):
-    global restore_progress
+def restore_backup_process_legacy(zip_path, dry_run=False):
+    """Eski geri yükleme yolu (dry_run=True: yalnızca fark raporu)"""
+    emergency_file = None
     
     try:
         # 1. Adım: Dosya doğrulama
         update_restore_progress(10, 'Yedek dosyası doğrulanıyor...')
         
-        if not zipfile.is_zipfile(zip_path):
-            raise ValueError('Geçerli bir ZIP dosyası değil')
+        arsiv = restore_service.YedekArsivi(zip_path)
         
-        # 2. Adım: ZIP'i aç
+        # 2. Adım: ZIP diske açılmaz, üyeler gerektikçe arşivden okunur
         update_restore_progress(20, 'Yedek dosyası açılıyor...')
         
-        extract_dir = tempfile.mkdtemp()
-        
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            
-            # 3. Adım: JSON dosyasını oku
+            # 3. Adım: JSON dosyasını arşivden akış olarak oku
             update_restore_progress(30, 'Yedek verileri okunuyor...')
             
-            json_path = os.path.join(extract_dir, 'backup.json')
-            if not os.path.exists(json_path):
-                raise ValueError('Yedek dosyasında backup.json bulunamadı')
+            backup_data = arsiv.yedek_verisi()
             
-            with open(json_path, 'r', encoding='utf-8') as f:
-                backup_data = json.load(f)
-            
-            # 4. Adım: Fotoğrafları yükle
+            # 4. Adım: Fotoğraflar belleğe alınmaz, yüklenirken arşivden okunur
             update_restore_progress(40, 'Fotoğraflar hazırlanıyor...')
             
             photo_info = backup_data.get('photo_info', [])
-            photo_mappings = {}
-            photos_dir = os.path.join(extract_dir, 'photos')
             
-            if os.path.exists(photos_dir):
-                for filename in os.listdir(photos_dir):
-                    file_path = os.path.join(photos_dir, filename)
-                    if os.path.isfile(file_path):
-                        with open(file_path, 'rb') as f:
-                            photo_mappings[filename] = f.read()
+            if dry_run:
+                # Bu yol galeriyi geri yüklemez - raporda da yer almaz
+                restore_dry_run(arsiv, [
+                    (model, kayitlar) for model, kayitlar in arsiv.bolumler(backup_data)
+                    if model is not Galeri
+                ], photo_info)
+                arsiv.close()
+                return
             
             # 5. Adım: Mevcut verileri yedekle (önlem amaçlı)
             update_restore_progress(50, 'Mevcut veriler yedekleniyor...')
-            create_emergency_backup()
+            emergency_file = create_emergency_backup()
             
             # 6. Adım: Veritabanı constraint'lerini devre dışı bırak
             update_restore_progress(55, 'Veritabanı hazırlanıyor...')
@@ -587,147 +437,67 @@ def restore_backup_process_legacy(zip_path):
             with connection.cursor() as cursor:
                 cursor.execute('PRAGMA foreign_keys=OFF;')
             
-            # 7. Adım: Verileri geri yükle - Tüm modelleri DOĞRU SIRADA temizle
+            # 7. Adım: Verileri geri yükle - tek transaction, model başına toplu ekleme
             update_restore_progress(60, 'Mevcut veriler temizleniyor...')
             
-            # HATA DÜZELTME: Doğru silme sırası
-            # Önce foreign key ilişkisi olan modeller
-            ElifBaEzberDurumu.objects.all().delete()
-            DersNotu.objects.all().delete()
-            SinavSonucu.objects.all().delete()
-            EzberKaydi.objects.all().delete()
-            Alinti.objects.all().delete()
-            
-            # Sonra temel modeller
-            Ogrenci.objects.all().delete()
-            yazi.objects.all().delete()
-            Ders.objects.all().delete()
-            EzberSuresi.objects.all().delete()
-            ElifBaEzberi.objects.all().delete()
-            category.objects.all().delete()
-            
-            # 8. Adım: Temel modelleri geri yükle
-            update_restore_progress(65, 'Temel veriler geri yükleniyor...')
-            
-            # Önce kategoriler
-            if 'categories' in backup_data:
-                for obj in serializers.deserialize('json', backup_data['categories']):
-                    try:
-                        obj.save()
-                    except Exception as e:
-                        print(f"Kategori yükleme hatası: {e}")
-                        # Kategori zaten varsa devam et
-            
-            # Dersler
-            for obj in serializers.deserialize('json', backup_data['dersler']):
-                obj.save()
-            
-            # Ezber süreleri
-            for obj in serializers.deserialize('json', backup_data['ezber_sureleri']):
-                obj.save()
-            
-            # ElifBa ezberleri
-            for obj in serializers.deserialize('json', backup_data['elifba_ezberleri']):
-                obj.save()
-            
-            # 9. Adım: Öğrencileri geri yükle
-            update_restore_progress(70, 'Öğrenci verileri geri yükleniyor...')
-            
-            for obj in serializers.deserialize('json', backup_data['ogrenciler']):
-                ogrenci = obj.object
-                ogrenci.save()  # Önce temel kaydı oluştur
+            from django.db import transaction
+            
+            bolumler = [
+                (model, kayitlar) for model, kayitlar in arsiv.bolumler(backup_data)
+                if model is not Galeri
+            ]
+            temel_modeller = (category, Ders, EzberSuresi, ElifBaEzberi, Ogrenci)
+            temel_bolumler = [(m, k) for m, k in bolumler if m in temel_modeller]
+            diger_bolumler = [(m, k) for m, k in bolumler if m not in temel_modeller]
+            
+            with transaction.atomic(), stats_service.toplu_guncelleme(yeniden=True):
+                restore_service.tablolari_temizle([model for model, _ in bolumler])
                 
-                # Fotoğrafı sonra yükle
-                for photo_data in photo_info:
-                    if photo_data['type'] == 'ogrenci' and photo_data['id'] == ogrenci.id:
-                        try:
-                            filename = photo_data['filename']
-                            if filename in photo_mappings:
-                                ogrenci.profil_foto.save(
-                                    filename, 
-                                    ContentFile(photo_mappings[filename]), 
-                                    save=True
-                                )
-                                print(f"Öğrenci fotoğrafı yüklendi: {ogrenci.ad_soyad}")
-                        except Exception as e:
-                            print(f"Öğrenci fotoğraf hatası: {str(e)}")
-            
-            # 10. Adım: Yazıları geri yükle - GELİŞTİRİLMİŞ YÖNTEM
-            update_restore_progress(75, 'Yazılar geri yükleniyor...')
-
-            # Yazıları JSON'dan oku
-            yazilar_json = backup_data['yazilar']
-            if isinstance(yazilar_json, str):
-                yazilar_data = json.loads(yazilar_json)
-            else:
-                yazilar_data = yazilar_json
-
-            # Varsayılan kategori oluştur (ID çakışmasını önle)
-            default_category, created = category.objects.get_or_create(
-                name='Genel',
-                defaults={
-                    'slug': 'genel'
-                }
-            )
-
-            for yazi_item in yazilar_data:
+                # 8-9. Adım: Temel modeller ve öğrenciler
+                update_restore_progress(65, 'Temel veriler ve öğrenciler geri yükleniyor...')
+                restore_service.toplu_geri_yukle(temel_bolumler, temizle=False)
+                
+                # 10. Adım: Yazılar - kategorisi bulunamayanlar varsayılan kategoriye bağlanır,
+                # fotoğraflar sonra yüklenir
+                update_restore_progress(75, 'Yazılar ve diğer veriler geri yükleniyor...')
+                default_category, created = category.objects.get_or_create(
+                    name='Genel',
+                    defaults={
+                        'slug': 'genel'
+                    }
+                )
+                mevcut_kategoriler = set(category.objects.values_list('id', flat=True))
+                
+                def yazi_kayitlari(kayitlar):
+                    for yazi_item in kayitlar:
+                        fields = yazi_item['fields']
+                        if fields.get('category') not in mevcut_kategoriler:
+                            fields['category'] = default_category.id
+                        fields['imageUrl'] = ''
+                        yield yazi_item
+                
+                diger_bolumler = [
+                    (model, yazi_kayitlari(kayitlar) if model is yazi else kayitlar)
+                    for model, kayitlar in diger_bolumler
+                ]
+                
+                # 11. Adım: Diğer modeller
+                restore_service.toplu_geri_yukle(diger_bolumler, temizle=False)
+            
+            # Öğrenci fotoğrafları
+            for photo_data in photo_info:
+                if photo_data['type'] != 'ogrenci':
+                    continue
                 try:
-                    pk = yazi_item['pk']
-                    fields = yazi_item['fields']
-                    
-                    # Kategoriyi bul, bulunamazsa varsayılanı kullan
-                    category_id = fields.get('category')
-                    if category_id:
-                        try:
-                            category_obj = category.objects.get(id=category_id)
-                        except category.DoesNotExist:
-                            category_obj = default_category
-                    else:
-                        category_obj = default_category
-                    
-                    # Yazıyı oluştur
-                    yazi_obj = yazi(
-                        id=pk,
-                        title=fields['title'],
-                        description=fields['description'],
-                        date=fields['date'],
-                        isActive=fields['isActive'],
-                        slug=fields['slug'],
-                        tarih=fields.get('tarih', fields['date']),
-                        category=category_obj
-                    )
-                    
-                    # imageUrl boş olarak kaydet, fotoğrafı sonra yükleyeceğiz
-                    yazi_obj.save()
-                    
-                    print(f"✓ Yazı eklendi: {fields['title']}")
-                    
+                    filename = photo_data['filename']
+                    dosya = arsiv.fotograf_dosyasi(photo_data)
+                    if dosya:
+                        ogrenci = Ogrenci.objects.get(id=photo_data['id'])
+                        with dosya:
+                            ogrenci.profil_foto.save(filename, dosya, save=True)
+                        print(f"Öğrenci fotoğrafı yüklendi: {ogrenci.ad_soyad}")
                 except Exception as e:
-                    print(f"✗ Yazı hatası: {e}")
-                    continue
-
-            # 11. Adım: Diğer modelleri geri yükle
-            update_restore_progress(80, 'Diğer veriler geri yükleniyor...')
-
-            # Alıntılar
-            for obj in serializers.deserialize('json', backup_data['alintilar']):
-                obj.save()
-
-            # EzberKaydi
-            for obj in serializers.deserialize('json', backup_data['ezber_kayitlari']):
-                obj.save()
-
-            # SınavSonuçları
-            for obj in serializers.deserialize('json', backup_data['sinav_sonuclari']):
-                obj.save()
-
-            # DersNotları
-            for obj in serializers.deserialize('json', backup_data['ders_notlari']):
-                obj.save()
-
-            # ElifBaEzberDurumu
-            for obj in serializers.deserialize('json', backup_data['elifba_ezber_durumlari']):
-                obj.save()
+                    print(f"Öğrenci fotoğraf hatası: {str(e)}")
 
             # 12. Adım: Yazı fotoğraflarını yükle
             update_restore_progress(85, 'Fotoğraflar yükleniyor...')
@@ -739,13 +509,11 @@ def restore_backup_process_legacy(zip_path):
                         yazi_obj = yazi.objects.get(id=photo_data['id'])
                         filename = photo_data['filename']
                         
-                        # Fotoğrafı kontrol et ve yükle
-                        if filename in photo_mappings:
-                            yazi_obj.imageUrl.save(
-                                filename,
-                                ContentFile(photo_mappings[filename]),
-                                save=True
-                            )
+                        # Fotoğrafı kontrol et ve blob deposundan/arşivden parça parça yükle
+                        dosya = arsiv.fotograf_dosyasi(photo_data)
+                        if dosya:
+                            with dosya:
+                                yazi_obj.imageUrl.save(filename, dosya, save=True)
                             print(f"✓ Yazı fotoğrafı yüklendi: {yazi_obj.title}")
                             
                 except yazi.DoesNotExist:
@@ -770,7 +538,7 @@ def restore_backup_process_legacy(zip_path):
             
             # Geçici dosyaları temizle
             try:
-                shutil.rmtree(extract_dir, ignore_errors=True)
+                arsiv.close()
                 if os.path.exists(zip_path):
                     os.unlink(zip_path)
                 temp_dir = os.path.dirname(zip_path)
@@ -792,7 +560,7 @@ def restore_backup_process_legacy(zip_path):
             
             # Hata durumunda temizlik
             try:
-                shutil.rmtree(extract_dir, ignore_errors=True)
+                arsiv.close()
                 if os.path.exists(zip_path):
                     os.unlink(zip_path)
             except:
@@ -805,181 +573,93 @@ def restore_backup_process_legacy(zip_path):
         print(f"Geri yükleme hatası: {error_msg}")
         update_restore_progress(0, f'Hata: {error_msg}', 'error')
         
-        # Hata durumunda emergency backup'tan geri yükle
-        try:
-            restore_from_emergency_backup()
-            print("Emergency backup'tan geri yüklendi")
-        except Exception as restore_error:
-            print(f"Emergency restore hatası: {restore_error}")
+        # Hata durumunda bu geri yükleme için alınan emergency backup'a dön
+        # (görüntü alınmadan önceki hatalarda veritabanı değişmemiştir)
+        if emergency_file:
+            restore_from_emergency_backup(emergency_file)
         
         raise e
 
 def update_restore_progress(progress, message, status='processing'):
-    """İlerleme durumunu günceller"""
-    global restore_progress
-    restore_progress = {
-        'status': status,
-        'progress': progress,
-        'message': message
-    }
+    """Çalışan geri yükleme işinin ilerleme durumunu günceller"""
+    restore_job_service.ilerleme_kaydet(progress, message, status)
     # Konsola da yazdır
     print(f"İlerleme: {progress}% - {message}")
 
 def create_emergency_backup():
-    """Acil durum yedeği oluşturur"""
+    """
+    Acil durum yedeği oluşturur - veritabanının sayfa düzeyinde anlık görüntüsü
+    Görüntünün yolunu döndürür (alınamazsa None); eski görüntüler halkadan silinir.
+    """
     try:
-        emergency_dir = os.path.join(settings.MEDIA_ROOT, 'emergency_backup')
-        os.makedirs(emergency_dir, exist_ok=True)
-        
-        timestamp = timezone.now().strftime("%Y%m%d_%H%M%S")
-        emergency_file = os.path.join(emergency_dir, f'emergency_{timestamp}.json')
-        
-        # Tüm modelleri içeren acil durum yedeği
-        data = {
-            'ogrenciler': serializers.serialize('json', Ogrenci.objects.all()),
-            'yazilar': serializers.serialize('json', yazi.objects.all()),
-            'ezber_kayitlari': serializers.serialize('json', EzberKaydi.objects.all()),
-            'sinav_sonuclari': serializers.serialize('json', SinavSonucu.objects.all()),
-            'ders_notlari': serializers.serialize('json', DersNotu.objects.all()),
-            'alintilar': serializers.serialize('json', Alinti.objects.all()),
-            'dersler': serializers.serialize('json', Ders.objects.all()),
-            'ezber_sureleri': serializers.serialize('json', EzberSuresi.objects.all()),
-            'elifba_ezberleri': serializers.serialize('json', ElifBaEzberi.objects.all()),
-            'elifba_ezber_durumlari': serializers.serialize('json', ElifBaEzberDurumu.objects.all()),
-            'categories': serializers.serialize('json', category.objects.all()),
-            'backup_date': timezone.now().isoformat(),
-        }
-        
-        with open(emergency_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-            
+        emergency_file = snapshot_service.acil_durum_goruntusu_al()
         print(f"Emergency backup oluşturuldu: {emergency_file}")
+        return emergency_file
     except Exception as e:
         print(f"Emergency backup hatası: {e}")
+        return None
 
-def restore_from_emergency_backup():
-    """Acil durum yedeğinden geri yükler"""
+def restore_from_emergency_backup(emergency_file):
+    """Veritabanını geri yükleme öncesinde alınan acil durum görüntüsüne döndürür"""
     try:
-        emergency_dir = os.path.join(settings.MEDIA_ROOT, 'emergency_backup')
-        if not os.path.exists(emergency_dir):
-            print("Emergency backup dizini bulunamadı")
-            return
-        
-        # En son emergency backup'ı bul
-        backup_files = [f for f in os.listdir(emergency_dir) if f.endswith('.json')]
-        if not backup_files:
-            print("Emergency backup dosyası bulunamadı")
-            return
-        
-        latest_backup = max(backup_files, key=lambda x: os.path.getctime(os.path.join(emergency_dir, x)))
-        backup_path = os.path.join(emergency_dir, latest_backup)
-        
-        print(f"Emergency backup'tan geri yükleniyor: {latest_backup}")
-        
-        with open(backup_path, 'r', encoding='utf-8') as f:
-            backup_data = json.load(f)
-        
-        # Mevcut verileri temizle (aynı sırayla)
-        ElifBaEzberDurumu.objects.all().delete()
-        DersNotu.objects.all().delete()
-        SinavSonucu.objects.all().delete()
-        EzberKaydi.objects.all().delete()
-        Alinti.objects.all().delete()
-        yazi.objects.all().delete()
-        Ogrenci.objects.all().delete()
-        Ders.objects.all().delete()
-        EzberSuresi.objects.all().delete()
-        ElifBaEzberi.objects.all().delete()
-        category.objects.all().delete()
-        
-        # Verileri geri yükle (aynı sırayla)
-        if 'categories' in backup_data:
-            for obj in serializers.deserialize('json', backup_data['categories']):
-                obj.save()
+        print(f"Emergency backup'tan geri yükleniyor: {os.path.basename(emergency_file)}")
         
-        for obj in serializers.deserialize('json', backup_data['dersler']):
-            obj.save()
-        
-        for obj in serializers.deserialize('json', backup_data['ezber_sureleri']):
-            obj.save()
-        
-        for obj in serializers.deserialize('json', backup_data['elifba_ezberleri']):
-            obj.save()
-        
-        for obj in serializers.deserialize('json', backup_data['ogrenciler']):
-            obj.save()
-        
-        for obj in serializers.deserialize('json', backup_data['yazilar']):
-            obj.save()
-        
-        for obj in serializers.deserialize('json', backup_data['alintilar']):
-            obj.save()
-        
-        for obj in serializers.deserialize('json', backup_data['ezber_kayitlari']):
-            obj.save()
-        
-        for obj in serializers.deserialize('json', backup_data['sinav_sonuclari']):
-            obj.save()
-        
-        for obj in serializers.deserialize('json', backup_data['ders_notlari']):
-            obj.save()
-        
-        for obj in serializers.deserialize('json', backup_data['elifba_ezber_durumlari']):
-            obj.save()
-            
+        # Dosya değişimi - süre satır sayısından bağımsız
+        snapshot_service.acil_durum_goruntusune_don(emergency_file)
         print("Emergency backup'tan geri yükleme tamamlandı")
     except Exception as e:
         print(f"Emergency restore hatası: {e}")
 
+def yedek_sayfasi(request, sayfa_boyutu=20):
+    """Katalogdaki yedeklerin istenen sayfası (yeniden eskiye)"""
+    sayfa = request.GET.get('sayfa', 1)
+    paginator = Paginator(catalog_service.yedekler(), sayfa_boyutu)
+    
+    try:
+        return paginator.page(sayfa)
+    except PageNotAnInteger:
+        return paginator.page(1)
+    except EmptyPage:
+        return paginator.page(paginator.num_pages)
+
 @login_required(login_url='login')
 def list_backups(request):
     """
-    Mevcut yedekleri listeler
+    Mevcut yedekleri katalogdan sayfa sayfa listeler
     """
-    backup_dir = os.path.join(settings.MEDIA_ROOT, 'backups')
-    backups = []
-    total_size = 0
-    
-    if os.path.exists(backup_dir):
-        for filename in os.listdir(backup_dir):
-            if filename.endswith('.zip'):
-                filepath = os.path.join(backup_dir, filename)
-                file_time = os.path.getmtime(filepath)
-                file_size = os.path.getsize(filepath)
-                
-                backups.append({
-                    'filename': filename,
-                    'filepath': filepath,
-                    'date': timezone.datetime.fromtimestamp(file_time),
-                    'size': file_size
-                })
-                total_size += file_size
-    
-    # Tarihe göre sırala (yeniden eskiye)
-    backups.sort(key=lambda x: x['date'], reverse=True)
-    
     return render(request, 'backup_list.html', {
-        'backups': backups,
-        'total_size': total_size
+        'backups': yedek_sayfasi(request),
+        'total_size': catalog_service.toplam_boyut()
     })
 
 @login_required(login_url='login')
 def download_backup(request, filename):
     """
-    Belirli bir yedeği indir
+    Belirli bir yedeği indir - Range desteğiyle akıtılır, yarıda kalan indirme devam ettirilebilir
     """
     backup_dir = os.path.join(settings.MEDIA_ROOT, 'backups')
-    filepath = os.path.join(backup_dir, filename)
+    filepath = os.path.join(backup_dir, os.path.basename(filename))
     
     if os.path.exists(filepath):
-        with open(filepath, 'rb') as f:
-            response = HttpResponse(f.read(), content_type='application/zip')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+        return file_service.dosya_yaniti(request, filepath, 'application/zip', as_attachment=True)
     
     messages.error(request, 'İstenen yedek dosyası bulunamadı.')
     return redirect('list_backups')
 
+@login_required(login_url='login')
+def verify_backup(request, filename):
+    """
+    Yedeği geri yüklemeden doğrular ve raporu JSON olarak döndürür
+    """
+    # Yalnızca yedek dizinindeki ZIP'ler - '..', 'blobs' veya katalog.json doğrulanıp kataloğa yazılmaz
+    filename = os.path.basename(filename)
+    filepath = os.path.join(backup_service.yedek_dizini(), filename)
+    if not filename.endswith('.zip') or not os.path.isfile(filepath):
+        return JsonResponse({'gecerli': False, 'hatalar': ['Yedek dosyası bulunamadı']}, status=404)
+    rapor = verify_service.yedegi_dogrula(filepath)
+    catalog_service.dogrulama_kaydet(filename, rapor)
+    return JsonResponse(rapor)
+
 @login_required(login_url='login')
 @require_POST
 def delete_backup(request, filename):
@@ -990,9 +670,19 @@ def delete_backup(request, filename):
     filepath = os.path.join(backup_dir, filename)
     
     if os.path.exists(filepath):
+        # Fark yedeklerinin tabanı silinirse o farklar geri yüklenemez
+        bagimlilar = backup_service.bagimli_fark_yedekleri(filename)
+        if bagimlilar:
+            messages.error(request, f'Bu yedeği taban alan fark yedekleri var: {", ".join(bagimlilar)}')
+            return redirect('list_backups')
         os.remove(filepath)
+        catalog_service.sil(filename)
+        # Artık hiçbir yedeğin kullanmadığı fotoğraf blob'larını da sil
+        blob_service.kullanilmayan_bloblari_temizle(backup_dir)
         messages.success(request, 'Yedek dosyası başarıyla silindi.')
     else:
+        # Dosya elle silinmişse katalogda kalan kaydı da kaldır
+        catalog_service.sil(filename)
         messages.error(request, 'İstenen yedek dosyası bulunamadı.')
     
     return redirect('list_backups')
@@ -1000,156 +690,23 @@ def delete_backup(request, filename):
 @login_required(login_url='login')
 def backup_data(request):
     """
-    Tüm verileri yedekler + fotoğrafları ayrı dizine kopyalar
-    Elif Ba Ezberleri dahil
+    Tüm verileri yedekler + fotoğrafları ZIP'e ekler
+    Elif Ba Ezberleri dahil - arşiv geçici dizine kopyalanmadan istemciye ve
+    media/backups altına aynı anda akıtılır
+    ?tip=fark ile yalnızca son yedekten bu yana değişenleri içeren fark yedeği alınır
+    ?fotograflar=1 ile fotoğraflar arşive gömülür - başka sunucuda veya media/
+    kaybolduktan sonra geri yüklenebilen taşınabilir yedek
     """
     try:
-        # Yedekleme klasörünü oluştur
-        timestamp = timezone.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = os.path.join(settings.MEDIA_ROOT, 'backups', f'backup_{timestamp}')
-        os.makedirs(backup_dir, exist_ok=True)
-        
-        # Fotoğraflar için alt dizin oluştur
-        photos_dir = os.path.join(backup_dir, 'photos')
-        os.makedirs(photos_dir, exist_ok=True)
-        
-        # Veritabanı için alt dizin oluştur
-        database_dir = os.path.join(backup_dir, 'database')
-        os.makedirs(database_dir, exist_ok=True)
-        
-        # Veritabanı dosyasını kopyala
-        try:
-            db_source = os.path.join(settings.MEDIA_ROOT, 'database', 'db.sqlite3')
-            if os.path.exists(db_source):
-                db_dest = os.path.join(database_dir, 'db.sqlite3')
-                shutil.copy2(db_source, db_dest)
-                print(f"Veritabanı dosyası kopyalandı: {db_dest}")
-        except Exception as e:
-            print(f"Veritabanı kopyalama hatası: {str(e)}")
-        
-        # Resim bilgilerini depolamak için liste
-        photo_info = []
-        
-        # Yazı resimlerini kopyala
-        yazilar = yazi.objects.all()
-        for yazi_obj in yazilar:
-            if yazi_obj.imageUrl:
-                try:
-                    source_path = yazi_obj.imageUrl.path
-                    if os.path.exists(source_path):
-                        filename = os.path.basename(source_path)
-                        dest_path = os.path.join(photos_dir, filename)
-                        
-                        # Dosyayı kopyala
-                        shutil.copy2(source_path, dest_path)
-                        
-                        photo_info.append({
-                            'type': 'yazi',
-                            'id': yazi_obj.id,
-                            'filename': filename,
-                            'field': 'imageUrl'
-                        })
-                        print(f"Yazı {yazi_obj.id} resmi kopyalandı: {filename}")
-                except Exception as e:
-                    print(f"Yazı {yazi_obj.id} resim kopyalama hatası: {str(e)}")
-        
-        # Öğrenci profil fotoğraflarını kopyala
-        ogrenciler = Ogrenci.objects.all()
-        for ogrenci in ogrenciler:
-            if ogrenci.profil_foto:
-                try:
-                    source_path = ogrenci.profil_foto.path
-                    if os.path.exists(source_path):
-                        filename = os.path.basename(source_path)
-                        dest_path = os.path.join(photos_dir, filename)
-                        
-                        # Dosyayı kopyala
-                        shutil.copy2(source_path, dest_path)
-                        
-                        photo_info.append({
-                            'type': 'ogrenci',
-                            'id': ogrenci.id,
-                            'filename': filename,
-                            'field': 'profil_foto'
-                        })
-                        print(f"Öğrenci {ogrenci.id} resmi kopyalandı: {filename}")
-                except Exception as e:
-                    print(f"Öğrenci {ogrenci.id} resim kopyalama hatası: {str(e)}")
+        if request.GET.get('tip') == 'fark':
+            sonuc = backup_service.fark_yedegi_olustur()
+            return file_service.dosya_yaniti(request, sonuc['path'], 'application/zip', as_attachment=True)
         
-        # Galeri fotoğraflarını kopyala
-        from .models import Galeri
-        galeri_fotograflari = Galeri.objects.all()
-        for galeri_foto in galeri_fotograflari:
-            if galeri_foto.dosya:
-                try:
-                    source_path = galeri_foto.dosya.path
-                    if os.path.exists(source_path):
-                        filename = os.path.basename(source_path)
-                        dest_path = os.path.join(photos_dir, filename)
-                        
-                        # Dosyayı kopyala
-                        shutil.copy2(source_path, dest_path)
-                        
-                        photo_info.append({
-                            'type': 'galeri',
-                            'id': galeri_foto.id,
-                            'filename': filename,
-                            'field': 'dosya'
-                        })
-                        print(f"Galeri {galeri_foto.id} resmi kopyalandı: {filename}")
-                except Exception as e:
-                    print(f"Galeri {galeri_foto.id} resim kopyalama hatası: {str(e)}")
-        
-        # Tüm modelleri yedekle - Elif Ba modelleri dahil
-        backup_data = {
-            'ogrenciler': serializers.serialize('json', ogrenciler),
-            'yazilar': serializers.serialize('json', yazilar),
-            'ezber_kayitlari': serializers.serialize('json', EzberKaydi.objects.all()),
-            'sinav_sonuclari': serializers.serialize('json', SinavSonucu.objects.all()),
-            'ders_notlari': serializers.serialize('json', DersNotu.objects.all()),
-            'alintilar': serializers.serialize('json', Alinti.objects.all()),
-            'dersler': serializers.serialize('json', Ders.objects.all()),
-            'ezber_sureleri': serializers.serialize('json', EzberSuresi.objects.all()),
-            'elifba_ezberleri': serializers.serialize('json', ElifBaEzberi.objects.all()),
-            'elifba_ezber_durumlari': serializers.serialize('json', ElifBaEzberDurumu.objects.all()),
-            'categories': serializers.serialize('json', category.objects.all()),  # ✅ EKLENDİ
-            'galeri': serializers.serialize('json', Galeri.objects.all()),  # ✅ GALERİ EKLENDİ
-            'photo_info': photo_info,
-            'backup_date': timezone.now().isoformat(),
-            'backup_version': '1.6'  # Veritabanı dahil edildiği için versiyonu güncelle
-        }
-        
-        # JSON dosyasını kaydet
-        json_path = os.path.join(backup_dir, 'backup.json')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, ensure_ascii=False, indent=2)
-        
-        # ZIP dosyası oluştur
-        zip_filename = f'backup_{timestamp}.zip'
-        zip_path = os.path.join(settings.MEDIA_ROOT, 'backups', zip_filename)
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # JSON dosyasını ekle
-            zipf.write(json_path, 'backup.json')
-            
-            # Fotoğrafları ekle
-            for root, dirs, files in os.walk(photos_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    zipf.write(file_path, os.path.join('photos', file))
-            
-            # Veritabanı dosyasını ekle
-            db_file = os.path.join(database_dir, 'db.sqlite3')
-            if os.path.exists(db_file):
-                zipf.write(db_file, os.path.join('database', 'db.sqlite3'))
-        
-        # Geçici klasörü temizle
-        shutil.rmtree(backup_dir)
+        fotograflari_gom = True if request.GET.get('fotograflar') else None
+        zip_filename, akis = backup_service.yedek_akisi_olustur(fotograflari_gom)
         
-        # İndirme için hazırla
-        with open(zip_path, 'rb') as f:
-            response = HttpResponse(f.read(), content_type='application/zip')
-            response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
+        response = StreamingHttpResponse(akis, content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
         
         messages.success(request, 'Veri yedeği başarıyla oluşturuldu ve indirildi.')
         return response
@@ -1160,9 +717,10 @@ def backup_data(request):
 
 @login_required(login_url='login')
 def restore_progress_api(request):
-    """Geri yükleme ilerleme durumunu JSON olarak döndürür"""
-    global restore_progress
-    return JsonResponse(restore_progress)
+    """Geri yükleme işinin ilerleme durumunu JSON olarak döndürür (?is=<iş id> yoksa son iş)"""
+    is_id = request.GET.get('is')
+    is_kaydi = restore_job_service.is_oku(is_id) if is_id else restore_job_service.son_is()
+    return JsonResponse(is_kaydi or RESTORE_BASLAMADI)
 
 def export_ogrenci_listesi_excel(request):
     # Tüm öğrencileri al, aynı filtreleri uygula
@@ -1176,288 +734,88 @@ def export_ogrenci_listesi_excel(request):
     if seviye_filtre:
         tum_ogrenciler = tum_ogrenciler.filter(seviye=seviye_filtre)
     
-    # Workbook oluştur
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Öğrenci Listesi"
-    
-    # Başlık satırı
-    columns = ['Öğrenci Adı-Soyadı', 'Sınav Ortalaması', 'Tamamlanan Ezber', 'Toplam Ezber', 'Seviye', 'Kayıt Tarihi', 'Özel Notlar']
-    row_num = 1
-    
-    for col_num, column_title in enumerate(columns, 1):
-        cell = ws.cell(row=row_num, column=col_num)
-        cell.value = column_title
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Veriler
-    for ogrenci in tum_ogrenciler:
-        row_num += 1
-        # Her öğrenci için istatistikleri hesapla
-        ortalama = SinavSonucu.objects.filter(ogrenci=ogrenci).aggregate(Avg('puan'))['puan__avg'] or 0
-        tamamlanan_ezber = EzberKaydi.objects.filter(ogrenci=ogrenci, durum='TAMAMLANDI').count()
-        
-        row = [
-            ogrenci.ad_soyad,
-            ortalama,
-            tamamlanan_ezber,
-            13,  # Toplam ezber sayısı (sabit)
-            ogrenci.get_seviye_display(),
-            ogrenci.kayit_tarihi.strftime("%d.%m.%Y"),
-            ogrenci.ozel_notlar or ""
-        ]
-        
-        for col_num, cell_value in enumerate(row, 1):
-            cell = ws.cell(row=row_num, column=col_num)
-            cell.value = cell_value
-            cell.alignment = Alignment(horizontal='center')
-    
-    # Sütun genişliklerini ayarla
-    column_widths = [30, 20, 20, 15, 15, 15, 40]
-    for i, column_width in enumerate(column_widths, 1):
-        ws.column_dimensions[get_column_letter(i)].width = column_width
-    
-    # HttpResponse oluştur
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename=ogrenci_listesi_{}.xlsx'.format(datetime.datetime.now().strftime("%Y%m%d_%H%M"))
-    
-    wb.save(response)
-    return response
+    # Tek sorgu, write_only çalışma kitabı - bellek öğrenci sayısıyla büyümez
+    wb = excel_service.ogrenci_listesi_excel(tum_ogrenciler)
+    return excel_service.xlsx_yaniti(
+        wb, 'ogrenci_listesi_{}.xlsx'.format(datetime.datetime.now().strftime("%Y%m%d_%H%M"))
+    )
 
 def export_ogrenci_detay_excel(request, id):
-    ogrenci = get_object_or_404(Ogrenci, id=id)
-    
-    # Workbook oluştur
-    wb = Workbook()
-    
-    # 1. Öğrenci Bilgileri sayfası
-    ws_info = wb.active
-    ws_info.title = "Öğrenci Bilgileri"
-    
-    # Başlık
-    ws_info.merge_cells('A1:B1')
-    title_cell = ws_info['A1']
-    title_cell.value = f"{ogrenci.ad_soyad} - Öğrenci Detay Raporu"
-    title_cell.font = Font(bold=True, size=16)
-    title_cell.alignment = Alignment(horizontal='center')
-    
-    # Öğrenci bilgilerini yaz
-    ogrenci_bilgileri = [
-        ['Ad-Soyad', ogrenci.ad_soyad],
-        ['Seviye', ogrenci.get_seviye_display()],
-        ['Kayıt Tarihi', ogrenci.kayit_tarihi.strftime("%d.%m.%Y")],
-        ['Kursta Geçen Süre', f"{(timezone.now().date() - ogrenci.kayit_tarihi).days} gün"],
-        ['Özel Notlar', ogrenci.ozel_notlar or ""]
-    ]
-    
-    row_num = 3
-    for bilgi in ogrenci_bilgileri:
-        ws_info.cell(row=row_num, column=1, value=bilgi[0])
-        ws_info.cell(row=row_num, column=1).font = Font(bold=True)
-        ws_info.cell(row=row_num, column=2, value=bilgi[1])
-        row_num += 1
-    
-    # 2. Sınav Sonuçları sayfası
-    ws_sinav = wb.create_sheet(title="Sınav Sonuçları")
-    
-    # Başlık
-    ws_sinav.merge_cells('A1:F1')
-    title_cell = ws_sinav['A1']
-    title_cell.value = "Sınav Sonuçları"
-    title_cell.font = Font(bold=True, size=14)
-    title_cell.alignment = Alignment(horizontal='center')
-    
-    # Sütun başlıkları
-    columns = ['Ders', 'Sınav Tipi', 'Puan', 'Tarih', 'Açıklama', 'Durum']
-    row_num = 3
-    for col_num, column_title in enumerate(columns, 1):
-        cell = ws_sinav.cell(row=row_num, column=col_num)
-        cell.value = column_title
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Sınav verileri
-    sinav_sonuclari = SinavSonucu.objects.filter(ogrenci=ogrenci).select_related('ders')
-    row_num = 4
-    for sinav in sinav_sonuclari:
-        durum = ""
-        if sinav.puan >= 85:
-            durum = "Çok İyi"
-        elif sinav.puan >= 70:
-            durum = "İyi"
-        elif sinav.puan >= 50:
-            durum = "Orta"
-        else:
-            durum = "Zayıf"
-            
-        row = [
-            sinav.ders.get_tur_display(),
-            sinav.get_sinav_tipi_display(),
-            sinav.puan,
-            sinav.tarih.strftime("%d.%m.%Y") if sinav.tarih else '',
-            sinav.aciklama or '',
-            durum
-        ]
-        for col_num, cell_value in enumerate(row, 1):
-            cell = ws_sinav.cell(row=row_num, column=col_num, value=cell_value)
-            cell.alignment = Alignment(horizontal='center')
-        row_num += 1
-    
-    # Sınav istatistikleri
-    sinav_ortalamasi = sinav_sonuclari.aggregate(ortalama=Avg('puan'))['ortalama'] or 0
-    en_yuksek_puan = sinav_sonuclari.aggregate(en_yuksek=Max('puan'))['en_yuksek'] or 0
-    en_dusuk_puan = sinav_sonuclari.aggregate(en_dusuk=Min('puan'))['en_dusuk'] or 0
-    
-    ws_sinav.cell(row=row_num+2, column=1, value="İstatistikler").font = Font(bold=True)
-    ws_sinav.cell(row=row_num+3, column=1, value="Ortalama Puan")
-    ws_sinav.cell(row=row_num+3, column=2, value=sinav_ortalamasi)
-    ws_sinav.cell(row=row_num+4, column=1, value="En Yüksek Puan")
-    ws_sinav.cell(row=row_num+4, column=2, value=en_yuksek_puan)
-    ws_sinav.cell(row=row_num+5, column=1, value="En Düşük Puan")
-    ws_sinav.cell(row=row_num+5, column=2, value=en_dusuk_puan)
-    
-    # 3. Ezber Kayıtları sayfası
-    ws_ezber = wb.create_sheet(title="Ezber Kayıtları")
-    
-    # Başlık
-    ws_ezber.merge_cells('A1:G1')
-    title_cell = ws_ezber['A1']
-    title_cell.value = "Ezber Kayıtları"
-    title_cell.font = Font(bold=True, size=14)
-    title_cell.alignment = Alignment(horizontal='center')
-    
-    # Sütun başlıkları
-    columns = ['Sıra', 'Sure', 'Durum', 'Başlama Tarihi', 'Bitiş Tarihi', 'Süre (Gün)', 'Yorum']
-    row_num = 3
-    for col_num, column_title in enumerate(columns, 1):
-        cell = ws_ezber.cell(row=row_num, column=col_num)
-        cell.value = column_title
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Ezber verileri
-    ezber_kayitlari = EzberKaydi.objects.filter(ogrenci=ogrenci).select_related('sure').order_by('sure__sira')
-    row_num = 4
-    for ezber in ezber_kayitlari:
-        # Ezber süresini hesapla
-        sure_gun = 0
-        if ezber.baslama_tarihi and ezber.bitis_tarihi:
-            sure_gun = (ezber.bitis_tarihi - ezber.baslama_tarihi).days
-            
-        row = [
-            ezber.sure.sira,
-            ezber.sure.ad,
-            ezber.get_durum_display(),
-            ezber.baslama_tarihi.strftime("%d.%m.%Y") if ezber.baslama_tarihi else '',
-            ezber.bitis_tarihi.strftime("%d.%m.%Y") if ezber.bitis_tarihi else '',
-            sure_gun,
-            ezber.yorum or ''
-        ]
-        for col_num, cell_value in enumerate(row, 1):
-            cell = ws_ezber.cell(row=row_num, column=col_num, value=cell_value)
-            cell.alignment = Alignment(horizontal='center')
-        row_num += 1
-    
-    # Ezber istatistikleri
-    tamamlanan_ezberler = ezber_kayitlari.filter(durum='TAMAMLANDI').count()
-    devam_eden_ezberler = ezber_kayitlari.filter(durum='DEVAM').count()
-    toplam_ezber = EzberSuresi.objects.count()
-    
-    # Ortalama ezber süresi (tamamlananlar için)
-    tamamlanan_ezber_kayitlari = ezber_kayitlari.filter(durum='TAMAMLANDI')
-    ortalama_ezber_suresi = 0
-    if tamamlanan_ezber_kayitlari.exists():
-        toplam_gun = 0
-        for ezber in tamamlanan_ezber_kayitlari:
-            if ezber.baslama_tarihi and ezber.bitis_tarihi:
-                toplam_gun += (ezber.bitis_tarihi - ezber.baslama_tarihi).days
-        ortalama_ezber_suresi = toplam_gun / tamamlanan_ezber_kayitlari.count()
-    
-    ws_ezber.cell(row=row_num+2, column=1, value="İstatistikler").font = Font(bold=True)
-    ws_ezber.cell(row=row_num+3, column=1, value="Tamamlanan Ezber")
-    ws_ezber.cell(row=row_num+3, column=2, value=tamamlanan_ezberler)
-    ws_ezber.cell(row=row_num+4, column=1, value="Devam Eden Ezber")
-    ws_ezber.cell(row=row_num+4, column=2, value=devam_eden_ezberler)
-    ws_ezber.cell(row=row_num+5, column=1, value="Toplam Ezber")
-    ws_ezber.cell(row=row_num+5, column=2, value=toplam_ezber)
-    ws_ezber.cell(row=row_num+6, column=1, value="Tamamlama Oranı")
-    ws_ezber.cell(row=row_num+6, column=2, value=f"{(tamamlanan_ezberler/toplam_ezber*100):.1f}%" if toplam_ezber > 0 else "0%")
-    ws_ezber.cell(row=row_num+7, column=1, value="Ortalama Ezber Süresi (Gün)")
-    ws_ezber.cell(row=row_num+7, column=2, value=f"{ortalama_ezber_suresi:.1f}")
-    
-    # 4. Performans Analizi sayfası
-    ws_analiz = wb.create_sheet(title="Performans Analizi")
-    
-    # Başlık
-    ws_analiz.merge_cells('A1:B1')
-    title_cell = ws_analiz['A1']
-    title_cell.value = "Performans Analizi"
-    title_cell.font = Font(bold=True, size=14)
-    title_cell.alignment = Alignment(horizontal='center')
-    
-    # Sınıf karşılaştırması
-    sinif_ortalamasi = SinavSonucu.objects.aggregate(ortalama=Avg('puan'))['ortalama'] or 0
-    sinif_ezber_ortalamasi = EzberKaydi.objects.filter(durum='TAMAMLANDI').values('ogrenci').annotate(
-        tamamlanan=Count('id')
-    ).aggregate(ortalama=Avg('tamamlanan'))['ortalama'] or 0
-    
-    analiz_verileri = [
-        ['Öğrenci Ortalaması', sinav_ortalamasi],
-        ['Sınıf Ortalaması', sinif_ortalamasi],
-        ['Fark', sinav_ortalamasi - sinif_ortalamasi],
-        ['', ''],
-        ['Tamamlanan Ezber', tamamlanan_ezberler],
-        ['Sınıf Ortalaması (Ezber)', sinif_ezber_ortalamasi],
-        ['Fark', tamamlanan_ezberler - sinif_ezber_ortalamasi],
-        ['', ''],
-        ['Önerilen Çalışma Süresi', 
-         '8 saat/gün' if sinav_ortalamasi < 50 else
-         '6 saat/gün' if sinav_ortalamasi < 60 else
-         '4 saat/gün' if sinav_ortalamasi < 70 else
-         '2 saat/gün' if sinav_ortalamasi < 80 else
-         '1 saat/gün'],
-        ['Hafızlık Potansiyeli', 
-         'Yüksek' if tamamlanan_ezberler >= 10 else
-         'Orta' if tamamlanan_ezberler >= 7 else
-         'Düşük' if tamamlanan_ezberler >= 4 else
-         'Belirsiz']
-    ]
-    
-    row_num = 3
-    for veri in analiz_verileri:
-        ws_analiz.cell(row=row_num, column=1, value=veri[0])
-        if veri[0]:  # Başlık satırları için
-            ws_analiz.cell(row=row_num, column=1).font = Font(bold=True)
-        ws_analiz.cell(row=row_num, column=2, value=veri[1])
-        row_num += 1
-    
-    # Sütun genişliklerini manuel olarak ayarla (MergedCell hatasını önlemek için)
-    column_widths = {
-        'Öğrenci Bilgileri': {'A': 20, 'B': 30},
-        'Sınav Sonuçları': {'A': 15, 'B': 15, 'C': 10, 'D': 12, 'E': 20, 'F': 15},
-        'Ezber Kayıtları': {'A': 8, 'B': 20, 'C': 15, 'D': 15, 'E': 15, 'F': 12, 'G': 30},
-        'Performans Analizi': {'A': 25, 'B': 20}
-    }
-    
-    for sheet_name, widths in column_widths.items():
-        if sheet_name == 'Öğrenci Bilgileri':
-            ws = ws_info
-        elif sheet_name == 'Sınav Sonuçları':
-            ws = ws_sinav
-        elif sheet_name == 'Ezber Kayıtları':
-            ws = ws_ezber
-        elif sheet_name == 'Performans Analizi':
-            ws = ws_analiz
-        
-        for col_letter, width in widths.items():
-            ws.column_dimensions[col_letter].width = width
+    ogrenci = get_object_or_404(excel_service.rapor_ogrencileri(Ogrenci.objects.all()), id=id)
+    xlsx = excel_service.ogrenci_raporu_xlsx(
+        excel_service.ogrenci_rapor_verisi(ogrenci), excel_service.sinif_ortalamalari()
+    )
     
     # Dosyayı kaydet
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    response = HttpResponse(xlsx, content_type=excel_service.XLSX_CONTENT_TYPE)
     response['Content-Disposition'] = f'attachment; filename="{ogrenci.ad_soyad}_detay_raporu_{timezone.now().strftime("%Y%m%d_%H%M")}.xlsx"'
-    
-    wb.save(response)
+    return response
+
+@login_required(login_url='login')
+@require_POST
+def export_ogrenci_raporlari(request):
+    """
+    Tüm öğrencilerin (veya ?seviye= ile seçilenlerin) detay raporlarını tek ZIP
+    olarak hazırlayan arka plan işini başlatır (202)
+    """
+    ogrenciler = Ogrenci.objects.all()
+    seviye_filtre = request.POST.get('seviye')
+    if seviye_filtre:
+        ogrenciler = ogrenciler.filter(seviye=seviye_filtre)
+    return JsonResponse(report_job_service.is_baslat(ogrenciler), status=202)
+
+@login_required(login_url='login')
+def export_ogrenci_raporlari_durum(request, is_id):
+    """Toplu rapor işinin ilerleme durumunu JSON olarak döndürür"""
+    is_kaydi = report_job_service.is_oku(is_id)
+    if not is_kaydi:
+        return JsonResponse({'status': 'error', 'message': 'Rapor işi bulunamadı'}, status=404)
+    return JsonResponse(is_kaydi)
+
+@login_required(login_url='login')
+def export_ogrenci_raporlari_indir(request, is_id):
+    """Tamamlanan toplu rapor ZIP'ini indirir"""
+    is_kaydi = report_job_service.is_oku(is_id)
+    if not is_kaydi or is_kaydi['status'] != 'completed':
+        raise Http404('Rapor bulunamadı')
+    return file_service.dosya_yaniti(
+        request, report_job_service.zip_yolu(is_kaydi), 'application/zip', as_attachment=True
+    )
+
+@login_required(login_url='login')
+def veri_disa_aktar(request, tablo):
+    """
+    Salt okunur dışa aktarım API'si - tabloyu CSV veya NDJSON olarak akıtır
+    ?format=csv|ndjson, ?since=<tarih veya ISO zaman>, ?after=<pk>, ?limit=<satır>
+    limit verilirse ve satır kalıyorsa sonraki sayfa Link (rel="next") ve
+    X-Next-After başlıklarıyla bildirilir.
+    """
+    bicim = request.GET.get('format', 'csv')
+    if bicim not in data_export_service.BICIMLER:
+        return JsonResponse({'status': 'error', 'message': f'Desteklenmeyen biçim: {bicim}'}, status=400)
+    try:
+        since = data_export_service.zamani_coz(request.GET['since']) if request.GET.get('since') else None
+        after = int(request.GET['after']) if request.GET.get('after') else None
+        limit = int(request.GET['limit']) if request.GET.get('limit') else None
+        if limit is not None and limit <= 0:
+            raise ValueError('limit pozitif olmalı')
+        qs = data_export_service.sorgu(tablo, since=since, after=after)
+    except LookupError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=404)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    response = StreamingHttpResponse(
+        data_export_service.akis(qs, bicim, limit), content_type=data_export_service.BICIMLER[bicim]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{tablo}.{bicim}"'
+    if limit:
+        sonraki = data_export_service.sonraki_imlec(qs, limit)
+        if sonraki is not None:
+            sorgu_parametreleri = request.GET.copy()
+            sorgu_parametreleri['after'] = sonraki
+            response['X-Next-After'] = str(sonraki)
+            response['Link'] = f'<{request.path}?{sorgu_parametreleri.urlencode()}>; rel="next"'
     return response
 
 def format_gemini_response(text):
@@ -2009,70 +1367,35 @@ def alinti_sil(request, id):
 
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Q
 from blog.models import yazi
 from mainproject.models import Ogrenci, EzberKaydi, SinavSonucu
 
 @login_required(login_url='login')
 def admin_dashboard(request):
-    # İstatistik verileri - Her zaman güncel veriyi al
+    # İstatistik verileri - sınıf geneli değerler veriler değişmedikçe önbellekten
     toplam_yazi = yazi.objects.count()
-    toplam_ogrenci = Ogrenci.objects.count()
+    sinif = sinif_istatistik_service.sinif_istatistikleri()
+    toplam_ogrenci = sinif['toplam_ogrenci']
     
     # Sınıf ortalaması - Tüm sınav sonuçlarının ortalaması
-    sinif_ortalamasi = SinavSonucu.objects.aggregate(
-        ortalama=Avg('puan')
-    )['ortalama'] or 0
+    sinif_ortalamasi = sinif['sinif_ortalamasi']
     
     # Ezber istatistikleri
-    tamamlanan_ezber = EzberKaydi.objects.filter(durum='TAMAMLANDI').count()
-    devam_eden_ezber = EzberKaydi.objects.filter(durum='DEVAM').count()
+    tamamlanan_ezber = sinif['tamamlanan_ezber']
+    devam_eden_ezber = sinif['devam_eden_ezber']
     toplam_ezber = tamamlanan_ezber + devam_eden_ezber
     ezber_tamamlama_orani = round((tamamlanan_ezber / toplam_ezber * 100), 1) if toplam_ezber > 0 else 0
     
     # Elif Ba istatistikleri
-    tamamlanan_elifba = ElifBaEzberDurumu.objects.filter(durum='TAMAMLANDI').count()
-    devam_eden_elifba = ElifBaEzberDurumu.objects.filter(durum='DEVAM').count()
+    tamamlanan_elifba = sinif['tamamlanan_elifba']
+    devam_eden_elifba = sinif['devam_eden_elifba']
     
     # Seviye dağılımı
-    seviye_dagilimi = {
-        'HAZ1': Ogrenci.objects.filter(seviye='HAZ1').count(),
-        'HAZ2': Ogrenci.objects.filter(seviye='HAZ2').count(),
-        'HAZ3': Ogrenci.objects.filter(seviye='HAZ3').count(),
-        'TEMEL': Ogrenci.objects.filter(seviye='TEMEL').count(),
-        'ILERI': Ogrenci.objects.filter(seviye='ILERI').count(),
-        'HAFIZLIK': Ogrenci.objects.filter(seviye='HAFIZLIK').count(),
-    }
-    
-    # En başarılı 5 öğrenci - BASİT ORTALAMA HESAPLAMA
-    en_basarili_5_ogrenci = []
-    tum_ogrenciler = Ogrenci.objects.all()
-    
-    for ogrenci in tum_ogrenciler:
-        # Öğrencinin tüm sınav sonuçlarını al
-        ogrenci_sinavlari = SinavSonucu.objects.filter(ogrenci=ogrenci)
-        toplam_puan = 0
-        sinav_sayisi = ogrenci_sinavlari.count()
-        
-        if sinav_sayisi > 0:
-            for sinav in ogrenci_sinavlari:
-                toplam_puan += sinav.puan
-            ogrenci.ders_ortalamasi = toplam_puan / sinav_sayisi
-        else:
-            ogrenci.ders_ortalamasi = 0
+    seviye_dagilimi = sinif['seviye_dagilimi']
     
-    # Ortalamaya göre sırala ve ilk 5'i al
-    en_basarili_5_ogrenci = sorted(
-        tum_ogrenciler, 
-        key=lambda x: x.ders_ortalamasi, 
-        reverse=True
-    )[:5]
-    
-    # DEBUG: Konsola yazdır kontrol et
-    print("=== ÖĞRENCİ ORTALAMALARI ===")
-    for i, ogrenci in enumerate(en_basarili_5_ogrenci, 1):
-        sinav_sayisi = SinavSonucu.objects.filter(ogrenci=ogrenci).count()
-        print(f"{i}. {ogrenci.ad_soyad}: {ogrenci.ders_ortalamasi:.1f} (Sınav sayısı: {sinav_sayisi})")
+    # En başarılı 5 öğrenci - tek sorguda sıralama
+    en_basarili_5_ogrenci = siralama_service.en_basarili(5)
     
     # Son eklenen 5 öğrenci
     son_ogrenciler = Ogrenci.objects.all().order_by('-kayit_tarihi')[:5]
@@ -2441,90 +1764,92 @@ def ogrenci_duzenle(request, id):
         if 'profil_foto' in request.FILES:
             ogrenci.profil_foto = request.FILES['profil_foto']
         
-        ogrenci.save()
-        
-        # Mevcut sınav sonuçlarını sil ve yenilerini ekle
-        sinav_sonuclari.delete()
-        for ders in tum_dersler:
-            for i in range(1, 4):  # 3 sınav için
-                puan = request.POST.get(f'sinav_puan_{ders.id}_{i}')
-                if puan and puan.strip():
-                    SinavSonucu.objects.create(
-                        ogrenci=ogrenci,
-                        ders=ders,
-                        puan=int(puan),
-                        sinav_tipi='GENEL',
-                        aciklama=f"{i}. sınav"
-                    )
-        
-        # Ezber kayıtlarını güncelle (silip yeniden oluşturma)
-        for ezber in tum_ezberler:
-            # Her ezber için verileri al
-            durum = request.POST.get(f'ezber_durum_{ezber.id}', 'BASLAMADI')
-            ilerleme = request.POST.get(f'ezber_ilerleme_{ezber.id}', 0)
-            baslama_tarihi = request.POST.get(f'ezber_baslama_{ezber.id}') or None
-            bitis_tarihi = request.POST.get(f'ezber_bitis_{ezber.id}') or None
-            yorum = request.POST.get(f'ezber_yorum_{ezber.id}', '')
-            
-            # Mevcut kaydı kontrol et
-            ezber_kaydi = ezber_sozlugu.get(ezber.id)
-            
-            if ezber_kaydi:
-                # Kayıt varsa güncelle
-                ezber_kaydi.durum = durum
-                ezber_kaydi.ilerleme = ilerleme
-                ezber_kaydi.baslama_tarihi = baslama_tarihi
-                ezber_kaydi.bitis_tarihi = bitis_tarihi
-                ezber_kaydi.yorum = yorum
-                ezber_kaydi.save()
-            else:
-                # Kayıt yoksa yeni oluştur (sadece değerler varsayılandan farklıysa)
-                if durum != 'BASLAMADI' or int(ilerleme) > 0 or baslama_tarihi or bitis_tarihi or yorum.strip():
-                    EzberKaydi.objects.create(
-                        ogrenci=ogrenci,
-                        sure=ezber,
-                        durum=durum,
-                        ilerleme=ilerleme,
-                        baslama_tarihi=baslama_tarihi,
-                        bitis_tarihi=bitis_tarihi,
-                        yorum=yorum
-                    )
-        
-        # Elif Ba Ezber durumlarını güncelle
-        for ezber in tum_elif_ba_ezberleri:
-            durum = request.POST.get(f'elif_ba_durum_{ezber.id}', 'BASLAMADI')
-            yorum = request.POST.get(f'elif_ba_yorum_{ezber.id}', '')
-            baslama_tarihi = request.POST.get(f'elif_ba_baslama_{ezber.id}') or None
-            bitis_tarihi = request.POST.get(f'elif_ba_bitis_{ezber.id}') or None
-            
-            # Mevcut kaydı kontrol et
-            try:
-                durum_kaydi = ElifBaEzberDurumu.objects.get(ogrenci=ogrenci, ezber=ezber)
-            except ElifBaEzberDurumu.DoesNotExist:
-                durum_kaydi = None
-            
-            if durum_kaydi:
-                # Kayıt varsa güncelle
-                durum_kaydi.durum = durum
-                durum_kaydi.yorum = yorum
-                durum_kaydi.baslama_tarihi = baslama_tarihi
-                durum_kaydi.bitis_tarihi = bitis_tarihi
-                durum_kaydi.tamamlandi_tarihi = bitis_tarihi if durum == 'TAMAMLANDI' else None
-                durum_kaydi.save()
-            else:
-                # Kayıt yoksa ve değerler varsayılandan farklıysa yeni oluştur
-                if durum != 'BASLAMADI' or yorum or baslama_tarihi or bitis_tarihi:
-                    ElifBaEzberDurumu.objects.create(
-                        ogrenci=ogrenci,
-                        ezber=ezber,
-                        durum=durum,
-                        yorum=yorum,
-                        baslama_tarihi=baslama_tarihi,
-                        bitis_tarihi=bitis_tarihi,
-                        tamamlandi_tarihi=bitis_tarihi if durum == 'TAMAMLANDI' else None
-                    )
-        
-        # Seviye güncellemesi yap
+        # Kayıt kayıt değil, öğrencinin özeti blok sonunda bir kez güncellenir
+        with transaction.atomic(), stats_service.toplu_guncelleme():
+            ogrenci.save()
+        
+            # Mevcut sınav sonuçlarını sil ve yenilerini ekle
+            sinav_sonuclari.delete()
+            for ders in tum_dersler:
+                for i in range(1, 4):  # 3 sınav için
+                    puan = request.POST.get(f'sinav_puan_{ders.id}_{i}')
+                    if puan and puan.strip():
+                        SinavSonucu.objects.create(
+                            ogrenci=ogrenci,
+                            ders=ders,
+                            puan=int(puan),
+                            sinav_tipi='GENEL',
+                            aciklama=f"{i}. sınav"
+                        )
+        
+            # Ezber kayıtlarını güncelle (silip yeniden oluşturma)
+            for ezber in tum_ezberler:
+                # Her ezber için verileri al
+                durum = request.POST.get(f'ezber_durum_{ezber.id}', 'BASLAMADI')
+                ilerleme = request.POST.get(f'ezber_ilerleme_{ezber.id}', 0)
+                baslama_tarihi = request.POST.get(f'ezber_baslama_{ezber.id}') or None
+                bitis_tarihi = request.POST.get(f'ezber_bitis_{ezber.id}') or None
+                yorum = request.POST.get(f'ezber_yorum_{ezber.id}', '')
+            
+                # Mevcut kaydı kontrol et
+                ezber_kaydi = ezber_sozlugu.get(ezber.id)
+            
+                if ezber_kaydi:
+                    # Kayıt varsa güncelle
+                    ezber_kaydi.durum = durum
+                    ezber_kaydi.ilerleme = ilerleme
+                    ezber_kaydi.baslama_tarihi = baslama_tarihi
+                    ezber_kaydi.bitis_tarihi = bitis_tarihi
+                    ezber_kaydi.yorum = yorum
+                    ezber_kaydi.save()
+                else:
+                    # Kayıt yoksa yeni oluştur (sadece değerler varsayılandan farklıysa)
+                    if durum != 'BASLAMADI' or int(ilerleme) > 0 or baslama_tarihi or bitis_tarihi or yorum.strip():
+                        EzberKaydi.objects.create(
+                            ogrenci=ogrenci,
+                            sure=ezber,
+                            durum=durum,
+                            ilerleme=ilerleme,
+                            baslama_tarihi=baslama_tarihi,
+                            bitis_tarihi=bitis_tarihi,
+                            yorum=yorum
+                        )
+        
+            # Elif Ba Ezber durumlarını güncelle
+            for ezber in tum_elif_ba_ezberleri:
+                durum = request.POST.get(f'elif_ba_durum_{ezber.id}', 'BASLAMADI')
+                yorum = request.POST.get(f'elif_ba_yorum_{ezber.id}', '')
+                baslama_tarihi = request.POST.get(f'elif_ba_baslama_{ezber.id}') or None
+                bitis_tarihi = request.POST.get(f'elif_ba_bitis_{ezber.id}') or None
+            
+                # Mevcut kaydı kontrol et
+                try:
+                    durum_kaydi = ElifBaEzberDurumu.objects.get(ogrenci=ogrenci, ezber=ezber)
+                except ElifBaEzberDurumu.DoesNotExist:
+                    durum_kaydi = None
+            
+                if durum_kaydi:
+                    # Kayıt varsa güncelle
+                    durum_kaydi.durum = durum
+                    durum_kaydi.yorum = yorum
+                    durum_kaydi.baslama_tarihi = baslama_tarihi
+                    durum_kaydi.bitis_tarihi = bitis_tarihi
+                    durum_kaydi.tamamlandi_tarihi = bitis_tarihi if durum == 'TAMAMLANDI' else None
+                    durum_kaydi.save()
+                else:
+                    # Kayıt yoksa ve değerler varsayılandan farklıysa yeni oluştur
+                    if durum != 'BASLAMADI' or yorum or baslama_tarihi or bitis_tarihi:
+                        ElifBaEzberDurumu.objects.create(
+                            ogrenci=ogrenci,
+                            ezber=ezber,
+                            durum=durum,
+                            yorum=yorum,
+                            baslama_tarihi=baslama_tarihi,
+                            bitis_tarihi=bitis_tarihi,
+                            tamamlandi_tarihi=bitis_tarihi if durum == 'TAMAMLANDI' else None
+                        )
+        
+        # Seviye güncellemesi - özet satırı güncellendikten sonra
         update_ogrenci_seviye(ogrenci)
         
         messages.success(request, 'Öğrenci bilgileri ve tüm veriler güncellendi')
@@ -2596,45 +1921,46 @@ def toplu_elifba_durum_degistir(request, id):
         bugun = timezone.now().date()
         guncellenen_sayisi = 0
         
-        # Her seçilen ezber için durum güncelle
-        for ezber_id in ezber_idleri:
-            try:
-                ezber = ElifBaEzberi.objects.get(id=ezber_id)
+        # Her seçilen ezber için durum güncelle - öğrencinin özeti blok sonunda bir kez
+        with transaction.atomic(), stats_service.toplu_guncelleme():
+            for ezber_id in ezber_idleri:
+                try:
+                    ezber = ElifBaEzberi.objects.get(id=ezber_id)
                 
-                # Ezber durumunu al veya oluştur
-                ezber_durumu, created = ElifBaEzberDurumu.objects.get_or_create(
-                    ogrenci=ogrenci,
-                    ezber=ezber,
-                    defaults={'durum': yeni_durum}
-                )
+                    # Ezber durumunu al veya oluştur
+                    ezber_durumu, created = ElifBaEzberDurumu.objects.get_or_create(
+                        ogrenci=ogrenci,
+                        ezber=ezber,
+                        defaults={'durum': yeni_durum}
+                    )
                 
-                # Durumu güncelle
-                ezber_durumu.durum = yeni_durum
+                    # Durumu güncelle
+                    ezber_durumu.durum = yeni_durum
                 
-                # Tarihleri güncelle
-                if yeni_durum == 'DEVAM':
-                    if not ezber_durumu.baslama_tarihi:
-                        ezber_durumu.baslama_tarihi = bugun
-                    ezber_durumu.bitis_tarihi = None
-                    ezber_durumu.tamamlandi_tarihi = None
+                    # Tarihleri güncelle
+                    if yeni_durum == 'DEVAM':
+                        if not ezber_durumu.baslama_tarihi:
+                            ezber_durumu.baslama_tarihi = bugun
+                        ezber_durumu.bitis_tarihi = None
+                        ezber_durumu.tamamlandi_tarihi = None
                     
-                elif yeni_durum == 'TAMAMLANDI':
-                    if not ezber_durumu.baslama_tarihi:
-                        ezber_durumu.baslama_tarihi = bugun
-                    if not ezber_durumu.bitis_tarihi:
-                        ezber_durumu.bitis_tarihi = bugun
-                    ezber_durumu.tamamlandi_tarihi = bugun
+                    elif yeni_durum == 'TAMAMLANDI':
+                        if not ezber_durumu.baslama_tarihi:
+                            ezber_durumu.baslama_tarihi = bugun
+                        if not ezber_durumu.bitis_tarihi:
+                            ezber_durumu.bitis_tarihi = bugun
+                        ezber_durumu.tamamlandi_tarihi = bugun
                     
-                elif yeni_durum == 'BASLAMADI':
-                    ezber_durumu.baslama_tarihi = None
-                    ezber_durumu.bitis_tarihi = None
-                    ezber_durumu.tamamlandi_tarihi = None
+                    elif yeni_durum == 'BASLAMADI':
+                        ezber_durumu.baslama_tarihi = None
+                        ezber_durumu.bitis_tarihi = None
+                        ezber_durumu.tamamlandi_tarihi = None
                 
-                ezber_durumu.save()
-                guncellenen_sayisi += 1
+                    ezber_durumu.save()
+                    guncellenen_sayisi += 1
                 
-            except ElifBaEzberi.DoesNotExist:
-                continue
+                except ElifBaEzberi.DoesNotExist:
+                    continue
         
         durum_adi = {
             'TAMAMLANDI': 'Tamamlandı',
@@ -2675,47 +2001,48 @@ def toplu_ezber_durum_degistir(request, id):
         bugun = timezone.now().date()
         guncellenen_sayisi = 0
         
-        # Her seçilen ezber için durum güncelle
-        for sure_id in ezber_idleri:
-            try:
-                # EzberSuresi'ni bul
-                sure = EzberSuresi.objects.get(id=sure_id)
+        # Her seçilen ezber için durum güncelle - öğrencinin özeti blok sonunda bir kez
+        with transaction.atomic(), stats_service.toplu_guncelleme():
+            for sure_id in ezber_idleri:
+                try:
+                    # EzberSuresi'ni bul
+                    sure = EzberSuresi.objects.get(id=sure_id)
                 
-                # Öğrencinin bu süre için kaydını bul veya oluştur
-                ezber_kaydi, created = EzberKaydi.objects.get_or_create(
-                    ogrenci=ogrenci,
-                    sure=sure,
-                    defaults={'ilerleme': 0, 'durum': 'BASLAMADI'}
-                )
+                    # Öğrencinin bu süre için kaydını bul veya oluştur
+                    ezber_kaydi, created = EzberKaydi.objects.get_or_create(
+                        ogrenci=ogrenci,
+                        sure=sure,
+                        defaults={'ilerleme': 0, 'durum': 'BASLAMADI'}
+                    )
                 
-                # Duruma göre tarihleri ve ilerlemeyi güncelle
-                if yeni_durum == 'DEVAM':
-                    ezber_kaydi.durum = 'DEVAM'
-                    if not ezber_kaydi.baslama_tarihi:
-                        ezber_kaydi.baslama_tarihi = bugun
-                    ezber_kaydi.bitis_tarihi = None
-                    # İlerleme 0 ise başlamış olarak %10 yap
-                    if ezber_kaydi.ilerleme == 0:
-                        ezber_kaydi.ilerleme = 10
+                    # Duruma göre tarihleri ve ilerlemeyi güncelle
+                    if yeni_durum == 'DEVAM':
+                        ezber_kaydi.durum = 'DEVAM'
+                        if not ezber_kaydi.baslama_tarihi:
+                            ezber_kaydi.baslama_tarihi = bugun
+                        ezber_kaydi.bitis_tarihi = None
+                        # İlerleme 0 ise başlamış olarak %10 yap
+                        if ezber_kaydi.ilerleme == 0:
+                            ezber_kaydi.ilerleme = 10
                     
-                elif yeni_durum == 'TAMAMLANDI':
-                    ezber_kaydi.durum = 'TAMAMLANDI'
-                    if not ezber_kaydi.baslama_tarihi:
-                        ezber_kaydi.baslama_tarihi = bugun
-                    ezber_kaydi.bitis_tarihi = bugun
-                    ezber_kaydi.ilerleme = 100
+                    elif yeni_durum == 'TAMAMLANDI':
+                        ezber_kaydi.durum = 'TAMAMLANDI'
+                        if not ezber_kaydi.baslama_tarihi:
+                            ezber_kaydi.baslama_tarihi = bugun
+                        ezber_kaydi.bitis_tarihi = bugun
+                        ezber_kaydi.ilerleme = 100
                     
-                elif yeni_durum == 'BASLAMADI':
-                    ezber_kaydi.durum = 'BASLAMADI'
-                    ezber_kaydi.baslama_tarihi = None
-                    ezber_kaydi.bitis_tarihi = None
-                    ezber_kaydi.ilerleme = 0
+                    elif yeni_durum == 'BASLAMADI':
+                        ezber_kaydi.durum = 'BASLAMADI'
+                        ezber_kaydi.baslama_tarihi = None
+                        ezber_kaydi.bitis_tarihi = None
+                        ezber_kaydi.ilerleme = 0
                 
-                ezber_kaydi.save()
-                guncellenen_sayisi += 1
+                    ezber_kaydi.save()
+                    guncellenen_sayisi += 1
                 
-            except EzberSuresi.DoesNotExist:
-                continue
+                except EzberSuresi.DoesNotExist:
+                    continue
         
         durum_adi = {
             'TAMAMLANDI': 'Tamamlandı',
@@ -2869,7 +2196,7 @@ def sinav_sonucu_ekle(request, id):
     
     return redirect('ogrenci_detay', id=id)
 
-from django.db.models import Avg, Count, Sum, Q, F, ExpressionWrapper, DurationField
+from django.db.models import Count, Sum, Q, F, ExpressionWrapper, DurationField
 from django.utils import timezone
 from datetime import timedelta
 import json
@@ -3030,7 +2357,7 @@ def gemini_ogrenci_analizi(veri):
 def ogrenci_detay(request, id):
     # Öğrenciyi ve ilişkili verileri tek sorguda al
     ogrenci = get_object_or_404(
-        Ogrenci.objects.prefetch_related(
+        stats_service.istatistik_ekle(Ogrenci.objects.all()).prefetch_related(
             Prefetch('sinavsonucu_set', queryset=SinavSonucu.objects.select_related('ders')),
             Prefetch('ezberkaydi_set', queryset=EzberKaydi.objects.select_related('sure')),
             Prefetch('elifbaezberdurumu_set', queryset=ElifBaEzberDurumu.objects.select_related('ezber'))
@@ -3043,8 +2370,8 @@ def ogrenci_detay(request, id):
     ezber_kayitlari = ogrenci.ezberkaydi_set.all()
     elifba_durumlari = ogrenci.elifbaezberdurumu_set.all()
     
-    # Sınav ortalaması
-    sinav_ortalamasi = sinav_sonuclari.aggregate(ortalama=Avg('puan'))['ortalama'] or 0
+    # Sınav ortalaması - özet tablosundan
+    sinav_ortalamasi = ogrenci.ders_ortalamasi
     
     # Ezber istatistikleri
     ezber_durumlari = ezber_kayitlari.aggregate(
@@ -3068,21 +2395,18 @@ def ogrenci_detay(request, id):
     devam_eden_elifba = elifba_durumlari_istatistik['devam_eden'] or 0
     baslamayan_elifba = elifba_durumlari_istatistik['baslamayan'] or 0
     
-    # Toplam sayılar
-    toplam_ezber = EzberSuresi.objects.count()
-    toplam_elifba = ElifBaEzberi.objects.count()
+    # Toplam sayılar - sınıf geneli değerlerle birlikte önbellekten
+    sinif = sinif_istatistik_service.sinif_istatistikleri()
+    toplam_ezber = sinif['toplam_ezber_sayisi']
+    toplam_elifba = sinif['toplam_elifba_sayisi']
     
     # Yüzde hesaplamaları
     tamamlanan_ezber_yuzde = (tamamlanan_ezberler / toplam_ezber * 100) if toplam_ezber > 0 else 0
     tamamlanan_elifba_yuzde = (tamamlanan_elifba / toplam_elifba * 100) if toplam_elifba > 0 else 0
     
-    # Max ve min puan hesaplamaları
-    if sinav_sonuclari.exists():
-        max_puan = sinav_sonuclari.aggregate(Max('puan'))['puan__max'] or 0
-        min_puan = sinav_sonuclari.aggregate(Min('puan'))['puan__min'] or 0
-    else:
-        max_puan = 0
-        min_puan = 0
+    # Max ve min puan hesaplamaları - önceden yüklenmiş sınavlardan
+    max_puan = max((sinav.puan for sinav in sinav_sonuclari), default=0)
+    min_puan = min((sinav.puan for sinav in sinav_sonuclari), default=0)
     
     # Ezber süre analizi
     tamamlanan_ezberler_list = ezber_kayitlari.filter(durum='TAMAMLANDI', baslama_tarihi__isnull=False, bitis_tarihi__isnull=False)
@@ -3106,45 +2430,13 @@ def ogrenci_detay(request, id):
         ders_bazli_ortalama[ders] = sum(puanlar) / len(puanlar)
     
     # Sınıf istatistikleri
-    sinif_ortalamasi = SinavSonucu.objects.aggregate(ortalama=Avg('puan'))['ortalama'] or 0
-    
-    # Öğrencinin sınıf sıralaması
-    ogrenci_siralamasi_list = list(Ogrenci.objects.annotate(
-        ortalama=Avg('sinavsonucu__puan'),
-        tamamlanan_ezber=Count('ezberkaydi', filter=Q(ezberkaydi__durum='TAMAMLANDI'))
-    ).order_by('-ortalama', '-tamamlanan_ezber').values('id', 'ad_soyad', 'ortalama', 'tamamlanan_ezber'))
-    
-    sinif_siralamasi = next((i+1 for i, o in enumerate(ogrenci_siralamasi_list) if o['id'] == ogrenci.id), 0)
-    toplam_ogrenci_sayisi = len(ogrenci_siralamasi_list)
-    
-    # Tüm öğrenci verilerini doğru şekilde hazırla
-    tum_ogrenci_verileri = []
-    for o in Ogrenci.objects.all():
-        # Her öğrenci için ayrı ayrı hesaplama yap
-        sinav_ortalama = SinavSonucu.objects.filter(ogrenci=o).aggregate(
-            ortalama=Avg('puan')
-        )['ortalama'] or 0
-        
-        tamamlanan_ezber = EzberKaydi.objects.filter(
-            ogrenci=o, 
-            durum='TAMAMLANDI'
-        ).count()
-        
-        tamamlanan_elifba_o = ElifBaEzberDurumu.objects.filter(
-            ogrenci=o, 
-            durum='TAMAMLANDI'
-        ).count()
-        
-        tum_ogrenci_verileri.append({
-            'id': o.id,
-            'ad_soyad': o.ad_soyad,
-            'ortalama': sinav_ortalama,
-            'tamamlanan_ezber': tamamlanan_ezber,
-            'tamamlanan_elifba': tamamlanan_elifba_o
-        })
+    sinif_ortalamasi = sinif['sinif_ortalamasi']
+    
+    # Öğrencinin sınıf sıralaması - öğrenciler belleğe alınmadan, tek sorgu
+    sinif_siralamasi, toplam_ogrenci_sayisi = siralama_service.ogrenci_sirasi(ogrenci)
     
-    # Sıralama yap (ortalama ve tamamlanan ezber sayısına göre)
-    tum_ogrenci_verileri.sort(key=lambda x: (-x['ortalama'], -x['tamamlanan_ezber']))
+    # Karşılaştırma tablosu ve grafikleri için sıralı öğrenci verileri - tek sorgu
+    tum_ogrenci_verileri = siralama_service.karsilastirma_verileri()
     
     # GELİŞİM VERİLERİ HESAPLAMALARI - YENİ EKLENDİ
     kayit_suresi_gun = (timezone.now().date() - ogrenci.kayit_tarihi).days
@@ -3249,6 +2541,22 @@ def ogrenci_detay(request, id):
 
 
 
+# Öğrenci listesi sıralamaları: ?siralama= değeri -> (etiket, order_by ifadeleri)
+# Ortalama ve ezber sıralamaları özet tablosunun indeksli sütunlarını kullanır;
+# sınavı olmayan öğrenciler ortalaması 0 olanlarla birlikte en düşükte yer alır.
+OGRENCI_SIRALAMALARI = {
+    'ad_soyad': ('Ad (A-Z)', ('ad_soyad',)),
+    '-ad_soyad': ('Ad (Z-A)', ('-ad_soyad',)),
+    'seviye': ('Seviye', ('seviye',)),
+    '-kayit_tarihi': ('En yeni kayıt', ('-kayit_tarihi',)),
+    'kayit_tarihi': ('En eski kayıt', ('kayit_tarihi',)),
+    '-ortalama': ('Ortalama (yüksekten düşüğe)', (F('istatistik__ortalama_puan').desc(nulls_last=True),)),
+    'ortalama': ('Ortalama (düşükten yükseğe)', (F('istatistik__ortalama_puan').asc(nulls_first=True),)),
+    '-tamamlanan_ezber': ('Tamamlanan ezber (çoktan aza)', ('-istatistik__tamamlanan_ezber',)),
+    'tamamlanan_ezber': ('Tamamlanan ezber (azdan çoğa)', ('istatistik__tamamlanan_ezber',)),
+}
+
+
 @login_required(login_url='login')
 def ogrenci_listesi(request):
     # Arama ve filtreleme
@@ -3265,104 +2573,53 @@ def ogrenci_listesi(request):
     if seviye_filter:
         ogrenciler = ogrenciler.filter(seviye=seviye_filter)
 
-    # Sıralama
-    if siralama in ['ad_soyad', '-ad_soyad', 'seviye', '-kayit_tarihi', 'kayit_tarihi']:
-        ogrenciler = ogrenciler.order_by(siralama)
-    else:
-        ogrenciler = ogrenciler.order_by('ad_soyad')
+    # Sıralama - pk eşitlikleri bozar, sayfalar arasında öğrenci kaymaz
+    if siralama not in OGRENCI_SIRALAMALARI:
+        siralama = 'ad_soyad'
+    ogrenciler = ogrenciler.order_by(*OGRENCI_SIRALAMALARI[siralama][1], 'pk')
 
-    # İstatistikler
-    toplam_ogrenci = Ogrenci.objects.count()
-    tamamlanan_ezber = EzberKaydi.objects.filter(durum='TAMAMLANDI').count()
-    devam_eden_ezber = EzberKaydi.objects.filter(durum='DEVAM').count()
-    tamamlanan_elifba = ElifBaEzberDurumu.objects.filter(durum='TAMAMLANDI').count()
+    # Sayfalama - filtreleme ve sıralamadan hemen sonra. Öğrenci başına
+    # istatistikler sayfa sorgusuna eklenir; yalnızca sayfadaki 8 öğrenci için
+    # okunur, sayım sorgusu ise bunları içermez.
+    paginator = Paginator(stats_service.istatistik_ekle(ogrenciler), 8)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    # Sayfa bağlantıları - tüm sayfalar yerine başı, sonu ve geçerli sayfanın çevresi
+    sayfa_araligi = paginator.get_elided_page_range(page_obj.number, on_each_side=2, on_ends=1)
+
+    # İstatistikler - sınıf geneli değerler veriler değişmedikçe önbellekten
+    sinif = sinif_istatistik_service.sinif_istatistikleri()
+    toplam_ogrenci = sinif['toplam_ogrenci']
+    tamamlanan_ezber = sinif['tamamlanan_ezber']
+    devam_eden_ezber = sinif['devam_eden_ezber']
+    tamamlanan_elifba = sinif['tamamlanan_elifba']
 
     # Toplam sayılar
-    toplam_ezber_sayisi = EzberSuresi.objects.count()
-    toplam_elifba_sayisi = ElifBaEzberi.objects.count()
+    toplam_ezber_sayisi = sinif['toplam_ezber_sayisi']
+    toplam_elifba_sayisi = sinif['toplam_elifba_sayisi']
 
     # Sınıf ortalaması - Tüm sınav sonuçlarının ortalaması
-    sinif_ortalamasi = SinavSonucu.objects.aggregate(ortalama=Avg('puan'))['ortalama'] or 0
+    sinif_ortalamasi = sinif['sinif_ortalamasi']
 
-    # En başarılı öğrenci - Tüm derslerin ortalaması en yüksek olan öğrenci
-    en_basarili_ogrenci = Ogrenci.objects.annotate(
-        ortalama=Avg('sinavsonucu__puan')
-    ).order_by('-ortalama').first()
+    # En başarılı 5 öğrenci - tek sorguda sıralama
+    basarili_ogrenciler = siralama_service.en_basarili(5)
 
-    # HATA DÜZELTİLMİŞ KISIM - None kontrolü eklendi
-    en_basarili_ogrenci_ortalama = en_basarili_ogrenci.ortalama if en_basarili_ogrenci and en_basarili_ogrenci.ortalama is not None else 0
+    # En başarılı öğrenci - Tüm derslerin ortalaması en yüksek olan öğrenci
+    en_basarili_ogrenci = basarili_ogrenciler[0] if basarili_ogrenciler else None
+    en_basarili_ogrenci_ortalama = en_basarili_ogrenci.ders_ortalamasi if en_basarili_ogrenci else 0
 
     # Seviye dağılımı
-    seviye_dagilimi = {
-        'HAZ1': Ogrenci.objects.filter(seviye='HAZ1').count(),
-        'HAZ2': Ogrenci.objects.filter(seviye='HAZ2').count(),
-        'HAZ3': Ogrenci.objects.filter(seviye='HAZ3').count(),
-        'TEMEL': Ogrenci.objects.filter(seviye='TEMEL').count(),
-        'ILERI': Ogrenci.objects.filter(seviye='ILERI').count(),
-        'HAFIZLIK': Ogrenci.objects.filter(seviye='HAFIZLIK').count(),
-    }
+    seviye_dagilimi = sinif['seviye_dagilimi']
 
     # Ders ortalamaları
-    ders_ortalamalari = {}
-    try:
-        from .models import Ders
-        tum_dersler = Ders.objects.all()
-        for ders in tum_dersler:
-            ortalama = SinavSonucu.objects.filter(ders=ders).aggregate(ortalama=Avg('puan'))['ortalama'] or 0
-            ders_ortalamalari[ders.get_tur_display()] = round(ortalama, 1)
-    except:
-        ders_isimleri = ['Kuran', 'Siyer', 'Akaid', 'Fıkıh', 'Ahlak']
-        for ders_adi in ders_isimleri:
-            ortalama = SinavSonucu.objects.filter(ders__icontains=ders_adi).aggregate(ortalama=Avg('puan'))['ortalama'] or 0
-            ders_ortalamalari[ders_adi] = round(ortalama, 1)
+    ders_ortalamalari = sinif['ders_ortalamalari']
 
     # ✅ En başarılı 5 öğrenci (JSON'a uygun dict formatında)
-    basarili_ogrenciler = Ogrenci.objects.annotate(
-        ortalama=Avg('sinavsonucu__puan')
-    ).order_by('-ortalama')[:5]
-
     en_basarili_5_ogrenci = [
-        {"ad_soyad": ogrenci.ad_soyad, "ortalama": float(ogrenci.ortalama or 0)}
+        {"ad_soyad": ogrenci.ad_soyad, "ortalama": float(ogrenci.ders_ortalamasi)}
         for ogrenci in basarili_ogrenciler
     ]
 
-    # Öğrenci bazlı istatistikler
-    ogrenci_ids = [ogrenci.id for ogrenci in ogrenciler]
-
-    ogrenci_ortalamalari = SinavSonucu.objects.filter(
-        ogrenci_id__in=ogrenci_ids
-    ).values('ogrenci').annotate(
-        ortalama=Avg('puan')
-    )
-
-    ogrenci_ezberleri = EzberKaydi.objects.filter(
-        ogrenci_id__in=ogrenci_ids,
-        durum='TAMAMLANDI'
-    ).values('ogrenci').annotate(
-        tamamlanan_ezber=Count('id')
-    )
-
-    ogrenci_elifbalari = ElifBaEzberDurumu.objects.filter(
-        ogrenci_id__in=ogrenci_ids,
-        durum='TAMAMLANDI'
-    ).values('ogrenci').annotate(
-        tamamlanan_elifba=Count('id')
-    )
-
-    ortalamalar_dict = {item['ogrenci']: item['ortalama'] for item in ogrenci_ortalamalari}
-    ezber_dict = {item['ogrenci']: item['tamamlanan_ezber'] for item in ogrenci_ezberleri}
-    elifba_dict = {item['ogrenci']: item['tamamlanan_elifba'] for item in ogrenci_elifbalari}
-
-    for ogrenci in ogrenciler:
-        ogrenci.ders_ortalamasi = ortalamalar_dict.get(ogrenci.id, 0)
-        ogrenci.tamamlanan_ezber_sayisi = ezber_dict.get(ogrenci.id, 0)
-        ogrenci.tamamlanan_elifba_sayisi = elifba_dict.get(ogrenci.id, 0)
-
-    # Sayfalama
-    paginator = Paginator(ogrenciler, 8)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
     context = {
         'ogrenciler': page_obj,
         'toplam_ogrenci': toplam_ogrenci,
@@ -3379,6 +2636,9 @@ def ogrenci_listesi(request):
         'ders_ortalamalari': ders_ortalamalari,
         'en_basarili_5_ogrenci': en_basarili_5_ogrenci,
         'view_type': view_type,
+        'siralama': siralama,
+        'sayfa_araligi': sayfa_araligi,
+        'siralamalar': [(deger, etiket) for deger, (etiket, _) in OGRENCI_SIRALAMALARI.items()],
     }
 
     return render(request, 'ogrenci_listesi.html', context)
@@ -3484,16 +2744,10 @@ def ogrenci_ekle(request):
 
 
 def update_ogrenci_seviye(ogrenci):
-    # Ezber durumlarını kontrol et
-    tamamlanan_ezber_sayisi = EzberKaydi.objects.filter(
-        ogrenci=ogrenci, 
-        durum='TAMAMLANDI'
-    ).count()
-    
-    tamamlanan_elif_ba_sayisi = ElifBaEzberDurumu.objects.filter(
-        ogrenci=ogrenci, 
-        durum='TAMAMLANDI'
-    ).count()
+    # Ezber durumlarını kontrol et - sayılar özet tablosundan
+    tamamlanan_ezber_sayisi, tamamlanan_elif_ba_sayisi = OgrenciIstatistik.objects.filter(
+        ogrenci=ogrenci
+    ).values_list('tamamlanan_ezber', 'tamamlanan_elifba').first() or (0, 0)
     
     # Seviye belirleme mantığı
     if tamamlanan_ezber_sayisi >= 10 and tamamlanan_elif_ba_sayisi >= 15:
@@ -1,7 +1,7 @@
 import google.generativeai as genai
 from django.conf import settings
-from .models import Ogrenci, SinavSonucu, EzberKaydi, ElifBaEzberDurumu
-from django.db.models import Avg, Count, Q, Max
+from .models import Ogrenci
+from . import sinif_istatistik_service, siralama_service
 from datetime import date, timedelta
 import logging
 
@@ -24,8 +24,11 @@ class HaftalikRaporServisi:
         bugun = date.today()
         bir_hafta_once = bugun - timedelta(days=7)
         
+        # Sınıf geneli değerler - veriler değişmedikçe önbellekten
+        sinif = sinif_istatistik_service.sinif_istatistikleri()
+        
         # Toplam öğrenci sayısı
-        toplam_ogrenci = Ogrenci.objects.count()
+        toplam_ogrenci = sinif['toplam_ogrenci']
         
         # Son hafta eklenen öğrenciler
         yeni_ogrenciler = Ogrenci.objects.filter(
@@ -33,38 +36,23 @@ class HaftalikRaporServisi:
         ).count()
         
         # Sınav ortalamaları
-        sinav_ortalamasi = SinavSonucu.objects.aggregate(
-            ortalama=Avg('puan')
-        )['ortalama'] or 0
-        
-        # En başarılı öğrenci
-        en_basarili = Ogrenci.objects.annotate(
-            ortalama_puan=Avg('sinavsonucu__puan')
-        ).order_by('-ortalama_puan').first()
+        sinav_ortalamasi = sinif['sinif_ortalamasi']
         
-        # En düşük performanslı öğrenci
-        en_dusuk = Ogrenci.objects.annotate(
-            ortalama_puan=Avg('sinavsonucu__puan')
-        ).order_by('ortalama_puan').first()
+        # En başarılı ve en düşük performanslı öğrenci
+        en_basarili = next(iter(siralama_service.en_basarili(1)), None)
+        en_dusuk = next(iter(siralama_service.en_dusuk(1)), None)
         
         # Ezber istatistikleri
-        tamamlanan_ezberler = EzberKaydi.objects.filter(
-            durum='TAMAMLANDI'
-        ).count()
-        
-        devam_eden_ezberler = EzberKaydi.objects.filter(
-            durum='DEVAM'
-        ).count()
+        tamamlanan_ezberler = sinif['tamamlanan_ezber']
+        devam_eden_ezberler = sinif['devam_eden_ezber']
         
         # Elif Ba istatistikleri
-        tamamlanan_elifba = ElifBaEzberDurumu.objects.filter(
-            durum='TAMAMLANDI'
-        ).count()
+        tamamlanan_elifba = sinif['tamamlanan_elifba']
         
         # Seviye dağılımı
         seviye_dagilimi = {}
         for seviye_kod, seviye_ad in Ogrenci.SEVIYE_CHOICES:
-            sayi = Ogrenci.objects.filter(seviye=seviye_kod).count()
+            sayi = sinif['seviye_dagilimi'][seviye_kod]
             if sayi > 0:
                 seviye_dagilimi[seviye_ad] = sayi
         
@@ -74,11 +62,11 @@ class HaftalikRaporServisi:
             'sinav_ortalamasi': round(sinav_ortalamasi, 1),
             'en_basarili': {
                 'ad': en_basarili.ad_soyad if en_basarili else None,
-                'ortalama': round(en_basarili.ortalama_puan or 0, 1) if en_basarili else 0
+                'ortalama': round(en_basarili.ders_ortalamasi, 1) if en_basarili else 0
             },
             'en_dusuk': {
                 'ad': en_dusuk.ad_soyad if en_dusuk else None,
-                'ortalama': round(en_dusuk.ortalama_puan or 0, 1) if en_dusuk else 0
+                'ortalama': round(en_dusuk.ders_ortalamasi, 1) if en_dusuk else 0
             },
             'tamamlanan_ezberler': tamamlanan_ezberler,
             'devam_eden_ezberler': devam_eden_ezberler,
@@ -74,10 +74,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'sseyma.wsgi.application'
 
+# Önbellek tüm gunicorn süreçlerince paylaşılır (sınıf istatistikleri sürümü, AI cevapları)
+# media/ dışında tutulur - medya yolundan sunulmaz
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
     }
 }
 
@@ -17,10 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path,include
 from django.conf import settings
-from django.conf.urls.static import static
+from mainproject import file_service
 
 urlpatterns = [
     path('', include('mainproject.urls')),
     path('blog/',include('blog.urls')),
     path('admin/', admin.site.urls),
-]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]+ file_service.medya_yollari()